@@ -0,0 +1,272 @@
+# analytics.py
+import os, json, time, threading
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from models import NumericBlock, InfoBlock
+
+NUMERIC_FIELDS: List[str] = list(NumericBlock.model_fields)
+INFO_FIELDS: List[str] = list(InfoBlock.model_fields) + ["month"]  # month = report_datetime 의 YYYY-MM
+
+# 미리 유지할 롤업 (차원 조합). 질의 group_by+필터 필드가 이 안에 들면 롤업에서 바로 응답
+DEFAULT_ROLLUPS: List[Tuple[str, ...]] = [
+    ("fire_type", "fire_station_name", "month"),
+    ("building_usage_status", "month"),
+    ("fire_type", "building_usage_status"),
+]
+
+NAN = float("nan")
+
+def iter_normalized(folder: str) -> Iterator[Dict[str, Any]]:
+    """results/normalize/*.json 를 하나씩 읽어 표준 중첩 dict 로 반환 (비었거나 깨진 파일은 건너뜀)"""
+    for _, std in _iter_named(folder):
+        yield std
+
+def _iter_named(folder: str, skip: Optional[Set[str]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(파일명, 표준 dict). skip 에 든 파일명은 읽지 않음"""
+    try:
+        entries = os.scandir(folder)  # 파일 목록을 한꺼번에 만들지 않음
+    except OSError:
+        return
+    with entries:  # 소비자가 중간에 멈춰도(제너레이터 close) 디렉터리 핸들을 닫음
+        for entry in entries:
+            if not entry.name.endswith(".json") or (skip is not None and entry.name in skip):
+                continue
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    std = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(std, dict) and (std.get("numeric") or std.get("info")):
+                yield entry.name, std
+
+# ---------------------- 컬럼 ----------------------
+class DictColumn:
+    """사전 인코딩 문자열 컬럼: 값 → 정수 코드 (0 = None)"""
+
+    def __init__(self):
+        self.codes = array("i")
+        self.values: List[Optional[str]] = [None]
+        self.index: Dict[Optional[str], int] = {None: 0}
+
+    def encode(self, v: Optional[str]) -> int:
+        code = self.index.get(v)
+        if code is None:
+            code = len(self.values)
+            self.values.append(v)
+            self.index[v] = code
+        return code
+
+    def append(self, v: Optional[str]) -> int:
+        code = self.encode(v)
+        self.codes.append(code)
+        return code
+
+class _Group:
+    """롤업 한 칸: 건수 + 수치 필드별 (합계, 비결측 건수)"""
+    __slots__ = ("count", "sums", "nonnull")
+
+    def __init__(self):
+        self.count = 0
+        self.sums = array("d", bytes(8 * len(NUMERIC_FIELDS)))
+        self.nonnull = array("q", bytes(8 * len(NUMERIC_FIELDS)))
+
+    def add(self, nums: Sequence[float]) -> None:
+        self.count += 1
+        for i, v in enumerate(nums):
+            if v == v:  # NaN 제외
+                self.sums[i] += v
+                self.nonnull[i] += 1
+
+    def merge(self, other: "_Group") -> None:
+        self.count += other.count
+        for i in range(len(NUMERIC_FIELDS)):
+            self.sums[i] += other.sums[i]
+            self.nonnull[i] += other.nonnull[i]
+
+# ---------------------- 저장소 ----------------------
+class IncidentStore:
+    """
+    NumericBlock/InfoBlock 필드를 컬럼 단위로 보관.
+    - 수치: array('d'), 결측은 NaN
+    - 정보: DictColumn (사전 인코딩)
+    - 롤업: 차원 코드 튜플 → _Group, append 시 증분 갱신
+    - 파일 반영: refresh 가 아직 안 읽은 파일만 추가 (시작 시 백그라운드 적재, 다른 워커가 쓴 레코드도
+      질의 전에 따라잡음). 파일명 단위로 한 번만 반영
+    """
+
+    def __init__(self, rollups: Iterable[Tuple[str, ...]] = DEFAULT_ROLLUPS):
+        self.num: Dict[str, array] = {f: array("d") for f in NUMERIC_FIELDS}
+        self.info: Dict[str, DictColumn] = {f: DictColumn() for f in INFO_FIELDS}
+        self.rollups: Dict[Tuple[str, ...], Dict[Tuple[int, ...], _Group]] = {tuple(r): {} for r in rollups}
+        self.rows = 0
+        self._lock = threading.RLock()
+        self._seen: Set[str] = set()
+        self._refresh_lock = threading.Lock()
+        self._refreshed_at: Optional[float] = None
+
+    def append(self, std: Dict[str, Any], name: Optional[str] = None) -> bool:
+        """레코드 하나 추가. name(파일명)이 이미 반영됐으면 건너뛰고 False"""
+        numeric = std.get("numeric") or {}
+        info = dict(std.get("info") or {})
+        dt = info.get("report_datetime")
+        info["month"] = dt[:7] if isinstance(dt, str) and len(dt) >= 7 else None
+
+        nums = []
+        for f in NUMERIC_FIELDS:
+            v = numeric.get(f)
+            nums.append(float(v) if isinstance(v, (int, float)) else NAN)
+        with self._lock:
+            if name is not None:
+                if name in self._seen:
+                    return False
+                self._seen.add(name)
+            for f, v in zip(NUMERIC_FIELDS, nums):
+                self.num[f].append(v)
+            codes = {f: self.info[f].append(info.get(f)) for f in INFO_FIELDS}
+            for dims, groups in self.rollups.items():
+                key = tuple(codes[d] for d in dims)
+                g = groups.get(key)
+                if g is None:
+                    g = groups[key] = _Group()
+                g.add(nums)
+            self.rows += 1
+        return True
+
+    def refresh(self, folder: str, max_age: float = 0.0) -> int:
+        """
+        folder 에서 아직 반영하지 않은 파일만 추가. 추가 건수 반환.
+        max_age 초 안에 이미 훑었으면 생략 (동시에 부르면 앞선 적재가 끝날 때까지 대기)
+        """
+        with self._refresh_lock:
+            if self._refreshed_at is not None and time.monotonic() - self._refreshed_at < max_age:
+                return 0
+            n = sum(self.append(std, name) for name, std in _iter_named(folder, self._seen))
+            self._refreshed_at = time.monotonic()
+            return n
+
+    # ---------------------- 질의 ----------------------
+    def _filter_codes(self, where: Dict[str, str]) -> Optional[Dict[str, int]]:
+        """필터 값을 코드로. 한 번도 나오지 않은 값이면 None (결과 없음)"""
+        out = {}
+        for f, v in where.items():
+            code = self.info[f].index.get(v)
+            if code is None:
+                return None
+            out[f] = code
+        return out
+
+    def _month_ok(self, month_code: int, month_from: Optional[str], month_to: Optional[str]) -> bool:
+        m = self.info["month"].values[month_code]
+        if m is None:
+            return not (month_from or month_to)
+        return (not month_from or m >= month_from) and (not month_to or m <= month_to)
+
+    def query(self, group_by: Sequence[str] = (), metrics: Sequence[str] = ("count",),
+              where: Optional[Dict[str, str]] = None,
+              month_from: Optional[str] = None, month_to: Optional[str] = None) -> Dict[str, Any]:
+        """
+        group_by: INFO_FIELDS 중 필드 목록
+        metrics: "count" | "sum:<수치필드>" | "avg:<수치필드>"
+        where: 정보 필드 동등 조건, month_from/month_to: YYYY-MM 범위
+        """
+        where = dict(where or {})
+        for f in list(group_by) + list(where):
+            if f not in self.info:
+                raise ValueError(f"알 수 없는 차원: {f}")
+        parsed = []
+        for m in metrics:
+            op, _, field = m.partition(":")
+            if op == "count" and not field:
+                parsed.append((m, op, None))
+            elif op in ("sum", "avg") and field in self.num:
+                parsed.append((m, op, NUMERIC_FIELDS.index(field)))
+            else:
+                raise ValueError(f"알 수 없는 지표: {m}")
+
+        with self._lock:
+            codes = self._filter_codes(where)
+            if codes is None:
+                return {"rows": [], "source": "empty", "scanned": 0}
+            need = set(group_by) | set(codes) | ({"month"} if (month_from or month_to) else set())
+            # 조건을 덮는 롤업 중 칸 수가 가장 적은 것
+            covering = [d for d in self.rollups if need <= set(d)]
+            if covering:
+                rollup = min(covering, key=lambda d: len(self.rollups[d]))
+                groups, scanned, source = self._from_rollup(rollup, group_by, codes, month_from, month_to)
+            else:
+                idxs = sorted({idx for _, op, idx in parsed if idx is not None})
+                groups, scanned, source = self._scan(group_by, codes, month_from, month_to, idxs)
+
+            rows = []
+            for key, g in groups.items():
+                row: Dict[str, Any] = {f: self.info[f].values[c] for f, c in zip(group_by, key)}
+                for name, op, idx in parsed:
+                    if op == "count":
+                        row[name] = g.count
+                    elif op == "sum":
+                        row[name] = g.sums[idx]
+                    else:
+                        row[name] = g.sums[idx] / g.nonnull[idx] if g.nonnull[idx] else None
+                rows.append(row)
+        rows.sort(key=lambda r: -(r.get("count") or 0))
+        return {"rows": rows, "source": source, "scanned": scanned}
+
+    def _from_rollup(self, dims, group_by, codes, month_from, month_to):
+        pos = {d: i for i, d in enumerate(dims)}
+        gidx = [pos[f] for f in group_by]
+        fidx = [(pos[f], c) for f, c in codes.items()]
+        midx = pos.get("month") if (month_from or month_to) else None
+        out: Dict[Tuple[int, ...], _Group] = {}
+        cells = self.rollups[dims]
+        if tuple(group_by) == dims and not fidx and midx is None:
+            return cells, len(cells), "rollup:" + "×".join(dims)  # 그대로 응답
+        for key, g in cells.items():
+            if any(key[i] != c for i, c in fidx):
+                continue
+            if midx is not None and not self._month_ok(key[midx], month_from, month_to):
+                continue
+            k = tuple(key[i] for i in gidx)
+            acc = out.get(k)
+            if acc is None:
+                acc = out[k] = _Group()
+            acc.merge(g)
+        return out, len(cells), "rollup:" + "×".join(dims)
+
+    def _scan(self, group_by, codes, month_from, month_to, idxs):
+        """롤업으로 못 덮는 질의: 필요한 컬럼만 한 번 훑음"""
+        gcols = [self.info[f].codes for f in group_by]
+        fcols = [(self.info[f].codes, c) for f, c in codes.items()]
+        mcol = self.info["month"].codes if (month_from or month_to) else None
+        month_cache: Dict[int, bool] = {}
+        ncols = [(i, self.num[NUMERIC_FIELDS[i]]) for i in idxs]
+        out: Dict[Tuple[int, ...], _Group] = {}
+        for r in range(self.rows):
+            if fcols and any(col[r] != c for col, c in fcols):
+                continue
+            if mcol is not None:
+                mc = mcol[r]
+                ok = month_cache.get(mc)
+                if ok is None:
+                    ok = month_cache[mc] = self._month_ok(mc, month_from, month_to)
+                if not ok:
+                    continue
+            k = tuple([col[r] for col in gcols])
+            acc = out.get(k)
+            if acc is None:
+                acc = out[k] = _Group()
+            acc.count += 1
+            for i, col in ncols:
+                v = col[r]
+                if v == v:
+                    acc.sums[i] += v
+                    acc.nonnull[i] += 1
+        return out, self.rows, "scan"
+
+    def describe(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rows": self.rows,
+                "dimensions": {f: len(c.values) - 1 for f, c in self.info.items()},
+                "rollups": {"×".join(d): len(g) for d, g in self.rollups.items()},
+            }
@@ -4,21 +4,38 @@ load_dotenv()  # .env 의 OPENAI_API_KEY 로딩
 import os
 import time
 import uuid
-import json
 import re
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, BackgroundTasks, UploadFile, File, Form, HTTPException, Request, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
 from pydantic import BaseModel
 
 # ===== 로컬 모듈 =====
-from stt import transcribe
-from extract import extract_keywords, extract_keywords_both
+from stt import transcribe, resolve_backend, backends_info
+from extract import (extract_keywords, extract_keywords_both, prefill_from_rules, merge_rule_and_model,
+                     field_provenance, RULE_DEFAULTS, RULES_ONLY)
+from extract_router import ROUTER, extract_routed
 from run_mono_demo import run as pipeline_run
 from mapper import to_fire_incident_nested
+from numeric_tokenizer import first_numeric, floor_values
+from results_store import PrecompressedStaticFiles, write_json
+from analytics import IncidentStore
+from risk_model import get_model, risk_level
+from export import FORMATS, export_stream
+from dashboard_hub import HUB
+from extract_session import SESSIONS
+from diarize_llm import stats as diarize_stats
+from upstream import SCHEDULER, LANES, priority_lane
+from incident_cluster import CLUSTERS
+from dedup import ContentCache, InflightCoalescer, cached_call, cached_call_within, save_upload_hashed, hash_text
+from deadline import Deadline, DeadlineExceeded, deadline_scope, remaining as remaining_budget
 
 # ===== 기본 설정 =====
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -36,7 +53,28 @@ if not OPENAI_API_KEY:
 os.makedirs(R("uploads"), exist_ok=True)
 os.makedirs(R("results"), exist_ok=True)
 
-app = FastAPI(title="Fire STT/Extract API", version="1.1.0")
+# 내용 해시 기반 결과 캐시 (재시도 업로드 시 ffmpeg/STT/추출 재실행 방지)
+CACHE = ContentCache(
+    R("cache"),
+    max_items=int(os.getenv("CACHE_MAX_ITEMS", "512")),
+    max_disk_bytes=int(os.getenv("CACHE_MAX_DISK_MB", "256")) * (1 << 20),
+)
+COALESCER = InflightCoalescer()
+
+# 정규화 레코드 컬럼 저장소 + 증분 롤업 (/stats). 기존 파일은 시작 후 백그라운드로 적재
+STORE = IncidentStore()
+STATS_REFRESH_S = float(os.getenv("STATS_REFRESH_S", "5"))  # /stats 전에 다른 워커가 쓴 파일을 따라잡는 주기
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    HUB.bind_loop(asyncio.get_running_loop())  # 워커 스레드에서 publish_threadsafe 가능하게
+    threading.Thread(target=STORE.refresh, args=(R(os.path.join("results", "normalize")),), daemon=True).start()
+    try:
+        yield
+    finally:
+        HUB.bind_loop(None)  # 닫힌 루프로 call_soon_threadsafe 하지 않게
+
+app = FastAPI(title="Fire STT/Extract API", version="1.1.0", lifespan=lifespan)
 
 # ===== CORS =====
 app.add_middleware(
@@ -47,19 +85,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 결과 JSON 정적 서빙 (브라우저에서 바로 GET 가능)
-app.mount("/results", StaticFiles(directory=R("results")), name="results")
+# 업스트림 우선순위: 기본은 live(접수 요원), 백필/일괄 작업은 X-Upstream-Lane: batch
+@app.middleware("http")
+async def upstream_lane(request: Request, call_next):
+    lane = request.headers.get("x-upstream-lane", "live")
+    with priority_lane(lane if lane in LANES else "live"):
+        return await call_next(request)
+
+# 결과 JSON 정적 서빙 (브라우저에서 바로 GET 가능, 사전압축/ETag/304 지원)
+app.mount("/results", PrecompressedStaticFiles(directory=R("results")), name="results")
 
 # ===== Pydantic 모델 =====
 class ExtractIn(BaseModel):
     text: str
     mode: Optional[str] = "both"  # "facts" | "insights" | "both"
+    route: Optional[bool] = None  # rules/small/large 라우팅 (기본 EXTRACT_ROUTER=1 이면 켬)
+
+class SessionIn(BaseModel):
+    call_id: str
+    text: str                 # 이번에 새로 들어온 발화만
+    full_text: Optional[str] = None  # 지금까지의 전체 전사문 (선택: 세션이 만료됐으면 이것으로 전체 추출)
 
 class TranscriptIn(BaseModel):
     text: str
     fire_data_pk: Optional[int] = None
     report_datetime: Optional[str] = None  # 없으면 서버 현재시각 사용(YYYY-MM-DD HH:MM:SS 권장)
 
+class RiskScoreIn(BaseModel):
+    records: List[Dict[str, Any]] = []    # FireIncidentNested dict (numeric/info)
+    keywords: List[Dict[str, Any]] = []   # KeywordsV1 dict
+
 # ===== 전사 → 표준 유틸 =====
 def _now() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -76,9 +131,9 @@ def _get_or_now(dt: Optional[str]) -> str:
     return _now()
 
 
-def _extract_floor(text: str) -> Optional[int]:
-    m = re.search(r'(\d+)\s*층', text)
-    return int(m.group(1)) if m else None
+def _num(nums: Dict[str, Any], field: str, cast=float):
+    ent = nums.get(field)
+    return cast(ent.value) if ent else None
 
 
 def _detect_ignition_material(text: str) -> Optional[str]:
@@ -109,10 +164,21 @@ def _extract_location(text: str) -> Optional[str]:
     return m.group(1).strip() if m else None
 
 
+_ADDRESS_RE = re.compile(r'(?:[가-힣]+(?:시|도)\s*)?(?:[가-힣]+(?:구|군)\s*)?'
+                         r'[가-힣0-9]+(?:동|읍|면|리|로|길)\s*\d+(?:-\d+)?(?:\s*번지)?')
+
+
+def _extract_address(text: str) -> Optional[str]:
+    # 예: '서울 강남구 역삼동 123번지', '테헤란로 152' (번지 숫자까지 있어야 주소로 봄)
+    m = _ADDRESS_RE.search(text or "")
+    return m.group(0).strip() if m else None
+
+
 def transcript_to_standard(text: str,
                            fire_data_pk: Optional[int] = None,
                            report_dt: Optional[str] = None) -> Dict[str, Any]:
-    floor = _extract_floor(text)
+    nums = first_numeric(text)
+    ignition_floor, floor_count = floor_values(nums)
     usage = _guess_building_usage(text)
     ign_mat = _detect_ignition_material(text)
     loc = _extract_location(text)
@@ -120,16 +186,16 @@ def transcript_to_standard(text: str,
     return {
         "fire_data_pk": fire_data_pk,
         "numeric": {
-            "building_agreement_count": None,
-            "total_floor_area": None,
-            "soot_area": None,
+            "building_agreement_count": _num(nums, "building_agreement_count", int),
+            "total_floor_area": _num(nums, "total_floor_area"),
+            "soot_area": _num(nums, "soot_area"),
             "floor_area": None,
-            "ignition_floor": floor,
+            "ignition_floor": ignition_floor,
             "casualty_count": 0,           # 언급 없으면 0 가정
-            "unit_temperature": None,
-            "unit_humidity": None,
+            "unit_temperature": _num(nums, "unit_temperature"),
+            "unit_humidity": _num(nums, "unit_humidity"),
             "property_damage_amount": None,
-            "total_floor_count": floor if floor else None,  # "6층 건물"일 때 총층수=6 추정
+            "total_floor_count": floor_count,  # "6층 건물"일 때 총층수=6, 명시 없으면 언급된 층
         },
         "info": {
             "building_structure": None,
@@ -141,7 +207,7 @@ def transcript_to_standard(text: str,
             "ignition_cause": None,
             "fire_management_target_flag": "N",
             "fire_station_name": None,
-            "unit_wind_speed": None,
+            "unit_wind_speed": f"{nums['unit_wind_speed'].value} m/s" if "unit_wind_speed" in nums else None,
             "facility_location": loc,
             "combustion_expansion_material": None,
             "forest_fire_flag": "N",
@@ -205,18 +271,68 @@ def health():
     return {"ok": True, "time": time.strftime("%Y-%m-%d %H:%M:%S")}
 
 
-@app.post("/stt")
-async def api_stt(file: UploadFile = File(...)):
+async def _cached(namespace: str, digest: str, work, keep=None) -> Any:
+    """cached_call. 요청 마감(deadline_scope) 안이면 남은 예산까지만 기다림"""
+    rem = remaining_budget()
+    if rem is None:
+        return await cached_call(CACHE, COALESCER, namespace, digest, work, keep)
+    if rem <= 0:
+        raise DeadlineExceeded(namespace)
+    return await cached_call_within(CACHE, COALESCER, namespace, digest, work, rem, keep)
+
+
+async def _stt_upload(file: UploadFile, dl: Optional[Deadline] = None,
+                      backend: Optional[str] = None) -> Dict[str, Any]:
     """
-    오디오 업로드 → Whisper STT
+    업로드를 해시하며 저장 → 같은 내용이면 캐시/진행 중 작업 결과 재사용 (dl: 단계별 마감 기록)
+    backend: openai | local | auto (없으면 STT_BACKEND). 실제로 쓴 백엔드별로 캐시를 따로 둠
+             (auto 는 openai 캐시를 공유하고, local 로 대체된 결과는 local 캐시에만 저장)
     """
+    backend = resolve_backend(backend)
+    namespace = "stt-local" if backend == "local" else "stt"
+    keep = (lambda r: r["stt"]["backend"] == "openai") if backend == "auto" else None
     suffix = os.path.splitext(file.filename or "")[1] or ".wav"
     temp_path = R(os.path.join("uploads", f"{uuid.uuid4().hex}{suffix}"))
-    with open(temp_path, "wb") as f:
-        f.write(await file.read())
+    saving = save_upload_hashed(file, temp_path)
+    try:
+        digest, _ = await (dl.run("upload", saving) if dl else saving)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    call_id = str(uuid.UUID(digest[:32]))  # 같은 내용 → 같은 call_id
+
+    ran = False
+
+    async def work():
+        nonlocal ran
+        ran = True
+        return await run_in_threadpool(transcribe, temp_path, call_id, backend)
 
     try:
-        res = transcribe(temp_path)  # { text: "...", ... } 형태 기대
+        stt = _cached(namespace, digest, work, keep)  # ffmpeg/STT 호출 타임아웃도 남은 예산 (스레드로 전파)
+        res, cached = await (dl.run("stt", stt) if dl else stt)
+    finally:
+        if not ran:  # 중복 업로드 파일은 보관하지 않음
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+    used = res["stt"]["backend"]
+    if backend == "auto" and used == "local" and not cached:  # 대체 결과는 openai 캐시 대신 local 캐시로
+        CACHE.put("stt-local", digest, res)
+    # 파이프라인 캐시 키: 같은 내용이라도 백엔드가 다르면 전사문이 다를 수 있음
+    key = digest if used == "openai" else f"{digest}-{used}"
+    return {**res, "content_hash": digest, "cache_key": key, "cached": cached}
+
+
+@app.post("/stt")
+async def api_stt(file: UploadFile = File(...), backend: Optional[str] = None):
+    """
+    오디오 업로드 → Whisper STT (backend=openai|local|auto, 기본 STT_BACKEND)
+    """
+    try:
+        res = await _stt_upload(file, backend=backend)  # { text: "...", ... } 형태 기대
         return {"ok": True, **res}
     except Exception as e:
         raise HTTPException(400, f"STT 실패: {e}")
@@ -229,6 +345,10 @@ def api_extract(body: ExtractIn):
     """
     try:
         mode = (body.mode or "both").lower()
+        route = body.route if body.route is not None else os.getenv("EXTRACT_ROUTER", "0") == "1"
+        if route:
+            out, decision = extract_routed(body.text, mode if mode in ("facts", "insights") else "both")
+            return {"ok": True, "result": out, "route": decision}
         if mode == "facts":
             out = extract_keywords(body.text, strict=True)
         elif mode == "insights":
@@ -240,6 +360,23 @@ def api_extract(body: ExtractIn):
         raise HTTPException(400, f"키워드 추출 실패: {e}")
 
 
+@app.post("/extract/session")
+def api_extract_session(body: SessionIn):
+    """
+    진행 중 통화: 새 발화만 보내면 call_id 별 누적 상태에 병합해 반환.
+    full_text 를 함께 보내면 세션이 만료/제거된 경우 전체 추출로 상태를 복원 (result.turn == 1 이면 새 세션)
+    """
+    try:
+        return {"ok": True, "result": SESSIONS.update(body.call_id, body.text, body.full_text)}
+    except Exception as e:
+        raise HTTPException(400, f"키워드 추출 실패: {e}")
+
+
+@app.delete("/extract/session/{call_id}")
+def api_extract_session_close(call_id: str):
+    return {"ok": True, "closed": SESSIONS.close(call_id)}
+
+
 @app.post("/normalize-nested")
 def normalize_nested(raw: Dict[str, Any], save: bool = True):
     """
@@ -254,8 +391,8 @@ def normalize_nested(raw: Dict[str, Any], save: bool = True):
             os.makedirs(folder, exist_ok=True)
             fname = f"{uuid.uuid4().hex}.json"
             fpath = os.path.join(folder, fname)
-            with open(fpath, "w", encoding="utf-8") as f:
-                json.dump(std, f, ensure_ascii=False, indent=2)
+            write_json(fpath, std)
+            STORE.append(std, name=fname)
             static_url = f"/results/normalize/{fname}"
             return {"ok": True, "data": std, "file_path": fpath, "file_url": static_url}
 
@@ -263,26 +400,403 @@ def normalize_nested(raw: Dict[str, Any], save: bool = True):
     except Exception as e:
         raise HTTPException(400, f"정규화 실패: {e}")
 
+EXTRACT_MODES = ("facts", "insights")
+
+
+def _slo_degraded(res: Dict[str, Any]) -> bool:
+    """라우터가 SLO 때문에 규칙만으로 낮춘 결과 (일시적이므로 캐시하지 않음)"""
+    return (res.get("route") or {}).get("reason") == "slo"
+
+
+async def _extract_cached(text: str, mode: str = "both") -> Dict[str, Any]:
+    """같은 전사문 + 모드는 한 번만 추출"""
+    async def work():
+        return await run_in_threadpool(api_extract, ExtractIn(text=text, mode=mode))
+
+    out, _ = await _cached("extract", hash_text(f"{mode}\n{text}"), work, keep=lambda v: not _slo_degraded(v))
+    return out
+
+
+async def _extract_both_cached(text: str) -> Dict[str, Any]:
+    """
+    facts/insights 를 모드별 캐시 항목으로 동시에 추출 (extract_keywords_both 와 같은 결과).
+    마감 있는 경로(_extract_within)와 같은 항목을 쓰므로 어느 쪽이 먼저 돌든 작업/캐시를 공유.
+    degraded: 어느 모드든 SLO 로 규칙만 썼으면 True
+    """
+    res = await asyncio.gather(*(_extract_cached(text, mode) for mode in EXTRACT_MODES))
+    return {"ok": True, "result": {mode: r["result"] for mode, r in zip(EXTRACT_MODES, res)},
+            "degraded": any(_slo_degraded(r) for r in res)}
+
+
+def _fire_kind(prefill: Dict[str, Any]) -> Optional[str]:
+    """LLM 없이 알 수 있는 화재 종류 (클러스터 충돌 판정용)"""
+    if prefill.get("forest_fire_flag"):
+        return "임야"
+    if prefill.get("vehicle_fire_flag"):
+        return "차량"
+    return None
+
+
+def _overlay_rules(shared: Dict[str, Any], prefill: Dict[str, Any]) -> Dict[str, Any]:
+    """같은 사건의 공유 추출 결과 위에 이 통화의 규칙 추출값(기본값 제외)만 덮어씀 (규칙뿐인 결과는 표시 유지)"""
+    own = {k: v for k, v in prefill.items() if v not in RULE_DEFAULTS}
+    out = {}
+    for mode, res in shared.items():
+        prov = dict(res.get("provenance") or {})  # 덧씌우지 않은 필드는 공유 결과의 출처 유지
+        kw = merge_rule_and_model(own, res.get("keywords") or {}, prov)
+        out[mode] = {**res, "keywords": kw, "provenance": field_provenance(kw, prov),
+                     "model": RULES_ONLY if res.get("model") == RULES_ONLY else "shared(rules-overlay)",
+                     "latency_ms": 0}
+    return out
+
+
+def _rules_only(prefill: Dict[str, Any]) -> Dict[str, Any]:
+    prov: Dict[str, str] = {}
+    kw = merge_rule_and_model(prefill, {}, prov)
+    return {"keywords": kw, "provenance": field_provenance(kw, prov), "model": RULES_ONLY, "latency_ms": 0}
+
+
+def _provenance(extraction: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    """
+    모드별 필드 출처 (병합 시 기록한 값). rule: 규칙 값이 채택됨(0/False 포함), model: LLM 값,
+    rule+model: 목록 합집합, default: 아무도 안 채워 기본값, none: 값 없음
+    """
+    return {mode: res.get("provenance") or {} for mode, res in extraction.items()}
+
+
+async def _extract_within(dl: Deadline, text: str, prefill: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    facts/insights 를 따로 동시에 추출 → 마감 때까지 끝난 모드만 모델 결과, 나머지는 규칙만.
+    라우터가 SLO 로 규칙만 쓴 모드도 못 받은 것으로 셈 (complete 아님 → 캐시/저장 안 함)
+    """
+    t0 = time.monotonic()
+    tasks = {mode: asyncio.ensure_future(_extract_cached(text, mode)) for mode in EXTRACT_MODES}
+    done, pending = await asyncio.wait(tasks.values(), timeout=dl.remaining())
+    for t in pending:
+        t.cancel()  # 진행 중 LLM 호출은 스레드에서 남은 예산(≈0) 타임아웃으로 곧 끝남
+    out, errors, got = {}, [], 0
+    for mode, t in tasks.items():
+        err = t.exception() if t in done else None
+        if t in done and err is None:
+            out[mode] = t.result()["result"]
+            got += not _slo_degraded(t.result())
+            continue
+        if err is not None and not isinstance(err, (TimeoutError, asyncio.TimeoutError)):
+            errors.append(f"{mode}: {err}")
+        out[mode] = _rules_only(prefill)
+    dl.mark("extract", "ok" if got == len(tasks) else "partial" if got else "error" if errors else "timeout", t0)
+    if errors:
+        dl.stages["extract"]["errors"] = errors
+    return out
+
+
+def _pipeline_key(stt_result: Dict[str, Any], save: bool, cluster: bool) -> str:
+    """
+    pipeline 캐시 키. save/cluster 가 결과(저장 여부, 사건 묶기)를 바꾸므로 키에 포함
+    (save=false 로 먼저 처리된 음성도 이후 save=true 요청에서는 저장되도록)
+    """
+    return stt_result["cache_key"] + ("" if save else "-nosave") + ("" if cluster else "-nocluster")
+
+
+async def _pipeline_within(file: UploadFile, save: bool, cluster: bool, dl: Deadline,
+                           stt_backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    마감 있는 pipeline. 끝난 단계까지의 결과를 오류 대신 반환
+    (전사문 → 규칙 선추출 → 모드별 키워드, 필드별 provenance, 단계별 상태는 deadline.stages)
+    """
+    raw: Dict[str, Any] = {"call_id": None, "lang": None, "transcript": None, "extraction": None}
+    try:
+        stt_result = await _stt_upload(file, dl, stt_backend)
+    except DeadlineExceeded:
+        return {**raw, "deadline": dl.summary()}
+    except Exception as e:
+        raise HTTPException(400, f"STT 실패: {e}")
+    transcript = stt_result["transcript"]
+    raw.update(call_id=stt_result["call_id"], lang=stt_result["lang"], transcript=transcript)
+    prefill = prefill_from_rules(transcript)  # 로컬 규칙: 마감과 무관하게 항상 포함
+
+    key = _pipeline_key(stt_result, save, cluster)
+    hit = CACHE.get("pipeline", key)
+    if hit is not None:
+        return {**hit, "prefill": prefill, "provenance": _provenance(hit["extraction"]),
+                "deadline": dl.summary()}
+
+    match = None
+    if cluster:
+        match = CLUSTERS.assign(stt_result["call_id"], transcript,
+                                location=_extract_location(transcript), fire_type=_fire_kind(prefill),
+                                address=_extract_address(transcript),
+                                floor=floor_values(first_numeric(transcript))[0])
+    if match is not None and not match.primary:
+        shared = await _extract_within(dl, match.primary_text, prefill_from_rules(match.primary_text))
+        extraction = _overlay_rules(shared, prefill)
+    else:
+        extraction = await _extract_within(dl, transcript, prefill)
+    raw["extraction"] = extraction
+    if match is not None:
+        raw["incident"] = {"incident_id": match.incident_id, "primary": match.primary,
+                           "similarity": match.similarity, "members": match.members}
+
+    complete = dl.summary()["complete"]
+    t0 = time.monotonic()
+    if dl.expired():
+        dl.mark("normalize", "skipped", t0)
+    else:
+        # 부분 결과는 저장/집계하지 않음 (통계 오염 방지)
+        normalize_nested(raw, save=save and complete and (match is None or match.primary))
+        dl.mark("normalize", "ok", t0)
+    if complete:
+        CACHE.put("pipeline", key, raw)
+    return {**raw, "prefill": prefill, "provenance": _provenance(extraction),
+            "deadline": dl.summary()}
+
+
 @app.post("/pipeline")
-async def pipeline(file: UploadFile, save: bool = True) -> Dict[str, Any]:
+async def pipeline(file: UploadFile, save: bool = True, cluster: bool = True,
+                   deadline_ms: Optional[int] = Query(default=None, ge=1),
+                   stt_backend: Optional[str] = None) -> Dict[str, Any]:
     """
     STT -> Extract -> Normalize 순으로 처리하는 pipeline
+    cluster=true: 같은 화재의 중복 신고는 기존 사건에 묶고, LLM 추출은 첫 통화 결과를 공유
+                  (이 통화는 규칙 추출만 덧씌움). 중복 신고는 정규화 저장/집계에서 제외
+    deadline_ms: 전체 예산. 각 단계(업로드/변환·STT/추출/정규화)는 남은 예산만 쓰고,
+                 초과 시 끝난 부분 + prefill + 필드별 provenance + deadline 블록을 반환
+    stt_backend: openai | local | auto (기본 STT_BACKEND)
     """
-    stt_result = await api_stt(file)
+    if deadline_ms is not None:
+        with deadline_scope(deadline_ms / 1000) as dl:
+            return await _pipeline_within(file, save, cluster, dl, stt_backend)
+
+    stt_result = await api_stt(file, stt_backend)
     transcript = stt_result["transcript"]
 
-    extract_input = {"text": transcript, "mode": "both"}
-    extract_result = api_extract(ExtractIn(**extract_input))
+    degraded = False
+
+    async def work():
+        nonlocal degraded
+        match = None
+        prefill = None
+        if cluster:
+            prefill = prefill_from_rules(transcript)
+            match = CLUSTERS.assign(stt_result["call_id"], transcript,
+                                    location=_extract_location(transcript), fire_type=_fire_kind(prefill),
+                                    address=_extract_address(transcript),
+                                    floor=floor_values(first_numeric(transcript))[0])
+
+        if match is not None and not match.primary:
+            # 첫 통화 추출이 진행 중이면 그 작업에 합류, 끝났으면 캐시 적중 → 추가 LLM 호출 없음
+            shared = await _extract_both_cached(match.primary_text)
+            extract_result = {**shared, "result": _overlay_rules(shared["result"], prefill)}
+        else:
+            extract_result = await _extract_both_cached(transcript)
+        degraded = extract_result["degraded"]
+
+        raw = {
+            "call_id": stt_result["call_id"],
+            "lang": stt_result["lang"],
+            "transcript": stt_result["transcript"],
+            "extraction": extract_result["result"]
+        }
+        if match is not None:
+            raw["incident"] = {"incident_id": match.incident_id, "primary": match.primary,
+                               "similarity": match.similarity, "members": match.members}
+        normalized = normalize_nested(raw, save=save and (match is None or match.primary))
+        return raw
+
+    # SLO 로 낮춘 추출이 섞인 결과는 다음 요청에서 다시 추출되도록 캐시하지 않음 (extract 캐시와 같은 기준)
+    raw, _ = await cached_call(CACHE, COALESCER, "pipeline", _pipeline_key(stt_result, save, cluster), work,
+                               keep=lambda v: not degraded)
+    return raw
+
 
-    raw = {
-        "call_id": stt_result["call_id"],
-        "lang": stt_result["lang"],
-        "transcript": stt_result["transcript"],
-        "extraction": extract_result["result"]
-    }
-    normalized = normalize_nested(raw, save=save)
+@app.get("/incidents/clusters/stats")
+def cluster_stats():
+    """중복 신고 묶기: 활성 사건 수와 기존 사건에 붙은 통화 수"""
+    return {"ok": True, **CLUSTERS.stats()}
+
+
+@app.get("/incidents/clusters/{incident_id}")
+def cluster_get(incident_id: str):
+    info = CLUSTERS.get(incident_id)
+    if info is None:
+        raise HTTPException(404, "사건 없음 (만료되었거나 존재하지 않음)")
+    return {"ok": True, **info}
+
+
+@app.get("/stats")
+def stats(group_by: str = "", metric: str = "count",
+          where: List[str] = Query(default=[]),
+          month_from: Optional[str] = None, month_to: Optional[str] = None):
+    """
+    정규화 레코드 집계.
+    예) /stats?group_by=fire_type,fire_station_name,month
+        /stats?group_by=building_usage_status&metric=avg:property_damage_amount,count
+        /stats?group_by=month&where=fire_type:건물 화재&month_from=2024-01
+    """
+    STORE.refresh(R(os.path.join("results", "normalize")), max_age=STATS_REFRESH_S)  # 시작 적재 중이면 대기
+    t0 = time.perf_counter()
+    try:
+        cond = dict(w.split(":", 1) for w in where)
+        out = STORE.query(
+            group_by=[g for g in group_by.split(",") if g],
+            metrics=[m for m in metric.split(",") if m],
+            where=cond, month_from=month_from, month_to=month_to,
+        )
+    except ValueError as e:
+        raise HTTPException(400, f"집계 실패: {e}")
+    return {"ok": True, "took_ms": round((time.perf_counter() - t0) * 1000, 3), **out}
+
+
+@app.get("/export")
+def export(format: str = "ndjson", date_from: Optional[str] = None, date_to: Optional[str] = None,
+           fire_type: List[str] = Query(default=[])):
+    """
+    정규화 사건을 평탄화 컬럼으로 스트리밍 내보내기 (ndjson | csv | parquet | arrow).
+    예) /export?format=parquet&date_from=2024-01-01&date_to=2024-06-30&fire_type=건물 화재
+    """
+    if format not in FORMATS:
+        raise HTTPException(400, f"지원하지 않는 포맷: {format}")
+    try:
+        stream = export_stream(R(os.path.join("results", "normalize")), format,
+                               date_from, date_to, fire_type)
+        first = next(stream, b"")  # 의존성 누락 등은 응답 시작 전에 400 으로
+    except RuntimeError as e:
+        raise HTTPException(400, f"내보내기 실패: {e}")
+
+    def body():
+        yield first
+        yield from stream
+
+    ext = {"ndjson": "ndjson", "csv": "csv", "parquet": "parquet", "arrow": "arrows"}[format]
+    return StreamingResponse(body(), media_type=FORMATS[format],
+                             headers={"content-disposition": f'attachment; filename="incidents.{ext}"'})
+
+
+@app.post("/risk/score")
+def risk_score(body: RiskScoreIn):
+    """지역 대시보드 일괄 재채점. records/keywords 각각 한 번의 행렬 연산으로 점수화"""
+    t0 = time.perf_counter()
+    model = get_model()
+    out: Dict[str, Any] = {"ok": True, "model": model.source}
+    if body.records:
+        out["records"] = [risk_level(s) for s in model.score_nested(body.records).tolist()]
+    if body.keywords:
+        out["keywords"] = [risk_level(s) for s in model.score_keywords(body.keywords).tolist()]
+    out["took_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+    return out
+
+
+@app.get("/stt/backends")
+def stt_backends():
+    """STT 백엔드: 기본값, 사용 가능 목록, 로컬 모델 설정/로드 여부"""
+    return {"ok": True, **backends_info()}
+
+
+@app.get("/extract/router/stats")
+def extract_router_stats():
+    """추출 라우터: 단계별 선택 수, SLO 미달/오류 수, 모델별 지연 회귀 계수"""
+    return {"ok": True, **ROUTER.stats()}
+
+
+@app.get("/upstream/stats")
+def upstream_stats():
+    """요청/토큰 잔량과 레인별 대기 시간"""
+    return {"ok": True, **SCHEDULER.stats()}
+
+
+@app.get("/diarize/stats")
+def diarize_stats_endpoint():
+    """화자분리: 로컬 분류기만으로 끝난 통화 비율과 LLM 으로 넘긴 발화 수"""
+    return {"ok": True, **diarize_stats()}
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return {"ok": True, **CACHE.stats(), "coalesced": COALESCER.coalesced}
+
+# ===== 대시보드 푸시 (incident_id 별 구독) =====
+async def _run_mono(incident_id: str, temp_path: str, out_dir: str, fused: Optional[bool]):
+    try:
+        await run_in_threadpool(pipeline_run, temp_path, out_dir, HUB.publish_threadsafe, fused, incident_id)
+    except Exception as e:
+        HUB.publish(incident_id, {"incident_id": incident_id, "status": "error", "error": f"파이프라인 실패: {e}"})
+
+@app.post("/pipeline-mono")
+async def pipeline_mono(file: UploadFile, background: BackgroundTasks, fused: Optional[bool] = None):
+    """
+    단일 채널 통화: STT → 화자분리 → 추출 → 화면 JSON. 단계마다 같은 incident_id 로 대시보드에 푸시
+    (전사 → 화자분리 → 키워드/예측: 구독자는 첫 snapshot 뒤로 patch 를 받음).
+    incident_id(음성 내용 해시)를 먼저 정해 바로 응답하고 파이프라인은 응답 후 실행 → 그 사이에 구독하면 결과를 놓치지 않음
+    (실패 시 status=error 스냅샷을 푸시). fused=true 면 화자분리와 추출을 한 번의 호출로 (생략 시 MONO_FUSED 환경변수)
+    """
+    suffix = os.path.splitext(file.filename or "")[1] or ".wav"
+    temp_path = R(os.path.join("uploads", f"{uuid.uuid4().hex}{suffix}"))
+    digest, _ = await save_upload_hashed(file, temp_path)
+    out_dir = R(os.path.join("results", digest[:16]))
+    incident_id = digest[:16]  # 같은 음성 재업로드는 같은 사건 화면을 갱신
+    background.add_task(_run_mono, incident_id, temp_path, out_dir, fused)
+    return {"ok": True, "incident_id": incident_id,
+            "ws_url": f"/ws/incidents/{incident_id}", "events_url": f"/incidents/{incident_id}/events",
+            "file_url": f"/results/{incident_id}/incident_{incident_id}.json"}
+
+
+@app.post("/incidents/{incident_id}")
+async def publish_incident(incident_id: str, payload: Dict[str, Any]):
+    """외부(다른 워커 등)에서 화면 JSON 갱신을 밀어넣기 (허브 큐는 이벤트 루프 전용이라 async 로 루프에서 실행)"""
+    return {"ok": True, "version": HUB.publish(incident_id, payload)}
+
+
+@app.websocket("/ws/incidents/{incident_id}")
+async def ws_incident(ws: WebSocket, incident_id: str):
+    """
+    첫 메시지는 snapshot, 이후 patch(JSON Patch ops). 느리면 snapshot 으로 재동기화.
+    큐와 함께 수신도 기다려야 갱신이 없는 동안 끊긴 연결을 알아채고 구독을 정리함
+    """
+    await ws.accept()
+    sub = HUB.subscribe(incident_id)
+    recv = asyncio.ensure_future(ws.receive())
+    get: Optional[asyncio.Future] = None
+    try:
+        while True:
+            get = get or asyncio.ensure_future(sub.queue.get())
+            done, _ = await asyncio.wait((recv, get), return_when=asyncio.FIRST_COMPLETED)
+            if get in done:
+                await ws.send_text(get.result())
+                get = None
+            if recv in done:
+                if recv.result()["type"] == "websocket.disconnect":
+                    break
+                recv = asyncio.ensure_future(ws.receive())  # 클라이언트가 보낸 메시지는 무시
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for t in (recv, get):
+            if t is not None:
+                t.cancel()
+        HUB.unsubscribe(incident_id, sub)
+
+
+@app.get("/incidents/{incident_id}/events")
+async def sse_incident(request: Request, incident_id: str):
+    """SSE 버전 (event: snapshot|patch)"""
+    sub = HUB.subscribe(incident_id)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    msg = await asyncio.wait_for(sub.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                kind = "snapshot" if msg.startswith('{"type":"snapshot"') else "patch"
+                yield f"event: {kind}\ndata: {msg}\n\n"
+        finally:
+            HUB.unsubscribe(incident_id, sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"cache-control": "no-cache"})
 
-    return raw
 
 @app.post("/normalize-from-transcript")
 def normalize_from_transcript(body: TranscriptIn):
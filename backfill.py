@@ -0,0 +1,219 @@
+# backfill.py
+import os, sys, json, time, shutil, argparse, threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from dedup import hash_file
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+AUDIO_EXTS = (".wav", ".m4a", ".mp3", ".mp4", ".flac", ".ogg", ".webm")
+
+# ---------------------- 매니페스트 ----------------------
+class Manifest:
+    """
+    append-only JSONL 체크포인트. 파일 하나 끝날 때마다 한 줄 + fsync.
+    중단되면 마지막 줄이 잘려 있을 수 있으므로 로드 시 깨진 줄은 무시한다.
+    기록마다 size/mtime_ns 를 남겨 재실행 때 바뀌지 않은 파일은 다시 해시하지 않는다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Dict[str, Dict[str, Any]] = {}    # hash → 마지막 성공 기록
+        self.failed: Dict[str, Dict[str, Any]] = {}
+        self._index: Dict[Tuple[str, int, int], str] = {}   # (절대경로, size, mtime_ns) → hash
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    h = rec.get("hash")
+                    self._remember(rec)
+                    if rec.get("status") == "done":
+                        self.done[h] = rec
+                        self.failed.pop(h, None)
+                    elif rec.get("status") == "failed" and h not in self.done:
+                        self.failed[h] = rec
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._f = open(path, "a", encoding="utf-8")
+
+    def _remember(self, rec: Dict[str, Any]) -> None:
+        if rec.get("hash") and rec.get("path") and "size" in rec and "mtime_ns" in rec:
+            self._index[(os.path.abspath(rec["path"]), rec["size"], rec["mtime_ns"])] = rec["hash"]
+
+    def hash_of(self, path: str) -> Tuple[str, Dict[str, int]]:
+        """size/mtime 이 기록과 같으면 저장된 해시, 아니면 새로 해시. (hash, 기록용 stat) 반환"""
+        st = os.stat(path)
+        sig = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        digest = self._index.get((os.path.abspath(path), st.st_size, st.st_mtime_ns))
+        return digest or hash_file(path), sig
+
+    def record(self, rec: Dict[str, Any]) -> None:
+        rec = {**rec, "ts": time.strftime("%Y-%m-%d %H:%M:%S")}
+        with self._lock:
+            self._remember(rec)
+            self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            if rec["status"] == "done":
+                self.done[rec["hash"]] = rec
+                self.failed.pop(rec["hash"], None)
+            else:
+                self.failed[rec["hash"]] = rec
+
+    def close(self) -> None:
+        self._f.close()
+
+# ---------------------- 작업 ----------------------
+def iter_audio(src: str, exts: Tuple[str, ...] = AUDIO_EXTS) -> Iterator[str]:
+    for root, dirs, files in os.walk(src):
+        dirs.sort()
+        for name in sorted(files):
+            low = name.lower()
+            if low.endswith(exts) and not low.endswith("_fixed.wav"):  # 예전 STT 가 원본 옆에 남긴 변환 산출물
+                yield os.path.join(root, name)
+
+def _init_worker(env: Dict[str, str]) -> None:
+    """프로세스 풀 초기화: 업스트림 한도를 워커 수로 나눠 가진다 (SCHEDULER 는 import 시 env 로 생성)"""
+    os.environ.update(env)
+
+def process_one(path: str, digest: str, out_root: str, fused: Optional[bool]) -> Dict[str, Any]:
+    """
+    파일 하나 처리. <out_root>/<hash16>.partial 에 쓰고 성공 시에만 <hash16> 로 교체하므로
+    실패해도 이전 결과 폴더를 덮어쓰지 않는다.
+    """
+    from run_mono_demo import run         # 워커에서 import (프로세스 풀이면 워커별 SCHEDULER)
+    from upstream import priority_lane
+
+    t0 = time.time()
+    final = os.path.join(out_root, digest[:16])
+    partial = final + ".partial"
+    shutil.rmtree(partial, ignore_errors=True)
+    try:
+        with priority_lane("batch"):      # 같은 프로세스의 실시간 호출에 예산 우선권을 줌
+            payload = run(path, partial, fused=fused)
+        if os.path.isdir(final):
+            shutil.rmtree(final)
+        os.replace(partial, final)
+        return {"status": "done", "path": path, "hash": digest, "out_dir": final,
+                "incident_id": payload.get("incident_id"), "ms": int((time.time() - t0) * 1000)}
+    except Exception as e:
+        shutil.rmtree(partial, ignore_errors=True)
+        return {"status": "failed", "path": path, "hash": digest,
+                "error": f"{type(e).__name__}: {e}", "ms": int((time.time() - t0) * 1000)}
+
+def _fmt_eta(sec: float) -> str:
+    sec = int(sec)
+    h, rem = divmod(sec, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m" if h else f"{m}m{s:02d}s"
+
+# ---------------------- 실행 ----------------------
+def backfill(src: str, out_root: str, workers: int = 4, pool: str = "thread",
+             manifest_path: Optional[str] = None, fused: Optional[bool] = None,
+             retry_failed: bool = True, limit: Optional[int] = None) -> Dict[str, Any]:
+    manifest = Manifest(manifest_path or os.path.join(out_root, "manifest.jsonl"))
+
+    # 1) 작업 목록은 제출 직전에 해시 (완료 해시 / 이번 실행 내 중복 제외)
+    #    --limit 이나 첫 작업이 아카이브 전체 해시를 기다리지 않도록 제너레이터로 구성
+    paths = list(iter_audio(src))
+    seen = set()
+    skipped = {"done": 0, "duplicate": 0, "failed": 0}
+
+    def plan() -> Iterator[Tuple[str, str, Dict[str, int]]]:
+        for path in paths:
+            digest, sig = manifest.hash_of(path)
+            if digest in manifest.done:
+                skipped["done"] += 1
+            elif digest in seen:
+                skipped["duplicate"] += 1
+            elif digest in manifest.failed and not retry_failed:
+                skipped["failed"] += 1
+            else:
+                seen.add(digest)
+                yield path, digest, sig
+
+    print(f"후보 {len(paths)}건" + (f" (최대 {limit}건 처리)" if limit else ""), flush=True)
+
+    # 2) 풀 실행. 워커 수의 두 배만 미리 제출해 두고 하나 끝날 때마다 다음 파일을 해시해 채운다
+    if pool == "process":
+        env = {k: str(max(1.0, float(os.getenv(k, d)) / workers))
+               for k, d in (("UPSTREAM_RPM", "500"), ("UPSTREAM_TPM", "200000"))}
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(env,))
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+    jobs = plan()
+    pending: Dict[Any, Dict[str, int]] = {}
+    submitted = ok = failed = 0
+    t0 = time.time()
+
+    def fill() -> None:
+        nonlocal submitted
+        while len(pending) < workers * 2 and not (limit and submitted >= limit):
+            job = next(jobs, None)
+            if job is None:
+                return
+            path, digest, sig = job
+            pending[executor.submit(process_one, path, digest, out_root, fused)] = sig
+            submitted += 1
+
+    try:
+        n = 0
+        fill()
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                sig = pending.pop(fut)
+                rec = fut.result()
+                manifest.record({**rec, **sig})
+                n += 1
+                if rec["status"] == "done":
+                    ok += 1
+                else:
+                    failed += 1
+                # 남은 건수는 아직 해시 안 한 후보를 포함한 추정 (건너뛸 파일이 확인되면 줄어듦)
+                total = n + len(pending) + len(paths) - submitted - sum(skipped.values())
+                if limit:
+                    total = min(total, limit)
+                elapsed = time.time() - t0
+                rate = n / elapsed if elapsed > 0 else 0.0
+                eta = (total - n) / rate if rate else 0.0
+                tag = "ok  " if rec["status"] == "done" else "FAIL"
+                print(f"[{n}/{total}] {tag} {os.path.basename(rec['path'])} {rec['ms'] / 1000:.1f}s"
+                      f" | {rate * 60:.1f} files/min ETA {_fmt_eta(eta)}"
+                      + (f" | {rec['error']}" if rec["status"] != "done" else ""), flush=True)
+            fill()
+    except KeyboardInterrupt:
+        print("\n중단됨: 완료분은 매니페스트에 기록되어 있어 같은 명령으로 이어서 실행할 수 있습니다.", flush=True)
+        executor.shutdown(wait=False, cancel_futures=True)
+        manifest.close()
+        raise
+    executor.shutdown(wait=True)
+    manifest.close()
+
+    elapsed = time.time() - t0
+    print(f"완료 {ok}건, 실패 {failed}건, {elapsed:.1f}s ({(ok + failed) / max(elapsed, 1e-9) * 60:.1f} files/min)"
+          f" | 건너뜀: 완료 {skipped['done']}, 중복 {skipped['duplicate']}, 실패 {skipped['failed']}", flush=True)
+    return {"processed": ok + failed, "ok": ok, "failed": failed, "skipped": skipped, "elapsed_s": round(elapsed, 1)}
+
+# ---------------------- CLI ----------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="녹취 아카이브 일괄 처리 (중단 후 재개 가능)")
+    parser.add_argument("src", help="오디오 폴더 (하위 폴더 포함)")
+    parser.add_argument("--out", default=os.path.join(BASE_DIR, "results", "backfill"))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread",
+                        help="thread: 업스트림 대기가 대부분일 때, process: ffmpeg/CPU 부하가 클 때")
+    parser.add_argument("--manifest", help="기본 <out>/manifest.jsonl")
+    parser.add_argument("--fused", action="store_true", help="화자분리+추출 1회 호출 모드")
+    parser.add_argument("--no-retry-failed", action="store_true", help="이전에 실패한 파일은 건너뜀")
+    parser.add_argument("--limit", type=int, help="이번 실행에서 처리할 최대 건수")
+    args = parser.parse_args()
+    try:
+        backfill(args.src, args.out, args.workers, args.pool, args.manifest,
+                 fused=True if args.fused else None, retry_failed=not args.no_retry_failed, limit=args.limit)
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,117 @@
+# bench/bench_coerce.py
+# 추출 후처리 비용: 기존(_normalize_types 3회 + pydantic 재검증) vs 생성된 보정 함수 1회
+# 같은 입력에 대해 두 경로의 결과가 같은지도 함께 확인한다.
+import os, sys, time, random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "bench")  # extract 모듈 import 용 (호출 없음)
+
+from extract import KeywordsV1, prefill_from_rules, _merge_raw, _keywords_dict
+
+def legacy_normalize(data):
+    base = {
+        "building_agreement_count": 0, "building_structure": [], "building_usage_status": None,
+        "total_floor_area": 0.0, "soot_area": 0.0, "multi_use_flag": False, "fuel_type": None,
+        "fire_management_target_flag": None, "unit_temperature": 0.0, "unit_humidity": 0.0,
+        "unit_wind_speed": None, "facility_location": None, "forest_fire_flag": False,
+        "total_floor_count": 0, "vehicle_fire_flag": False, "ignition_material": None,
+        "special_fire_object_name": None, "wind_direction": None
+    }
+    base.update(data or {})
+    if not isinstance(base["building_structure"], list):
+        base["building_structure"] = [str(base["building_structure"])] if base["building_structure"] else []
+    for key in ["building_agreement_count", "total_floor_count"]:
+        try:
+            if base[key] is not None:
+                base[key] = int(base[key])
+        except Exception:
+            base[key] = 0
+    for key in ["total_floor_area", "soot_area", "unit_temperature", "unit_humidity"]:
+        try:
+            if base[key] is not None:
+                base[key] = float(base[key])
+        except Exception:
+            base[key] = 0.0
+    for key in ["multi_use_flag", "forest_fire_flag", "vehicle_fire_flag"]:
+        v = base.get(key)
+        base[key] = v.lower() in ["true", "1", "yes", "y"] if isinstance(v, str) else bool(v)
+    for key in ["building_usage_status", "fuel_type", "fire_management_target_flag",
+                "unit_wind_speed", "facility_location", "ignition_material",
+                "special_fire_object_name", "wind_direction"]:
+        v = base.get(key)
+        base[key] = str(v) if v not in [None, ""] else None
+    return base
+
+def legacy_post(rule, model_raw):
+    model_json = legacy_normalize(model_raw)
+    merged = legacy_normalize(_merge_raw(rule, model_json))
+    return KeywordsV1(**legacy_normalize(merged)).model_dump()
+
+def new_post(rule, model_raw):
+    return _keywords_dict(_merge_raw(rule, model_raw))
+
+# 모델 출력처럼 생긴 (타입이 들쭉날쭉한) dict
+VALUES = {
+    int: [None, 3, "6", "6층", 2.7, "", True, "3.5"],
+    float: [None, 1200, "35.5", "약 30", "", 0],
+    bool: [None, True, "true", "False", "Y", 0, 1, "예"],
+    str: [None, "", "옥내", 3, "3 m/s", "NW"],
+    list: [None, [], ["공장"], "창고", ["아파트", "상가"], "", [3], 0],
+}
+
+def _field_kind(name):
+    ann = KeywordsV1.model_fields[name].annotation
+    for kind in (bool, int, float):
+        if ann == (kind | None) or str(ann).endswith(f"[{kind.__name__}]"):
+            return kind
+    return list if "List" in str(ann) else str
+
+def corpus(n, seed=7):
+    rnd = random.Random(seed)
+    kinds = {f: _field_kind(f) for f in KeywordsV1.model_fields}
+    texts = ["여기 6층 건물 공장인데 불이 났어요", "지하 주차장 차량에서 연기", "산불이 났어요 습도 30% 바람 5m/s 북서풍", ""]
+    out = []
+    for _ in range(n):
+        model = {f: rnd.choice(VALUES[k]) for f, k in kinds.items() if rnd.random() < 0.7}
+        if rnd.random() < 0.2:
+            model["hazards"] = ["연기"]
+        out.append((prefill_from_rules(rnd.choice(texts)), model))
+    return out
+
+def main(n=20000):
+    data = corpus(n)
+    same = diff = legacy_err = 0
+    for rule, model in data:
+        new = new_post(rule, model)
+        try:
+            old = legacy_post(rule, model)
+        except Exception:
+            legacy_err += 1  # 기존 경로는 pydantic 검증 실패로 예외 (새 경로는 보정)
+            continue
+        if old == new:
+            same += 1
+        else:
+            diff += 1
+            print("불일치:", model, old, new)
+            break
+    print(f"equivalence: same={same} diff={diff} legacy_validation_errors={legacy_err}")
+
+    ok = [(r, m) for r, m in data if _safe(legacy_post, r, m)]
+    for name, fn in (("legacy", legacy_post), ("single-pass", new_post)):
+        t0 = time.perf_counter()
+        for r, m in ok:
+            fn(r, m)
+        us = (time.perf_counter() - t0) / len(ok) * 1e6
+        print(f"{name:<12} {us:8.2f} us/record")
+    if diff:
+        raise SystemExit(1)
+
+def _safe(fn, *a):
+    try:
+        fn(*a)
+        return True
+    except Exception:
+        return False
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,90 @@
+# bench/bench_fused.py
+# 모노 파이프라인: 화자분리 → 추출 (2회 호출) vs fused (1회 호출)
+# 실제 API 로 지연/토큰(usage)을 잰다. --offline 이면 호출 없이 추정 토큰과 호출 수만 비교.
+import os, sys, time, glob, json, types, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--offline", action="store_true")
+parser.add_argument("--diarize-mode", default="llm", choices=["llm", "auto"], help="2회 경로의 화자분리 방식")
+parser.add_argument("--repeat", type=int, default=1)
+args = parser.parse_args()
+if args.offline:
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+import upstream
+from diarize_llm import split_by_speaker
+from extract import extract_keywords
+from fused_extract import diarize_and_extract
+
+DIALOGUES = [
+    "119입니다. 무슨 일이세요? 불이 났어요! 여기 아파트 3층인데 연기가 많이 나요. 주소가 어디세요? "
+    "서울 강남구 역삼동 123번지요. 다친 사람 있나요? 아니요 없어요. 알겠습니다 출동하겠습니다. 침착하게 밖으로 대피하세요.",
+    "119 소방입니다. 네 여기 공장 창고에서 불이 났는데요. 건물이 몇 층이에요? 2층짜리 샌드위치 패널 건물이에요. "
+    "안에 사람 있습니까? 직원들은 다 나왔어요. 기름 냄새가 많이 나요. 알겠습니다 바로 출동합니다.",
+]
+
+def corpus():
+    texts = list(DIALOGUES)
+    for p in glob.glob(os.path.join(BASE, "results*", "**", "transcript.txt"), recursive=True):
+        with open(p, "r", encoding="utf-8") as f:
+            t = f.read().strip()
+        if t:
+            texts.append(t)
+    return texts
+
+# 스케줄러 호출을 가로채 호출 수/토큰을 기록
+_orig = upstream.SCHEDULER.create
+log = []
+
+def _fake(kwargs):
+    sysmsg = kwargs["messages"][0]["content"]
+    if "roles" in sysmsg:
+        n = kwargs["messages"][1]["content"].count("\n") + 1
+        content = json.dumps({"roles": ["CALLER"] * n, "keywords": {}})
+    elif "segments" in sysmsg:
+        content = json.dumps({"segments": [{"role": "CALLER", "text": kwargs["messages"][1]["content"]}]})
+    else:
+        content = "{}"
+    msg = types.SimpleNamespace(content=content)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=msg)], usage=None)
+
+def create(resource, est_tokens, **kwargs):
+    t0 = time.perf_counter()
+    resp = _fake(kwargs) if args.offline else _orig(resource, est_tokens, **kwargs)
+    usage = getattr(resp, "usage", None)
+    log.append({"ms": (time.perf_counter() - t0) * 1000, "est": est_tokens,
+                "prompt": getattr(usage, "prompt_tokens", None),
+                "completion": getattr(usage, "completion_tokens", None)})
+    return resp
+
+for mod in ("diarize_llm", "extract", "fused_extract"):
+    sys.modules[mod].SCHEDULER = types.SimpleNamespace(create=create)
+
+def two_call(t):
+    diar = split_by_speaker(t, args.diarize_mode)
+    extract_keywords(diar["merged"]["caller"] or t)
+
+def fused(t):
+    diarize_and_extract(t)
+
+def measure(fn, texts):
+    log.clear()
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for t in texts:
+            fn(t)
+    wall = (time.perf_counter() - t0) * 1000
+    n = len(texts) * args.repeat
+    tot = lambda k: sum(e[k] or 0 for e in log)
+    return {"calls/건": len(log) / n, "ms/건": wall / n, "est_tokens/건": tot("est") / n,
+            "prompt/건": tot("prompt") / n, "completion/건": tot("completion") / n}
+
+if __name__ == "__main__":
+    texts = corpus()
+    print(f"통화 {len(texts)}건 x {args.repeat}, {'offline(추정)' if args.offline else 'online'}")
+    for name, fn in ((f"2회({args.diarize_mode})", two_call), ("fused", fused)):
+        r = measure(fn, texts)
+        print(f"{name:10s} " + "  ".join(f"{k}={v:.1f}" for k, v in r.items()))
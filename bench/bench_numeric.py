@@ -0,0 +1,55 @@
+# bench/bench_numeric.py
+# 긴 전사문에서 수치 추출 처리량: 기존 개별 정규식 패스(숫자만) vs 단일 패스 토크나이저(한글 수사 포함)
+import os, re, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from numeric_tokenizer import first_numeric
+
+LEGACY_PATTERNS = [
+    (r"(\d+)\s*층", int),                                                     # app._extract_floor
+    (r"(\d+)\s*층\s*건물|(\d+)\s*층\b", int),
+    (r"연면적\s*([0-9,]+(?:\.\d+)?)\s*(?:㎡|m2|m²)?", float),
+    (r"(?:그을음|그을림)\s*([0-9,]+(?:\.\d+)?)\s*(?:㎡|m2|m²)", float),
+    (r"(?:온도|기온|온도는)\s*([0-9]+(?:\.\d+)?)\s*(?:도|℃)", float),
+    (r"(?:습도|습도는)\s*([0-9]+(?:\.\d+)?)\s*%", float),
+    (r"(?:풍속|바람)\s*([0-9]+(?:\.\d+)?)\s*m/?s", float),
+    (r"(?:세대|동의)\s*([0-9,]+)", int),
+]
+
+def legacy(text: str):
+    out = []
+    for pat, cast in LEGACY_PATTERNS:
+        m = re.search(pat, text)
+        if m:
+            out.append(cast(next(g for g in m.groups() if g).replace(",", "")))
+    return out
+
+SAMPLE = (
+    "여보세요. 네 지금 불이 나가지고요. 지금 여기 위치가 한국기술교육대학교 담원실학관이고요. "
+    "지금 불이 너무 많이 나는데 연기도 너무 많이 나고 연기는 하얀색이에요. "
+    "그리고 뭔가 좀 고무 타는 냄새도 많이 나고 여기 6층 건물입니다. 삼층에서 시작된 것 같아요. "
+    "연면적 1,200㎡ 정도 되고 그을음 50㎡ 정도 보여요. 온도는 이십 도, 습도 40% 바람 3m/s 북서풍이에요. "
+    "아파트 세대 120세대, 두 동이 붙어 있어요. 빨리 와주세요. "
+)
+
+def _bench(fn, text: str, rounds: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn(text)
+    return (time.perf_counter() - t0) / rounds
+
+def main():
+    print(f"{'chars':>8}{'legacy ms':>12}{'tokenizer ms':>14}{'tokenizer MB/s':>16}")
+    for reps in (1, 10, 100, 1000):
+        # 뒤쪽에만 수치가 있는 긴 통화 (앞부분은 수치 없는 잡담)
+        text = "네 네 알겠습니다 지금 가고 있어요. " * (reps * 10) + SAMPLE * reps
+        rounds = max(1, 2000 // reps)
+        lt = _bench(legacy, text, rounds)
+        tt = _bench(first_numeric, text, rounds)
+        mbps = len(text.encode("utf-8")) / tt / 1e6
+        print(f"{len(text):>8}{lt * 1000:>12.3f}{tt * 1000:>14.3f}{mbps:>16.1f}")
+    print("entities:", [(e.field, e.value) for e in first_numeric(SAMPLE).values()])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# bench/bench_results.py
+# 결과 JSON 폴링 1회당 전송 바이트/지연 비교 (기존 indent=2 + StaticFiles vs 압축 사이드카 + ETag)
+import os, sys, json, time, glob, tempfile, statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+from starlette.testclient import TestClient
+from results_store import PrecompressedStaticFiles, write_json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _sample_payload() -> dict:
+    paths = sorted(glob.glob(os.path.join(ROOT, "results", "*", "incident_*.json")))
+    with open(paths[0], "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _poll(client, url: str, n: int, headers: dict, revalidate: bool):
+    sizes, lat = [], []
+    etag = None
+    for _ in range(n):
+        h = dict(headers)
+        if revalidate and etag:
+            h["if-none-match"] = etag
+        t0 = time.perf_counter()
+        r = client.get(url, headers=h)
+        lat.append((time.perf_counter() - t0) * 1000)
+        etag = r.headers.get("etag")
+        # 실제 전송 바이트: content-length (304 면 0)
+        sizes.append(int(r.headers.get("content-length", 0)) if r.status_code == 200 else 0)
+    return statistics.mean(sizes), statistics.median(lat)
+
+def main(n: int = 200):
+    payload = _sample_payload()
+    with tempfile.TemporaryDirectory() as old_dir, tempfile.TemporaryDirectory() as new_dir:
+        with open(os.path.join(old_dir, "incident.json"), "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        write_json(os.path.join(new_dir, "incident.json"), payload)
+
+        app = Starlette(routes=[
+            Mount("/old", StaticFiles(directory=old_dir)),
+            Mount("/new", PrecompressedStaticFiles(directory=new_dir)),
+        ])
+        client = TestClient(app)
+        cases = [
+            ("기존 indent=2", "/old/incident.json", {"accept-encoding": "identity"}, False),
+            ("compact identity", "/new/incident.json", {"accept-encoding": "identity"}, False),
+            ("compact gzip", "/new/incident.json", {"accept-encoding": "gzip"}, False),
+            ("compact br/zstd/gzip", "/new/incident.json", {"accept-encoding": "br, zstd, gzip"}, False),
+            ("compact + ETag 304", "/new/incident.json", {"accept-encoding": "br, zstd, gzip"}, True),
+        ]
+        print(f"{'case':<24}{'bytes/poll':>12}{'p50 ms':>10}")
+        for name, url, headers, reval in cases:
+            size, p50 = _poll(client, url, n, headers, reval)
+            print(f"{name:<24}{size:>12.0f}{p50:>10.3f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
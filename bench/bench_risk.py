@@ -0,0 +1,60 @@
+# bench/bench_risk.py
+# 위험도 채점: 레코드 1건씩(simple_predict 방식) vs 특징 행렬 한 번에 (score_matrix)
+# 합성 레코드로 학습 → 저장 → mmap 로드까지 한 번 거쳐 산출물 경로도 확인한다.
+import os, sys, time, random, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from risk_model import FEATURES, RiskModel, train, features_from_nested
+
+def synth(n, seed=0):
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        floors = rnd.randint(1, 30)
+        area = rnd.choice([None, rnd.uniform(20, 5000)])
+        multi = rnd.choice(["Y", "N", None])
+        severe = (area or 0) > 2000 or multi == "Y" and rnd.random() < 0.6
+        out.append({
+            "numeric": {"total_floor_area": area, "soot_area": rnd.choice([None, rnd.uniform(0, 300)]),
+                        "total_floor_count": floors, "ignition_floor": rnd.randint(1, floors),
+                        "unit_temperature": rnd.uniform(-10, 35), "unit_humidity": rnd.uniform(10, 90),
+                        "casualty_count": 1 if severe and rnd.random() < 0.5 else 0,
+                        "property_damage_amount": 2e7 if severe else rnd.uniform(0, 5e6)},
+            "info": {"multi_use_flag": multi, "unit_wind_speed": f"{rnd.uniform(0, 10):.1f}m/s"},
+        })
+    return out
+
+def main(n=20000):
+    recs = synth(n)
+    t0 = time.perf_counter()
+    model = train(recs)
+    t_train = time.perf_counter() - t0
+    with tempfile.TemporaryDirectory() as d:
+        model.save(d, {})
+        loaded = RiskModel.load(d)
+        X = np.array([features_from_nested(r) for r in recs])
+
+        t0 = time.perf_counter()
+        single = [float(loaded.score_matrix(X[i:i + 1])[0]) for i in range(n)]
+        t_single = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        batch = loaded.score_matrix(X)
+        t_batch = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        loaded.score_nested(recs)
+        t_e2e = time.perf_counter() - t0
+
+        assert np.allclose(single, batch)
+        y = np.array([1.0 if (r["numeric"]["property_damage_amount"] >= 1e7) else 0.0 for r in recs])
+        acc = float(((batch >= 0.5) == y).mean())
+    print(f"records={n} features={len(FEATURES)} train={t_train:.2f}s acc={acc:.3f}")
+    print(f"1건씩       : {t_single * 1e6 / n:8.2f} us/건")
+    print(f"행렬 한 번  : {t_batch * 1e6 / n:8.3f} us/건  (x{t_single / t_batch:.0f})")
+    print(f"특징추출 포함: {t_e2e * 1e6 / n:8.2f} us/건")
+
+if __name__ == "__main__":
+    main()
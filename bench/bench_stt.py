@@ -0,0 +1,84 @@
+# bench/bench_stt.py
+# STT 백엔드 비교: 원격(openai) vs 로컬 CPU(faster-whisper)
+#   python bench/bench_stt.py                          # samples/ 의 원본 오디오, 사용 가능한 백엔드 전부
+#   python bench/bench_stt.py a.wav b.m4a --backends local --concurrency 4
+# 지표: 파일별 지연(ms)과 RTF(처리 시간 / 오디오 길이, 1 미만이면 실시간보다 빠름),
+#       동시 실행 시 전체 처리량 RTF (로컬은 모델 공유 + 배치 디코딩 효과)
+import os, sys, glob, time, shutil, argparse, tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+parser = argparse.ArgumentParser(description="STT 백엔드 RTF/지연 비교")
+parser.add_argument("files", nargs="*")
+parser.add_argument("--backends", default="openai,local")
+parser.add_argument("--concurrency", type=int, default=4, help="동시 실행 측정 시 스레드 수 (0 이면 생략)")
+args = parser.parse_args()
+if "openai" not in args.backends.split(","):
+    os.environ.setdefault("OPENAI_API_KEY", "bench")  # 로컬만 잴 때는 키 없이 (호출 없음)
+
+from stt import BACKENDS, transcribe
+
+def default_files():
+    files = []
+    for ext in ("wav", "m4a", "mp3"):
+        files += glob.glob(os.path.join(BASE, "samples", f"*.{ext}"))
+    return sorted(f for f in files if not f.endswith("_fixed.wav"))  # 변환 산출물 제외
+
+def staged(files, tmp):
+    """ffmpeg 변환 산출물이 원본 폴더에 생기지 않게 임시 폴더로 복사"""
+    out = []
+    for i, f in enumerate(files):
+        dst = os.path.join(tmp, f"{i}_{os.path.basename(f)}")
+        shutil.copyfile(f, dst)
+        out.append(dst)
+    return out
+
+def sequential(backend, files):
+    rows = []
+    for f in files:
+        res = transcribe(f, backend=backend)["stt"]
+        rows.append((os.path.basename(f).split("_", 1)[1], res["audio_s"], res["latency_ms"], res["rtf"]))
+    return rows
+
+def concurrent(backend, files, n):
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n) as ex:
+        results = list(ex.map(lambda f: transcribe(f, backend=backend)["stt"], files))
+    wall = time.perf_counter() - t0
+    audio = sum(r["audio_s"] for r in results)
+    lat = sorted(r["latency_ms"] for r in results)
+    return {"wall_s": wall, "audio_s": audio, "rtf": wall / audio if audio else 0.0,
+            "p50_ms": lat[len(lat) // 2], "max_ms": lat[-1]}
+
+if __name__ == "__main__":
+    files = args.files or default_files()
+    if not files:
+        print("오디오 파일이 없습니다.")
+        sys.exit(1)
+    tmp = tempfile.mkdtemp(prefix="bench_stt_")
+    try:
+        files = staged(files, tmp)
+        for name in args.backends.split(","):
+            b = BACKENDS.get(name)
+            if b is None or not b.available():
+                print(f"[{name}] 사용 불가 (건너뜀)")
+                continue
+            if name == "local":
+                t0 = time.perf_counter()
+                b.load()  # 모델 로드는 프로세스당 1회: 요청 지연과 분리해서 보고
+                print(f"[local] 모델 로드 {time.perf_counter() - t0:.1f}s ({b.model_name}, {b.compute_type})")
+            print(f"[{name}] 순차")
+            rows = sequential(name, files)
+            for fname, audio_s, ms, rtf in rows:
+                print(f"  {fname:24s} 오디오 {audio_s:7.1f}s  지연 {ms:7d}ms  RTF {rtf or 0:.3f}")
+            tot_audio = sum(r[1] for r in rows)
+            tot_ms = sum(r[2] for r in rows)
+            print(f"  합계 RTF {tot_ms / 1000 / tot_audio if tot_audio else 0:.3f}")
+            if args.concurrency:
+                c = concurrent(name, files * args.concurrency, args.concurrency)
+                print(f"[{name}] 동시 {args.concurrency}: {len(files) * args.concurrency}건 {c['wall_s']:.1f}s, "
+                      f"처리량 RTF {c['rtf']:.3f}, 지연 p50 {c['p50_ms']}ms / max {c['max_ms']}ms")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
@@ -0,0 +1,179 @@
+# bench/micro.py
+# 순수 파이썬 핫패스 마이크로벤치 + 기준선 비교
+#   python bench/micro.py run                 # 측정만
+#   python bench/micro.py save                # bench/baselines.json 갱신
+#   python bench/micro.py compare [--threshold 0.15]   # 기준선 대비 threshold 를 넘게 벗어나면 종료코드 1
+# save/compare 모두 전체를 --repeats 번 돌려 케이스별 최고 ops/s, 최저 peak_kb 를 쓴다 (같은 추정치끼리 비교)
+# 지표: ops/s (호출/초), peak_kb (코퍼스 1회전 중 tracemalloc 최고치),
+#       retained_blocks (1회전 후에도 남은 메모리 블록 수: 캐시/누수 증가 감지)
+import os, sys, json, time, argparse, platform, tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+os.environ.setdefault("OPENAI_API_KEY", "bench")  # extract/app import 용 (호출 없음)
+
+from extract import prefill_from_rules, merge_rule_and_model, _normalize_types, _safe_json_extract
+from mapper import to_fire_incident_nested
+from app import transcript_to_standard
+
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baselines.json")
+
+# ---------------------- 코퍼스 ----------------------
+def _load(name: str) -> List[Any]:
+    with open(os.path.join(CORPUS_DIR, name), "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def transcripts() -> Dict[str, List[str]]:
+    real = [r["text"] for r in _load("transcripts.jsonl")]
+    long = [" ".join(real) * 8]                       # 30분 통화 규모 (~20k자)
+    adversarial = [
+        "1" * 5000,                                   # 숫자만 긴 토큰
+        "층" * 3000 + "일이삼사오육칠팔구십" * 300,    # 수사/단위 반복
+        "연면적 " * 2000 + "㎡",                       # 트리거만 반복
+        "".join(chr(0xAC00 + (i * 7919) % 11172) for i in range(8000)),  # 무작위 한글
+    ]
+    return {"realistic": real, "long": long, "adversarial": adversarial}
+
+def model_outputs() -> Dict[str, List[str]]:
+    real = [r["text"] for r in _load("model_outputs.jsonl")]
+    long = ["설명 " * 2000 + real[0] + " 끝" * 2000]
+    adversarial = ["{" * 20000, '{"a":' * 5000, "{bad} " * 3000 + real[0], "}" * 10000 + "{"]
+    return {"realistic": real, "long": long, "adversarial": adversarial}
+
+def raw_records() -> Dict[str, List[Dict[str, Any]]]:
+    real = _load("raw_records.jsonl")
+    adversarial = [{k: (v * 200 if isinstance(v, str) else v) for k, v in real[0].items()},
+                   {k: "" for k in real[0]}, {k: "null" for k in real[0]}]
+    return {"realistic": real, "adversarial": adversarial}
+
+def keyword_pairs() -> Dict[str, List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+    rules = [prefill_from_rules(t) for t in transcripts()["realistic"]]
+    models = [_safe_json_extract(m) for m in model_outputs()["realistic"]]
+    real = [(r, models[i % len(models)]) for i, r in enumerate(rules)]
+    big = {"building_structure": [f"구조{i}" for i in range(500)], "total_floor_count": "12층"}
+    return {"realistic": real, "adversarial": [(big, big), ({}, {"building_structure": "목조, 철골"})]}
+
+# ---------------------- 대상 ----------------------
+def cases() -> List[Tuple[str, Callable[[Any], Any], List[Any]]]:
+    out = []
+    for kind, items in transcripts().items():
+        out.append((f"prefill_from_rules[{kind}]", prefill_from_rules, items))
+        out.append((f"transcript_to_standard[{kind}]",
+                    lambda t: transcript_to_standard(t, 1, "2024-01-01 00:00:00"), items))
+    for kind, items in model_outputs().items():
+        out.append((f"_safe_json_extract[{kind}]", _safe_json_extract, items))
+    for kind, items in keyword_pairs().items():
+        out.append((f"merge_rule_and_model[{kind}]", lambda p: merge_rule_and_model(p[0], p[1]), items))
+        out.append((f"_normalize_types[{kind}]", lambda p: _normalize_types(p[1]), items))
+    for kind, items in raw_records().items():
+        out.append((f"to_fire_incident_nested[{kind}]", to_fire_incident_nested, items))
+    return out
+
+# ---------------------- 측정 ----------------------
+def measure(fn: Callable[[Any], Any], items: List[Any], min_time: float, rounds: int = 5) -> Dict[str, float]:
+    for x in items:  # 워밍업 (정규식 컴파일/캐시)
+        fn(x)
+    best = 0.0
+    for _ in range(rounds):  # 라운드 중 최고치: 스케줄링/GC 잡음 제거
+        calls, t0 = 0, time.perf_counter()
+        while True:
+            for x in items:
+                fn(x)
+            calls += len(items)
+            elapsed = time.perf_counter() - t0
+            if elapsed >= min_time:
+                break
+        best = max(best, calls / elapsed)
+
+    # 메모리는 따로 1회전 (tracemalloc 은 실행을 크게 느리게 하므로 시간 측정과 분리)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    for x in items:
+        fn(x)
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(s.count_diff for s in after.compare_to(before, "filename") if s.count_diff > 0)
+    return {"ops_per_sec": round(best, 1), "peak_kb": round((peak - base) / 1024, 1),
+            "retained_blocks": retained}
+
+def run_all(min_time: float, only: str = "", repeats: int = 1) -> Dict[str, Dict[str, float]]:
+    """
+    전체 케이스를 repeats 바퀴 돌며 케이스별 최고 ops/s, 최저 peak_kb/retained_blocks 를 취함.
+    같은 케이스를 연달아 재지 않고 바퀴마다 섞어 재므로, 잠깐 느려진 구간이 한 케이스 측정을 독차지하지 않는다
+    """
+    todo = [c for c in cases() if not only or only in c[0]]
+    runs: Dict[str, List[Dict[str, float]]] = {name: [] for name, _, _ in todo}
+    for _ in range(max(1, repeats)):
+        for name, fn, items in todo:
+            runs[name].append(measure(fn, items, min_time))
+    results = {}
+    for name, rs in runs.items():
+        results[name] = r = {"ops_per_sec": max(x["ops_per_sec"] for x in rs),
+                             "peak_kb": min(x["peak_kb"] for x in rs),
+                             "retained_blocks": min(x["retained_blocks"] for x in rs)}
+        print(f"{name:42s} {r['ops_per_sec']:>12,.1f} ops/s {r['peak_kb']:>10,.1f} KB peak "
+              f"{r['retained_blocks']:>6d} blk", flush=True)
+    return results
+
+# ---------------------- 비교 ----------------------
+def compare(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """
+    ops/s 또는 peak_kb 가 기준선에서 threshold 넘게 벗어나면 실패.
+    빨라진 쪽도 실패로 본다 (기준선이 낡았거나 잡음이 큰 것: save 로 다시 잡아야 함).
+    peak_kb 는 1KB 미만 기준선도 1KB 를 분모로 비교
+    """
+    regressions = []
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:42s} (기준선 없음)")
+            continue
+        speed = cur["ops_per_sec"] / base["ops_per_sec"] - 1 if base["ops_per_sec"] else 0.0
+        mem = cur["peak_kb"] / max(base["peak_kb"], 1.0) - 1
+        flags = []
+        if speed < -threshold:
+            flags.append(f"속도 {speed:+.0%}")
+        elif speed > threshold:
+            flags.append(f"속도 {speed:+.0%} (기준선 갱신 필요)")
+        if mem > threshold:
+            flags.append(f"메모리 {mem:+.0%}")
+        if cur["retained_blocks"] > base["retained_blocks"] + 100:
+            flags.append(f"잔류블록 +{cur['retained_blocks'] - base['retained_blocks']}")
+        mark = "이탈: " + ", ".join(flags) if flags else "ok"
+        print(f"{name:42s} 속도 {speed:+6.1%}  메모리 {mem:+6.1%}  {mark}")
+        if flags:
+            regressions.append(name)
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="핫패스 마이크로벤치")
+    parser.add_argument("cmd", choices=["run", "save", "compare"])
+    parser.add_argument("--min-time", type=float, default=0.1, help="라운드당 최소 측정 시간(초), 케이스당 5라운드")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--repeats", type=int, default=3, help="케이스당 반복 측정 수 (최고치 사용)")
+    parser.add_argument("--only", default="", help="이름에 포함된 케이스만")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    current = run_all(args.min_time, args.only, args.repeats)
+    if args.cmd == "save":
+        data = {"python": platform.python_version(), "machine": platform.machine(),
+                "min_time": args.min_time, "repeats": args.repeats, "results": current}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print("저장:", args.baseline)
+    elif args.cmd == "compare":
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("python") != platform.python_version():
+            print(f"주의: 기준선은 Python {data.get('python')} 에서 측정됨")
+        print()
+        bad = compare(current, data.get("results", {}), args.threshold)
+        print(f"\n기준선 이탈 {len(bad)}건" if bad else "\n기준선 이내")
+        sys.exit(1 if bad else 0)
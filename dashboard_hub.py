@@ -0,0 +1,155 @@
+# dashboard_hub.py
+import json, asyncio, threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+# ---------------------- JSON Patch (RFC 6902) ----------------------
+def _escape(key: Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+def json_diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """old → new 로 가는 최소한의 add/remove/replace 연산"""
+    if type(old) is dict and type(new) is dict:
+        ops: List[Dict[str, Any]] = []
+        for k in old:
+            if k not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(k)}"})
+        for k, v in new.items():
+            p = f"{path}/{_escape(k)}"
+            if k not in old:
+                ops.append({"op": "add", "path": p, "value": v})
+            elif old[k] != v or type(old[k]) is not type(v):
+                ops.extend(json_diff(old[k], v, p))
+        return ops
+    if type(old) is list and type(new) is list:
+        n = len(old)
+        if len(new) >= n and new[:n] == old:
+            # transcript_turns 처럼 뒤에 붙기만 하는 목록
+            return [{"op": "add", "path": f"{path}/-", "value": v} for v in new[n:]]
+        if len(new) == n:
+            ops = []
+            for i, (a, b) in enumerate(zip(old, new)):
+                if a != b or type(a) is not type(b):
+                    ops.extend(json_diff(a, b, f"{path}/{i}"))
+            return ops
+        return [{"op": "replace", "path": path, "value": new}]
+    if old == new and type(old) is type(new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+# ---------------------- 허브 ----------------------
+class Subscriber:
+    """구독자 하나. 큐가 가득 차면 밀린 패치를 버리고 최신 스냅샷 한 건으로 대체"""
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, maxsize: int):
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+class DashboardHub:
+    """
+    incident_id 별 인프로세스 pub/sub.
+    - publish: 직전 스냅샷과의 JSON Patch 를 한 번만 직렬화해 모든 구독자에게 전달
+    - 느린 구독자: 큐가 차면 큐를 비우고 스냅샷으로 재동기화 (drop-to-snapshot)
+    - 스냅샷은 최근 max_incidents 건만 보관
+    """
+
+    def __init__(self, queue_size: int = 32, max_incidents: int = 1024):
+        self.queue_size = queue_size
+        self.max_incidents = max_incidents
+        self._snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._snap_len: Dict[str, int] = {}   # 마지막으로 만든 스냅샷 메시지 길이 (패치/스냅샷 크기 비교용 추정치)
+        self._subs: Dict[str, Set[Subscriber]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def bind_loop(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        self._loop = loop
+
+    def _snapshot_msg(self, incident_id: str) -> str:
+        msg = _dumps({"type": "snapshot", "incident_id": incident_id,
+                      "version": self._versions.get(incident_id, 0),
+                      "payload": self._snapshots.get(incident_id)})
+        self._snap_len[incident_id] = len(msg)
+        return msg
+
+    def _deliver(self, sub: Subscriber, incident_id: str, msg: str) -> None:
+        try:
+            sub.queue.put_nowait(msg)
+        except asyncio.QueueFull:
+            while not sub.queue.empty():
+                sub.queue.get_nowait()
+            sub.dropped += 1
+            sub.queue.put_nowait(self._snapshot_msg(incident_id))
+
+    def publish(self, incident_id: str, payload: Dict[str, Any]) -> int:
+        """이벤트 루프 스레드에서 호출. 새 버전 번호 반환 (payload 는 이후 수정하지 말 것: 다음 diff 의 기준)"""
+        incident_id = str(incident_id)
+        with self._lock:
+            prev = self._snapshots.get(incident_id)
+            version = self._versions.get(incident_id, 0) + 1
+            self._versions[incident_id] = version
+            self._snapshots[incident_id] = payload
+            self._snapshots.move_to_end(incident_id)
+            while len(self._snapshots) > self.max_incidents:
+                old_id, _ = self._snapshots.popitem(last=False)
+                self._snap_len.pop(old_id, None)
+                if not self._subs.get(old_id):
+                    self._versions.pop(old_id, None)
+            subs = list(self._subs.get(incident_id, ()))
+        if not subs:
+            return version
+
+        if prev is None:
+            msg = self._snapshot_msg(incident_id)
+        else:
+            ops = json_diff(prev, payload)
+            if not ops:
+                return version
+            msg = _dumps({"type": "patch", "incident_id": incident_id, "version": version, "ops": ops})
+            # 패치가 더 크면 스냅샷이 이득. 스냅샷 직렬화는 패치가 직전 스냅샷 크기에 가까울 때만
+            if len(msg) * 2 >= self._snap_len.get(incident_id, 0):
+                snap = self._snapshot_msg(incident_id)
+                if len(msg) >= len(snap):
+                    msg = snap
+        for sub in subs:
+            self._deliver(sub, incident_id, msg)
+        return version
+
+    def publish_threadsafe(self, incident_id: str, payload: Dict[str, Any]) -> None:
+        """워커 스레드(run() 등)에서 호출"""
+        if self._loop is None:
+            self.publish(incident_id, payload)  # 루프 없음(CLI 등): 스냅샷만 갱신
+        else:
+            self._loop.call_soon_threadsafe(self.publish, incident_id, payload)
+
+    def subscribe(self, incident_id: str) -> Subscriber:
+        incident_id = str(incident_id)
+        sub = Subscriber(self.queue_size)
+        with self._lock:
+            self._subs.setdefault(incident_id, set()).add(sub)
+            has_snapshot = incident_id in self._snapshots
+        if has_snapshot:
+            sub.queue.put_nowait(self._snapshot_msg(incident_id))
+        return sub
+
+    def unsubscribe(self, incident_id: str, sub: Subscriber) -> None:
+        incident_id = str(incident_id)
+        with self._lock:
+            subs = self._subs.get(incident_id)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[incident_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"incidents": len(self._snapshots),
+                    "subscribers": sum(len(s) for s in self._subs.values()),
+                    "dropped_to_snapshot": sum(s.dropped for subs in self._subs.values() for s in subs)}
+
+HUB = DashboardHub()
@@ -0,0 +1,87 @@
+# deadline.py
+import time, asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, Optional
+
+class DeadlineExceeded(TimeoutError):
+    """요청 전체 마감 초과 (어느 단계에서 끊겼는지 stage 로 표시)"""
+
+    def __init__(self, stage: str = ""):
+        super().__init__(f"마감 초과: {stage}" if stage else "마감 초과")
+        self.stage = stage
+
+class Deadline:
+    """monotonic 기준 절대 마감 + 단계별 소요/상태 기록"""
+
+    def __init__(self, seconds: float):
+        self.budget = float(seconds)
+        self.start = time.monotonic()
+        self.at = self.start + self.budget
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def remaining(self) -> float:
+        return max(0.0, self.at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.at
+
+    def mark(self, stage: str, status: str, t0: float) -> None:
+        self.stages[stage] = {"status": status, "ms": int((time.monotonic() - t0) * 1000)}
+
+    async def run(self, stage: str, aw: Awaitable[Any]) -> Any:
+        """남은 예산 안에서 await. 초과 시 DeadlineExceeded (단계 상태는 stages 에 남음)"""
+        t0 = time.monotonic()
+        rem = self.remaining()
+        if rem <= 0:
+            if asyncio.iscoroutine(aw):
+                aw.close()  # 시작도 못 한 코루틴: "never awaited" 경고 방지
+            self.mark(stage, "skipped", t0)
+            raise DeadlineExceeded(stage)
+        try:
+            out = await asyncio.wait_for(aw, rem)
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            self.mark(stage, "timeout", t0)
+            raise DeadlineExceeded(stage)
+        except Exception:
+            self.mark(stage, "error", t0)
+            raise
+        self.mark(stage, "ok", t0)
+        return out
+
+    def summary(self) -> Dict[str, Any]:
+        return {"budget_ms": int(self.budget * 1000),
+                "elapsed_ms": int((time.monotonic() - self.start) * 1000),
+                "complete": all(s["status"] == "ok" for s in self.stages.values()),
+                "stages": dict(self.stages)}
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """
+    이 블록(과 여기서 띄운 스레드풀 작업/태스크) 의 업스트림 호출·ffmpeg 가 남은 예산을 타임아웃으로 씀.
+    바깥에 더 이른 마감이 있으면 그쪽을 유지
+    """
+    outer = _current.get()
+    dl = Deadline(seconds if outer is None else min(seconds, outer.remaining()))
+    token = _current.set(dl)
+    try:
+        yield dl
+    finally:
+        _current.reset(token)
+
+def current() -> Optional[Deadline]:
+    return _current.get()
+
+def remaining() -> Optional[float]:
+    """남은 초. 마감이 없으면 None"""
+    dl = _current.get()
+    return None if dl is None else dl.remaining()
+
+def check(stage: str) -> Optional[float]:
+    """남은 초 반환, 이미 지났으면 DeadlineExceeded (동기 단계 시작 전 확인용)"""
+    rem = remaining()
+    if rem is not None and rem <= 0:
+        raise DeadlineExceeded(stage)
+    return rem
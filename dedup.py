@@ -0,0 +1,214 @@
+# dedup.py
+import os, json, asyncio, hashlib, threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+CHUNK_SIZE = 1 << 20  # 1MiB 단위 스트리밍
+
+# ---------------------- 해시 ----------------------
+def hash_file(path: str) -> str:
+    """파일 내용 sha256 (백필/재처리용)"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+async def save_upload_hashed(upload, dst_path: str) -> Tuple[str, int]:
+    """
+    UploadFile → 디스크로 청크 단위 저장하면서 동시에 sha256 계산.
+    전체를 메모리에 올리지 않는다. (digest, size) 반환
+    """
+    h = hashlib.sha256()
+    size = 0
+    with open(dst_path, "wb") as f:
+        while True:
+            chunk = await upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            h.update(chunk)
+            f.write(chunk)
+            size += len(chunk)
+    return h.hexdigest(), size
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+# ---------------------- 결과 캐시 ----------------------
+class ContentCache:
+    """
+    내용 해시 → 완료된 결과(JSON 직렬화 가능한 dict) 캐시.
+    - 메모리: LRU, 최대 max_items 개
+    - 디스크: <root>/<namespace>/<hash>.json, 총 max_disk_bytes 초과 시 오래 안 쓴 것(mtime)부터 삭제
+    """
+
+    def __init__(self, root: str, max_items: int = 512, max_disk_bytes: int = 256 << 20):
+        self.root = root
+        self.max_items = max_items
+        self.max_disk_bytes = max_disk_bytes
+        self._mem: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, namespace: str, digest: str) -> str:
+        return os.path.join(self.root, namespace, f"{digest}.json")
+
+    def get(self, namespace: str, digest: str) -> Optional[Dict[str, Any]]:
+        key = f"{namespace}:{digest}"
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return self._mem[key]
+        path = self._path(namespace, digest)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path, None)  # LRU 갱신
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, namespace: str, digest: str, value: Dict[str, Any]) -> None:
+        key = f"{namespace}:{digest}"
+        path = self._path(namespace, digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._remember(key, value)
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data)
+        self._evict_disk()
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+
+    def _scan_disk(self):
+        entries = []
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                p = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+        return entries
+
+    def _evict_disk(self) -> None:
+        with self._lock:
+            if self._disk_bytes is not None and self._disk_bytes <= self.max_disk_bytes:
+                return
+        entries = self._scan_disk()
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_disk_bytes:
+            entries.sort()  # 오래된 mtime 부터
+            for _, size, p in entries:
+                if total <= self.max_disk_bytes * 0.9:  # 여유를 두고 정리
+                    break
+                try:
+                    os.remove(p)
+                    total -= size
+                except OSError:
+                    pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"mem_items": len(self._mem), "disk_bytes": self._disk_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+# ---------------------- 동시 요청 합치기 ----------------------
+class InflightCoalescer:
+    """
+    같은 키로 동시에 들어온 요청은 첫 요청만 실제 작업을 하고,
+    나머지는 그 결과(또는 예외)를 함께 기다린다.
+    작업은 별도 태스크로 돌리므로 첫 요청이 취소돼도(연결 끊김/마감) 남은 대기자는 결과를 받는다
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, "asyncio.Future"] = {}
+        self.coalesced = 0
+
+    def peek(self, key: str) -> Optional["asyncio.Future"]:
+        """진행 중인 작업의 future (없으면 None)"""
+        return self._inflight.get(key)
+
+    async def run(self, key: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(work())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: "asyncio.Future") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 대기자가 모두 떠났을 때 "never retrieved" 경고 방지
+
+async def cached_call(cache: ContentCache, coalescer: InflightCoalescer,
+                      namespace: str, digest: str,
+                      work: Callable[[], Awaitable[Dict[str, Any]]],
+                      keep: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Tuple[Dict[str, Any], bool]:
+    """
+    캐시 조회 → 없으면 합치기(coalesce)로 1회만 실행 후 저장. (결과, 캐시적중 여부)
+    keep(value) 가 False 면 저장하지 않음 (일시적으로 품질을 낮춘 결과 등)
+    """
+    hit = cache.get(namespace, digest)
+    if hit is not None:
+        return hit, True
+
+    async def _do():
+        again = cache.get(namespace, digest)  # 대기 중 다른 요청이 채웠을 수 있음
+        if again is not None:
+            return again
+        value = await work()
+        if keep is None or keep(value):
+            cache.put(namespace, digest, value)
+        return value
+
+    value = await coalescer.run(f"{namespace}:{digest}", _do)
+    return value, False
+
+async def cached_call_within(cache: ContentCache, coalescer: InflightCoalescer,
+                             namespace: str, digest: str,
+                             work: Callable[[], Awaitable[Dict[str, Any]]],
+                             timeout: float,
+                             keep: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Tuple[Dict[str, Any], bool]:
+    """
+    마감 있는 요청용 cached_call. 캐시와 진행 중 작업은 공유하되(대기는 timeout 까지, shield),
+    자기 작업은 합치기에 등록하지 않는다 → 시간 초과 취소가 마감 없는 다른 대기자에게 번지지 않음
+    """
+    hit = cache.get(namespace, digest)
+    if hit is not None:
+        return hit, True
+    fut = coalescer.peek(f"{namespace}:{digest}")
+    if fut is not None:
+        coalescer.coalesced += 1
+        return await asyncio.wait_for(asyncio.shield(fut), timeout), False
+    value = await asyncio.wait_for(work(), timeout)
+    if keep is None or keep(value):
+        cache.put(namespace, digest, value)
+    return value, False
@@ -1,10 +1,12 @@
 # diarize_llm.py
-import os, json
+import os, json, threading
 from dotenv import load_dotenv
 from openai import OpenAI
+from upstream import SCHEDULER, estimate_tokens
+from role_classifier import get_classifier, split_turns
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
 
 SYSTEM = """너는 119 신고 통화의 자막을 보고,
 각 발화를 CALLER(신고자) 또는 OPERATOR(접수자)로 라벨링한다.
@@ -20,13 +22,69 @@ JSON만 출력:
 }
 """
 
-def split_by_speaker(transcript: str) -> dict:
-    resp = client.chat.completions.create(
+ESCALATE_SYSTEM = """너는 119 신고 통화의 발화 목록을 보고 지정된 번호의 발화만
+CALLER(신고자) 또는 OPERATOR(접수자)로 라벨링한다.
+규칙: 질문/확인/안내는 OPERATOR, 상황 설명/도움 요청은 CALLER.
+JSON만 출력: {"labels": {"번호": "CALLER"|"OPERATOR"}}
+"""
+
+# 통화 단위 통계: 전부 로컬 확정 / LLM 보조 / 전체 LLM
+_STATS = {"calls": 0, "resolved_locally": 0, "escalated_calls": 0, "llm_calls": 0,
+          "turns": 0, "escalated_turns": 0}
+_STATS_LOCK = threading.Lock()
+
+def _count(**kw) -> None:
+    with _STATS_LOCK:
+        for k, v in kw.items():
+            _STATS[k] += v
+
+def stats() -> dict:
+    with _STATS_LOCK:
+        out = dict(_STATS)
+    out["local_ratio"] = round(out["resolved_locally"] / out["calls"], 3) if out["calls"] else None
+    out["model"] = get_classifier().source
+    return out
+
+def _merged(data: dict) -> dict:
+    caller = " ".join(s.get("text","") for s in data.get("segments",[]) if s.get("role")=="CALLER")
+    operator = " ".join(s.get("text","") for s in data.get("segments",[]) if s.get("role")=="OPERATOR")
+    data["merged"] = {"caller": caller.strip(), "operator": operator.strip()}
+    return data
+
+def _escalate(turns: list, idxs: list) -> dict:
+    """불확실한 발화만 라벨 요청. 전체 목록은 문맥으로만 주고 출력은 번호→역할 뿐이라 출력 토큰이 작다"""
+    listing = "\n".join(f"{i}. {t}" for i, t in enumerate(turns))
+    user = f"발화 목록:\n{listing}\n\n라벨이 필요한 번호: {', '.join(map(str, idxs))}"
+    messages = [
+        {"role": "system", "content": ESCALATE_SYSTEM},
+        {"role": "user", "content": user}
+    ]
+    resp = SCHEDULER.create(
+        client.chat.completions,
+        est_tokens=estimate_tokens(messages, max_output=16 * len(idxs) + 32),
         model="gpt-4o-mini",
-        messages=[
-            {"role":"system","content": SYSTEM},
-            {"role":"user","content": transcript}
-        ],
+        messages=messages,
+        temperature=0
+    )
+    raw = (resp.choices[0].message.content or "").strip()
+    try:
+        labels = json.loads(raw[raw.find("{"):raw.rfind("}") + 1]).get("labels") or {}
+    except (ValueError, AttributeError):
+        return {}
+    return {int(k): v for k, v in labels.items() if str(k).isdigit() and v in ("CALLER", "OPERATOR")}
+
+def split_by_speaker_llm(transcript: str) -> dict:
+    """기존 방식: 전사문 전체를 LLM 이 다시 써서 라벨링"""
+    messages = [
+        {"role":"system","content": SYSTEM},
+        {"role":"user","content": transcript}
+    ]
+    # 화자분리 출력은 입력 전사문을 거의 그대로 되풀이하므로 출력 여유를 크게 잡음
+    resp = SCHEDULER.create(
+        client.chat.completions,
+        est_tokens=estimate_tokens(messages, max_output=len(transcript) + 256),
+        model="gpt-4o-mini",
+        messages=messages,
         temperature=0.2
     )
     raw = resp.choices[0].message.content.strip()
@@ -34,16 +92,43 @@ def split_by_speaker(transcript: str) -> dict:
         data = json.loads(raw)
     except Exception:
         data = {"segments":[{"role":"CALLER","text":transcript,"start":None,"end":None}]}
+    _count(calls=1, llm_calls=1)
+    return _merged(data)
 
-    caller = " ".join(s.get("text","") for s in data.get("segments",[]) if s.get("role")=="CALLER")
-    operator = " ".join(s.get("text","") for s in data.get("segments",[]) if s.get("role")=="OPERATOR")
-    data["merged"] = {"caller": caller.strip(), "operator": operator.strip()}
-    return data
+def split_by_speaker(transcript: str, mode: str = None) -> dict:
+    """
+    mode (기본 DIARIZE_MODE 환경변수, 없으면 "auto"):
+    - "auto": 로컬 분류기로 라벨링, 확신 낮은 발화만 LLM 에 넘김
+    - "local": LLM 호출 없음
+    - "llm": 기존 전체 LLM 라벨링
+    """
+    mode = mode or os.getenv("DIARIZE_MODE", "auto")
+    if mode == "llm":
+        return split_by_speaker_llm(transcript)
+
+    turns = split_turns(transcript)
+    if not turns:
+        _count(calls=1, resolved_locally=1)
+        return _merged({"segments": []})
+    labeled = get_classifier().classify(turns)
+    unsure = [i for i, r in enumerate(labeled) if not r["confident"]]
+    escalated = mode == "auto" and bool(unsure)
+    if escalated:
+        labels = _escalate(turns, unsure)
+        for i in unsure:
+            if i in labels:
+                labeled[i]["role"] = labels[i]
+    _count(calls=1, turns=len(turns), escalated_turns=len(unsure) if escalated else 0,
+           escalated_calls=int(escalated), resolved_locally=int(not escalated))
+
+    segments = [{"role": r["role"], "text": r["text"], "start": None, "end": None} for r in labeled]
+    return _merged({"segments": segments,
+                    "diarization": {"mode": mode, "turns": len(turns), "escalated": unsure if escalated else []}})
 
 if __name__ == "__main__":
     import sys
     if len(sys.argv) < 2:
-        print('사용법: py diarize_llm.py "자막 텍스트"')
+        print('사용법: py diarize_llm.py "자막 텍스트" [auto|local|llm]')
         raise SystemExit(1)
-    out = split_by_speaker(sys.argv[1])
+    out = split_by_speaker(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
     print(json.dumps(out, ensure_ascii=False, indent=2))
@@ -0,0 +1,204 @@
+# export.py
+import io, os, sys, csv, json, argparse
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from models import NumericBlock, InfoBlock
+from analytics import iter_normalized
+
+try:  # 선택 의존성: parquet/arrow 포맷에만 필요
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# 평탄화 컬럼: fire_data_pk, numeric.<필드>, info.<필드>
+COLUMNS: List[str] = (["fire_data_pk"]
+                      + [f"numeric.{f}" for f in NumericBlock.model_fields]
+                      + [f"info.{f}" for f in InfoBlock.model_fields])
+
+def _kind(annotation) -> type:
+    s = str(annotation)
+    if "int" in s:
+        return int
+    if "float" in s:
+        return float
+    return str
+
+def _to_int(v):
+    if v is None or type(v) is int:
+        return v
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return int(f) if f.is_integer() else None  # 3.0 → 3, 3.5 는 정수 컬럼에 못 넣으므로 None
+
+def _to_float(v):
+    if v is None or type(v) is float:
+        return v
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+def _to_str(v):
+    return v if v is None or type(v) is str else str(v)
+
+_CASTS = {int: _to_int, float: _to_float, str: _to_str}
+# 컬럼별 스키마 타입으로 보정 (정규화 파일에 정수 컬럼 3.0, 숫자 문자열 등이 섞여 있어도 모든 포맷이 같은 타입)
+_COLUMN_CASTS: Dict[str, Any] = {"fire_data_pk": _to_int}
+_COLUMN_CASTS.update({f"numeric.{n}": _CASTS[_kind(f.annotation)] for n, f in NumericBlock.model_fields.items()})
+_COLUMN_CASTS.update({f"info.{n}": _to_str for n in InfoBlock.model_fields})
+
+_ARROW_TYPES = {int: "int64", float: "float64", str: "string"}
+
+def _arrow_type(annotation):
+    return getattr(pa, _ARROW_TYPES[_kind(annotation)])()
+
+def arrow_schema():
+    fields = [pa.field("fire_data_pk", pa.int64())]
+    fields += [pa.field(f"numeric.{n}", _arrow_type(f.annotation)) for n, f in NumericBlock.model_fields.items()]
+    fields += [pa.field(f"info.{n}", pa.string()) for n in InfoBlock.model_fields]
+    return pa.schema(fields)
+
+def flatten(std: Dict[str, Any]) -> Dict[str, Any]:
+    numeric = std.get("numeric") or {}
+    info = std.get("info") or {}
+    cast = _COLUMN_CASTS
+    row: Dict[str, Any] = {"fire_data_pk": _to_int(std.get("fire_data_pk"))}
+    for f in NumericBlock.model_fields:
+        c = f"numeric.{f}"
+        row[c] = cast[c](numeric.get(f))
+    for f in InfoBlock.model_fields:
+        row[f"info.{f}"] = _to_str(info.get(f))
+    return row
+
+def iter_rows(folder: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+              fire_types: Sequence[str] = ()) -> Iterator[Dict[str, Any]]:
+    """
+    report_datetime(YYYY-MM-DD HH:MM:SS) 범위와 fire_type 으로 거른 평탄화 행.
+    date_to 가 날짜만이면 그날 전체 포함.
+    """
+    upper = date_to + " 99" if date_to and len(date_to) <= 10 else date_to
+    types = set(fire_types)
+    for std in iter_normalized(folder):
+        info = std.get("info") or {}
+        dt = info.get("report_datetime")
+        if date_from and (not dt or dt < date_from):
+            continue
+        if upper and (not dt or dt > upper):
+            continue
+        if types and info.get("fire_type") not in types:
+            continue
+        yield flatten(std)
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for r in rows:
+        batch.append(r)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class _DrainSink(io.RawIOBase):
+    """pyarrow writer 출력 버퍼. 배치마다 drain() 으로 비워 메모리를 일정하게 유지"""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._buf += b
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        out = bytes(self._buf)
+        self._buf.clear()
+        return out
+
+def export_stream(folder: str, fmt: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                  fire_types: Sequence[str] = (), batch_rows: int = 5000) -> Iterator[bytes]:
+    """선택 포맷으로 청크(bytes)를 순차 생성. 한 번에 batch_rows 행만 메모리에 둠"""
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 포맷: {fmt}")
+    if fmt in ("parquet", "arrow") and pa is None:
+        raise RuntimeError(f"{fmt} 포맷은 pyarrow 가 필요합니다.")
+
+    rows = iter_rows(folder, date_from, date_to, fire_types)
+
+    if fmt == "ndjson":
+        for batch in _batches(rows, batch_rows):
+            yield "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n"
+                          for r in batch).encode("utf-8")
+        return
+
+    if fmt == "csv":
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        w.writerow(COLUMNS)
+        for batch in _batches(rows, batch_rows):
+            w.writerows([r[c] for c in COLUMNS] for r in batch)
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue().encode("utf-8")
+        return
+
+    schema = arrow_schema()
+    sink = _DrainSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        write = lambda b: writer.write_batch(b, row_group_size=batch_rows)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+        write = writer.write_batch
+    try:
+        for batch in _batches(rows, batch_rows):
+            write(pa.RecordBatch.from_pylist(batch, schema=schema))  # 배치 = 행 그룹
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+# ---------------------- CLI ----------------------
+if __name__ == "__main__":
+    base = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="정규화 사건 일괄 내보내기")
+    parser.add_argument("--format", choices=list(FORMATS), default="ndjson")
+    parser.add_argument("--out", help="출력 파일 (생략 시 stdout)")
+    parser.add_argument("--src", default=os.path.join(base, "results", "normalize"))
+    parser.add_argument("--from", dest="date_from", help="YYYY-MM-DD[ HH:MM:SS]")
+    parser.add_argument("--to", dest="date_to", help="YYYY-MM-DD[ HH:MM:SS]")
+    parser.add_argument("--fire-type", action="append", default=[], help="여러 번 지정 가능")
+    parser.add_argument("--batch-rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try:
+        for chunk in export_stream(args.src, args.format, args.date_from, args.date_to,
+                                   args.fire_type, args.batch_rows):
+            out.write(chunk)
+    finally:
+        if args.out:
+            out.close()
@@ -1,12 +1,14 @@
 # extract.py
 import os, json, time, re, argparse
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, get_args, get_origin
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from openai import OpenAI
+from upstream import SCHEDULER, estimate_tokens
+from numeric_tokenizer import first_numeric, floor_values
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)  # 재시도는 SCHEDULER.create 가 예산/마감 안에서 (SDK 재시도는 예산 밖 요청)
 
 # ---------------------- 스키마 ----------------------
 class People(BaseModel):
@@ -66,6 +68,9 @@ SYSTEM_PROMPT = """당신은 119 신고 대화에서 사건 속성을 추출하
 """
 
 # ---------------------- 유틸 ----------------------
+_JSON_DECODER = json.JSONDecoder()
+_MAX_JSON_CANDIDATES = 32
+
 def _safe_json_extract(text: str) -> Dict[str, Any]:
     text = (text or "").strip()
     try:
@@ -78,12 +83,19 @@ def _safe_json_extract(text: str) -> Dict[str, Any]:
             return json.loads(text[s:e+1])
         except Exception:
             pass
-    m = re.search(r"\{(?:[^{}]|(?R))*\}", text, re.S)
-    if m:
+    # 본문 중 처음으로 온전히 파싱되는 {...} (re 는 (?R) 재귀를 지원하지 않음).
+    # 시도 횟수를 제한해 '{' 가 잔뜩 든 입력에서 O(n²) 로 번지지 않게 한다
+    start = text.find("{")
+    for _ in range(_MAX_JSON_CANDIDATES):
+        if start == -1:
+            break
         try:
-            return json.loads(m.group(0))
-        except Exception:
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+            if isinstance(obj, dict):
+                return obj
+        except (ValueError, RecursionError):
             pass
+        start = text.find("{", start + 1)
     # 디폴트 맵 (지침 양식 기반)
     return {
         "building_agreement_count": 0,
@@ -127,65 +139,80 @@ def _incident_from_literal(text: str) -> Optional[str]:
                 return key
     return None
 
-def _normalize_types(data: Dict[str, Any]) -> Dict[str, Any]:
-    base = {
-        "building_agreement_count": 0,
-        "building_structure": [],
-        "building_usage_status": None,
-        "total_floor_area": 0.0,
-        "soot_area": 0.0,
-        "multi_use_flag": False,
-        "fuel_type": None,
-        "fire_management_target_flag": None,
-        "unit_temperature": 0.0,
-        "unit_humidity": 0.0,
-        "unit_wind_speed": None,
-        "facility_location": None,
-        "forest_fire_flag": False,
-        "total_floor_count": 0,
-        "vehicle_fire_flag": False,
-        "ignition_material": None,
-        "special_fire_object_name": None,
-        "wind_direction": None
-    }
-    base.update(data or {})
-
-    # 리스트 강제 변환
-    if not isinstance(base["building_structure"], list):
-        base["building_structure"] = [str(base["building_structure"])] if base["building_structure"] else []
-
-    # int 변환
-    for key in ["building_agreement_count", "total_floor_count"]:
+# ---------------------- 타입 강제 변환 (KeywordsV1 어노테이션에서 1회 생성) ----------------------
+# 필드 타입별 변환 코드 조각. {v} = 값 변수. 결과는 기존 _normalize_types 와 같은 규칙:
+#   int/float: None 유지, 변환 실패 시 0/0.0 | bool: 문자열은 true/1/yes/y 만 True
+#   str: None/"" → None, 나머지 str() | list: 단일 값은 [str(v)], 원소는 문자열로
+_COERCE_SNIPPETS = {
+    int: (0, """    if {v} is not None and type({v}) is not int:
         try:
-            if base[key] is not None:
-                base[key] = int(base[key])
+            {v} = int({v})
         except Exception:
-            base[key] = 0
-
-    # float 변환
-    for key in ["total_floor_area", "soot_area", "unit_temperature", "unit_humidity"]:
+            {v} = 0
+"""),
+    float: (0.0, """    if {v} is not None and type({v}) is not float:
         try:
-            if base[key] is not None:
-                base[key] = float(base[key])
+            {v} = float({v})
         except Exception:
-            base[key] = 0.0
+            {v} = 0.0
+"""),
+    bool: (False, """    if type({v}) is not bool:
+        {v} = {v}.lower() in ("true", "1", "yes", "y") if isinstance({v}, str) else bool({v})
+"""),
+    str: (None, """    if {v} is None or {v} == "":
+        {v} = None
+    elif type({v}) is not str:
+        {v} = str({v})
+"""),
+    list: ([], """    if type({v}) is not list:
+        {v} = [str({v})] if {v} else []
+    else:
+        {v} = [x if type(x) is str else str(x) for x in {v}]
+"""),
+}
 
-    # bool 변환
-    for key in ["multi_use_flag", "forest_fire_flag", "vehicle_fire_flag"]:
-        v = base.get(key)
-        if isinstance(v, str):
-            base[key] = v.lower() in ["true", "1", "yes", "y"]
-        else:
-            base[key] = bool(v)
+def _build_coercer(model) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    모델 필드 어노테이션으로 변환 함수 소스를 만들어 한 번 컴파일.
+    필드마다 루프/분기 없이 펼친 코드라 dict 하나를 한 번만 훑는다.
+    """
+    lines = ["def coerce(data):",
+             "    if not isinstance(data, dict):",
+             "        data = {}",
+             "    get = data.get"]
+    names = []
+    for i, (name, field) in enumerate(model.model_fields.items()):
+        inner = next((a for a in get_args(field.annotation) if a is not type(None)), field.annotation)
+        kind = list if get_origin(inner) is list else inner
+        default, snippet = _COERCE_SNIPPETS[kind]
+        v = f"v{i}"
+        lines.append(f"    {v} = get({name!r}, {default!r})")
+        lines.append(snippet.format(v=v).rstrip("\n"))
+        names.append(name)
+    body = ", ".join(f"{n!r}: v{i}" for i, n in enumerate(names))
+    lines += [f"    out = {{{body}}}",
+              "    if len(data) > len(out) or not _names.issuperset(data):",
+              "        for k, val in data.items():",  # 스키마 밖 키(hazards 등)는 그대로 유지
+              "            if k not in _names:",
+              "                out[k] = val",
+              "    return out"]
+    ns: Dict[str, Any] = {"_names": frozenset(names)}
+    exec(compile("\n".join(lines), f"<coerce {model.__name__}>", "exec"), ns)
+    return ns["coerce"]
+
+_coerce_keywords = _build_coercer(KeywordsV1)
+_KEYWORD_FIELDS = tuple(KeywordsV1.model_fields)
+RULE_DEFAULTS = (None, 0, 0.0, False, [], "")  # 규칙 선추출이 '못 찾음' 대신 채우는 값
+RULES_ONLY = "rules-only"  # LLM 없이 규칙만 쓴 결과의 model 표시 (라우터/마감 대체 공통)
 
-    # 문자열 보정
-    for key in ["building_usage_status", "fuel_type", "fire_management_target_flag",
-                "unit_wind_speed", "facility_location", "ignition_material",
-                "special_fire_object_name", "wind_direction"]:
-        v = base.get(key)
-        base[key] = str(v) if v not in [None, ""] else None
+def _normalize_types(data: Dict[str, Any]) -> Dict[str, Any]:
+    """기본값 채우기 + 타입 보정 (한 번에)"""
+    return _coerce_keywords(data)
 
-    return base
+def _keywords_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    """보정 + 스키마 필드만 남김 = KeywordsV1(**...).model_dump() 와 같은 결과 (재검증 없음)"""
+    coerced = _coerce_keywords(data)
+    return {k: coerced[k] for k in _KEYWORD_FIELDS}
 
 # ---------------------- 규칙 선추출 & 병합 ----------------------
 DIR_WORDS = {
@@ -206,15 +233,6 @@ STRUCTURE_WORDS = ["공장", "창고", "상가", "주택", "아파트", "기숙
 def _match_any(text: str, words):
     return [w for w in words if w in text]
 
-def _parse_number(pattern: str, text: str, cast=float):
-    m = re.search(pattern, text)
-    if not m:
-        return None
-    try:
-        return cast(m.group(1).replace(",", ""))
-    except:
-        return None
-
 def prefill_from_rules(text: str) -> Dict[str, Any]:
     t = (text or "").strip()
 
@@ -255,25 +273,21 @@ def prefill_from_rules(text: str) -> Dict[str, Any]:
     if any(k in t for k in ["병원", "백화점", "대형마트", "지하상가", "역사", "지하도상가", "학원", "영화관", "유흥주점"]):
         out["multi_use_flag"] = True
 
-    # 2) 층수/연면적 등 수치 추출
-    # "6층 건물" → total_floor_count
-    m = re.search(r"(\d+)\s*층\s*건물|(\d+)\s*층\b", t)
-    if m:
-        num = next(g for g in m.groups() if g)
-        try:
-            out["total_floor_count"] = int(num)
-        except:
-            pass
+    # 2) 층수/연면적/기상/세대 등 수치: 토크나이저 한 번으로 전부 추출 (한글 수사 포함)
+    nums = first_numeric(t)
+
+    # "6층 건물" → total_floor_count (명시 없으면 처음 언급된 층)
+    _, floor_count = floor_values(nums)
+    if floor_count is not None:
+        out["total_floor_count"] = floor_count
 
     # 연면적: "연면적 1200", "연면적 1,200㎡", "연면적 1,200m2"
-    area = _parse_number(r"연면적\s*([0-9,]+(?:\.\d+)?)\s*(?:㎡|m2|m²)?", t, float)
-    if area is not None:
-        out["total_floor_area"] = float(area)
+    if "total_floor_area" in nums:
+        out["total_floor_area"] = nums["total_floor_area"].value
 
     # 그을음 면적(있다면): "그을음 50㎡"
-    soot = _parse_number(r"(?:그을음|그을림)\s*([0-9,]+(?:\.\d+)?)\s*(?:㎡|m2|m²)", t, float)
-    if soot is not None:
-        out["soot_area"] = float(soot)
+    if "soot_area" in nums:
+        out["soot_area"] = nums["soot_area"].value
 
     # 3) 연료/착화물
     fuels = _match_any(t, FUEL_WORDS)
@@ -314,36 +328,38 @@ def prefill_from_rules(text: str) -> Dict[str, Any]:
     elif any(k in t for k in ["공사 중", "리모델링 중"]):
         out["building_usage_status"] = "공사중"
 
-    # 7) 기상 값 추출 (온도/습도/풍속/풍향)
-    temp = _parse_number(r"(?:온도|기온|온도는)\s*([0-9]+(?:\.\d+)?)\s*(?:도|℃)", t, float)
-    if temp is not None:
-        out["unit_temperature"] = float(temp)
-
-    hum = _parse_number(r"(?:습도|습도는)\s*([0-9]+(?:\.\d+)?)\s*%", t, float)
-    if hum is not None:
-        out["unit_humidity"] = float(hum)
-
-    ws = _parse_number(r"(?:풍속|바람)\s*([0-9]+(?:\.\d+)?)\s*m/?s", t, float)
-    if ws is not None:
-        out["unit_wind_speed"] = f"{ws} m/s"
+    # 7) 기상 값 (온도/습도/풍속은 2)의 토크나이저 결과, 풍향은 단어 매칭)
+    if "unit_temperature" in nums:
+        out["unit_temperature"] = nums["unit_temperature"].value
+    if "unit_humidity" in nums:
+        out["unit_humidity"] = nums["unit_humidity"].value
+    if "unit_wind_speed" in nums:
+        out["unit_wind_speed"] = f"{nums['unit_wind_speed'].value} m/s"
 
     for k, v in DIR_WORDS.items():
         if k in t:
             out["wind_direction"] = v
             break
 
-    # 8) 세대/동의 수(있을 때): "세대 120세대", "동의 30"
-    agree = _parse_number(r"(?:세대|동의)\s*([0-9,]+)", t, int)
-    if agree is not None:
-        out["building_agreement_count"] = int(agree)
+    # 8) 세대/동의 수(있을 때): "세대 120세대", "동의 30", "두 동"
+    if "building_agreement_count" in nums:
+        out["building_agreement_count"] = int(nums["building_agreement_count"].value)
 
     # 9) “연기/하얀 연기” 같은 신고 단서 → 직접 필드가 없으므로 참고만
     #    (필요 시 soot_area, fuel_type 추정을 강화하는 규칙을 여기 확장)
 
     return out
 
-def merge_rule_and_model(rule: Dict[str, Any], model: Dict[str, Any]) -> Dict[str, Any]:
+def _merge_raw(rule: Dict[str, Any], model: Dict[str, Any],
+               prov: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    prov 가 주어지면 병합이 실제로 고른 출처를 필드별로 기록 (rule / model / rule+model).
+    prov 에 이미 든 값은 model 쪽 출처로 유지 (공유 결과 위에 덧씌울 때)
+    """
     merged = dict(model or {})
+    if prov is not None:
+        for k in merged:
+            prov.setdefault(k, "model")
 
     rule = rule or {}
     # 리스트 병합 대상 필드
@@ -359,58 +375,91 @@ def merge_rule_and_model(rule: Dict[str, Any], model: Dict[str, Any]) -> Dict[st
             if not isinstance(new_list, list):
                 new_list = [new_list] if new_list else []
             merged[k] = list(dict.fromkeys(prev_list + new_list))
+            if prov is not None and new_list:
+                prov[k] = f"rule+{prov[k]}" if prev_list and k in prov else "rule"
         else:
             # rule 값이 실값이면 덮어쓰기, 아니면 기존 유지
-            merged[k] = v if v not in [None, [], "", {}] else merged.get(k)
-
-    # 타입 및 기본값 정규화
-    return _normalize_types(merged)
+            if v not in [None, [], "", {}]:
+                merged[k] = v
+                if prov is not None:
+                    prov[k] = "rule"
+            else:
+                merged[k] = merged.get(k)
+    return merged
+
+def field_provenance(keywords: Dict[str, Any], prov: Dict[str, str]) -> Dict[str, str]:
+    """최종 값 기준 출처: 빈 값은 none, 병합에서 아무도 안 채워 기본값(0/False)이 들어간 필드는 default"""
+    return {k: "none" if v in (None, [], "") else prov.get(k, "default") for k, v in keywords.items()}
+
+def merge_rule_and_model(rule: Dict[str, Any], model: Dict[str, Any],
+                         prov: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    # 병합 후 타입 및 기본값 정규화 (prov: _merge_raw 참고)
+    return _normalize_types(_merge_raw(rule, model, prov))
 
 # ---------------------- 핵심: 한 번 추출 ----------------------
-def _extract_once(transcript: str, strict: bool) -> Dict[str, Any]:
+def _apply_strict(merged: Dict[str, Any], transcript: str) -> Dict[str, Any]:
+    """엄격 모드(발화 기반 사실만 남김)"""
+    merged["hazards"] = _filter_terms_by_literal(transcript, merged.get("hazards") or [])
+    merged["fuel"]    = _filter_terms_by_literal(transcript, merged.get("fuel") or [])
+    merged["incident_type"] = _incident_from_literal(transcript)  # 직언 없으면 None
+    if merged.get("structure_type") not in ["공장","창고","상가","차량","야외","산림","공동주택"]:
+        merged["structure_type"] = None
+    else:
+        if _norm(merged["structure_type"]) not in _norm(transcript):
+            merged["structure_type"] = None
+    return merged
+
+def _extract_once(transcript: str, strict: bool, model: str = "gpt-4o-mini") -> Dict[str, Any]:
     t0 = time.time()
 
     # 규칙 선추출
     rule_prefill = prefill_from_rules(transcript)
 
-    # 모델 추출
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
+    # 모델 추출 (공용 스케줄러로 요청/토큰 예산 배정)
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": transcript}
+    ]
+    resp = SCHEDULER.create(
+        client.chat.completions,
+        est_tokens=estimate_tokens(messages),
+        model=model,
         temperature=0,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": transcript}
-        ]
+        messages=messages
     )
     raw = (resp.choices[0].message.content or "").strip()
-    model_json = _normalize_types(_safe_json_extract(raw))
-
-    # 병합
-    merged = merge_rule_and_model(rule_prefill, model_json)
+    model_json = _safe_json_extract(raw)
 
-    # 엄격 모드(발화 기반 사실만 남김)
+    # 병합 (타입 보정은 마지막에 한 번만)
+    prov: Dict[str, str] = {}
+    merged = _merge_raw(rule_prefill, model_json, prov)
     if strict:
-        merged["hazards"] = _filter_terms_by_literal(transcript, merged.get("hazards") or [])
-        merged["fuel"]    = _filter_terms_by_literal(transcript, merged.get("fuel") or [])
-        merged["incident_type"] = _incident_from_literal(transcript)  # 직언 없으면 None
-        if merged.get("structure_type") not in ["공장","창고","상가","차량","야외","산림","공동주택"]:
-            merged["structure_type"] = None
-        else:
-            if _norm(merged["structure_type"]) not in _norm(transcript):
-                merged["structure_type"] = None
+        merged = _apply_strict(merged, transcript)
 
-    validated = KeywordsV1(**_normalize_types(merged))
+    keywords = _keywords_dict(merged)
     ms = int((time.time() - t0) * 1000)
-    return {"keywords": validated.model_dump(), "model": f"gpt-4o-mini({'strict' if strict else 'hybrid'})", "latency_ms": ms}
+    return {"keywords": keywords, "provenance": field_provenance(keywords, prov),
+            "model": f"{model}({'strict' if strict else 'hybrid'})", "latency_ms": ms}
+
+def extract_rules_only(transcript: str, strict: bool = False) -> Dict[str, Any]:
+    """LLM 호출 없이 규칙 선추출만 (extract_keywords 와 같은 모양)"""
+    t0 = time.time()
+    prov: Dict[str, str] = {}
+    merged = _merge_raw(prefill_from_rules(transcript), {}, prov)
+    if strict:
+        merged = _apply_strict(merged, transcript)
+    keywords = _keywords_dict(merged)
+    return {"keywords": keywords, "provenance": field_provenance(keywords, prov),
+            "model": RULES_ONLY, "latency_ms": int((time.time() - t0) * 1000)}
 
 # ---------------------- 공개 API ----------------------
-def extract_keywords(transcript: str, strict: bool = False) -> Dict[str, Any]:
-    return _extract_once(transcript, strict)
+def extract_keywords(transcript: str, strict: bool = False, model: str = "gpt-4o-mini") -> Dict[str, Any]:
+    return _extract_once(transcript, strict, model)
 
-def extract_keywords_both(transcript: str) -> Dict[str, Any]:
+def extract_keywords_both(transcript: str, model: str = "gpt-4o-mini") -> Dict[str, Any]:
     """facts(발화 기반) + insights(추론 허용) 둘 다 반환"""
-    facts    = _extract_once(transcript, strict=True)
-    insights = _extract_once(transcript, strict=False)
+    facts    = _extract_once(transcript, strict=True, model=model)
+    insights = _extract_once(transcript, strict=False, model=model)
     return {"facts": facts, "insights": insights}
 
 # ---------------------- CLI ----------------------
@@ -0,0 +1,170 @@
+# extract_router.py
+import os, json, time, threading
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+from extract import (prefill_from_rules, extract_keywords, extract_keywords_both, extract_rules_only,
+                     RULE_DEFAULTS, _KEYWORD_FIELDS)
+from upstream import SCHEDULER, current_lane
+from deadline import remaining as remaining_budget
+
+def rule_coverage(prefill: Dict[str, Any]) -> float:
+    """규칙 선추출이 실값을 채운 KeywordsV1 필드 비율"""
+    return sum(1 for k in _KEYWORD_FIELDS if prefill.get(k) not in RULE_DEFAULTS) / len(_KEYWORD_FIELDS)
+
+def model_added(keywords: Dict[str, Any], prefill: Dict[str, Any]) -> int:
+    """규칙이 못 채웠는데 결과에는 있는 필드 수 (모델 호출의 실제 기여)"""
+    return sum(1 for k, v in keywords.items() if v not in RULE_DEFAULTS and prefill.get(k) in RULE_DEFAULTS)
+
+# ---------------------- 지연 추정 ----------------------
+class LatencyModel:
+    """
+    모델별 호출 지연 ≈ base + per_char × 글자 수.
+    관측값으로 지수가중 평균/분산/공분산을 갱신하는 온라인 회귀 (최근 호출 비중 alpha).
+    기울기는 사전값 쪽으로 수축 (비슷한 길이만 관측되면 분산이 0 에 가까워 기울기가 튀므로)
+    """
+
+    def __init__(self, base_ms: float, per_char_ms: float, alpha: float = 0.1):
+        self.alpha = alpha
+        self.mx, self.vx = 1000.0, 250000.0     # 사전값: 1000자 ± 500자 근처에서 관측한 것처럼 시작
+        self.my = base_ms + per_char_ms * self.mx
+        self.cxy = per_char_ms * self.vx
+        self.prior_slope = per_char_ms
+        self.shrink = self.vx * 0.2
+        self.n = 0
+
+    def observe(self, chars: float, ms: float) -> None:
+        a = self.alpha
+        dx, dy = chars - self.mx, ms - self.my
+        self.mx += a * dx
+        self.my += a * dy
+        self.vx = (1 - a) * (self.vx + a * dx * dx)
+        self.cxy = (1 - a) * (self.cxy + a * dx * dy)
+        self.n += 1
+
+    def params(self) -> Tuple[float, float]:
+        slope = max(0.0, (self.cxy + self.shrink * self.prior_slope) / (self.vx + self.shrink))
+        return max(0.0, self.my - slope * self.mx), slope
+
+    def predict(self, chars: float) -> float:
+        base, slope = self.params()
+        return base + slope * chars
+
+# ---------------------- 라우터 ----------------------
+class ExtractRouter:
+    """
+    전사문마다 rules(LLM 없음) / small / large 중 하나를 고름.
+    - 규칙 커버리지가 rule_coverage 이상이고 짧은 통화 → rules
+    - small 예상 지연(호출 수 × 회귀 추정 + 현재 레인 큐 대기)이 SLO 를 넘음 → rules (SLO 우선)
+    - 긴 통화 또는 커버리지가 low_coverage 미만 → large 예상 지연이 SLO 안이면 large
+    - 그 외 small
+    요청 마감(deadline_scope) 이 더 빠르면 그 남은 시간을 SLO 로 씀.
+    log_path(EXTRACT_ROUTER_LOG) 를 주면 결정/결과를 JSONL 로 남겨 임계값 조정에 쓴다
+    (model_added=0 인 small/large 는 rules 로 충분했던 후보). 기본은 남기지 않음
+    """
+
+    def __init__(self, slo_ms: float, small_model: str, large_model: str,
+                 rule_coverage: float = 0.4, low_coverage: float = 0.1,
+                 short_chars: int = 300, long_chars: int = 1500, log_path: Optional[str] = None):
+        self.slo_ms = slo_ms
+        self.models = {"small": small_model, "large": large_model}
+        self.rule_coverage, self.low_coverage = rule_coverage, low_coverage
+        self.short_chars, self.long_chars = short_chars, long_chars
+        self.latency = {"small": LatencyModel(1200.0, 0.4), "large": LatencyModel(2500.0, 1.0)}
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._decided: Counter = Counter()
+        self._slo_missed: Counter = Counter()
+        self._errors: Counter = Counter()
+
+    def _queue_ms(self) -> float:
+        """현재 레인의 최근 예산 대기 p95 (업스트림 혼잡도)"""
+        return SCHEDULER.stats()["lanes"][current_lane()]["wait_ms_p95"]
+
+    def decide(self, transcript: str, prefill: Dict[str, Any], calls: int = 1) -> Dict[str, Any]:
+        cov = rule_coverage(prefill)
+        chars = len(transcript or "")
+        budget = self.slo_ms
+        rem = remaining_budget()
+        if rem is not None:
+            budget = min(budget, rem * 1000)
+        queue = self._queue_ms()
+        with self._lock:
+            pred = {t: calls * m.predict(chars) + queue for t, m in self.latency.items()}
+
+        if cov >= self.rule_coverage and chars <= self.short_chars:
+            tier, reason = "rules", "rules-cover"
+        elif pred["small"] > budget:
+            tier, reason = "rules", "slo"
+        elif chars >= self.long_chars and pred["large"] <= budget:
+            tier, reason = "large", "long"
+        elif cov < self.low_coverage and pred["large"] <= budget:
+            tier, reason = "large", "low-coverage"
+        else:
+            tier, reason = "small", "default"
+        return {"tier": tier, "model": self.models.get(tier), "reason": reason,
+                "coverage": round(cov, 3), "chars": chars, "calls": calls, "queue_ms": round(queue, 1),
+                "slo_ms": round(budget), "predicted_ms": round(pred.get(tier, 0.0))}
+
+    def record(self, decision: Dict[str, Any], actual_ms: int, ok: bool,
+               added: Optional[int] = None, error: Optional[str] = None) -> None:
+        tier = decision["tier"]
+        rec = {**decision, "ts": time.strftime("%Y-%m-%d %H:%M:%S"), "actual_ms": actual_ms, "ok": ok,
+               "slo_met": ok and actual_ms <= decision["slo_ms"], "model_added": added}
+        if error:
+            rec["error"] = error
+        with self._lock:
+            self._decided[tier] += 1
+            if not rec["slo_met"]:
+                self._slo_missed[tier] += 1
+            if not ok:
+                self._errors[tier] += 1
+            if ok and tier in self.latency:
+                self.latency[tier].observe(decision["chars"], actual_ms / max(1, decision["calls"]))
+            if self.log_path:
+                os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latency = {}
+            for t, m in self.latency.items():
+                base, slope = m.params()
+                latency[t] = {"model": self.models[t], "base_ms": round(base, 1),
+                              "per_kchar_ms": round(slope * 1000, 1), "observed": m.n}
+            return {"slo_ms": self.slo_ms, "decided": dict(self._decided), "slo_missed": dict(self._slo_missed),
+                    "errors": dict(self._errors), "latency": latency, "log_path": self.log_path}
+
+ROUTER = ExtractRouter(
+    slo_ms=float(os.getenv("EXTRACT_SLO_MS", "4000")),
+    small_model=os.getenv("ROUTER_SMALL_MODEL", "gpt-4o-mini"),
+    large_model=os.getenv("ROUTER_LARGE_MODEL", "gpt-4o"),
+    rule_coverage=float(os.getenv("ROUTER_RULE_COVERAGE", "0.4")),
+    low_coverage=float(os.getenv("ROUTER_LOW_COVERAGE", "0.1")),
+    short_chars=int(os.getenv("ROUTER_SHORT_CHARS", "300")),
+    long_chars=int(os.getenv("ROUTER_LONG_CHARS", "1500")),
+    log_path=os.getenv("EXTRACT_ROUTER_LOG") or None,   # 켤 때만 (예: logs/extract_router.jsonl)
+)
+
+def extract_routed(text: str, mode: str = "both") -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """mode(facts/insights/both) 추출을 라우터가 고른 경로로 실행. (결과, 결정) 반환"""
+    prefill = prefill_from_rules(text)
+    decision = ROUTER.decide(text, prefill, calls=2 if mode == "both" else 1)
+    t0 = time.time()
+    try:
+        if decision["tier"] == "rules":
+            if mode == "both":
+                out = {"facts": extract_rules_only(text, strict=True), "insights": extract_rules_only(text)}
+            else:
+                out = extract_rules_only(text, strict=mode == "facts")
+        elif mode == "both":
+            out = extract_keywords_both(text, model=decision["model"])
+        else:
+            out = extract_keywords(text, strict=mode == "facts", model=decision["model"])
+    except Exception as e:
+        ROUTER.record(decision, int((time.time() - t0) * 1000), False, error=f"{type(e).__name__}: {e}")
+        raise
+    kw = (out["insights"] if mode == "both" else out)["keywords"]
+    ROUTER.record(decision, int((time.time() - t0) * 1000), True, model_added(kw, prefill))
+    return out, decision
@@ -0,0 +1,122 @@
+# extract_session.py
+import json, time, threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from extract import (client, SYSTEM_PROMPT, extract_keywords, prefill_from_rules, merge_rule_and_model,
+                     _normalize_types, _keywords_dict, _safe_json_extract)
+from upstream import SCHEDULER, estimate_tokens
+
+# 기본값(0/False/None/[])은 "모름" 이므로 상태를 덮지 않는다
+_DEFAULTS = _normalize_types({})
+
+DELTA_NOTE = """[진행 중 통화]
+아래 '현재 상태'는 지금까지의 통화에서 이미 추출한 값입니다.
+'새 발화'에서 새로 알게 되었거나 바뀐 필드만 채우고, 언급이 없는 필드는 null 로 두세요."""
+
+def _updates_only(data: Dict[str, Any]) -> Dict[str, Any]:
+    """정규화 후 기본값이 아닌 필드만 남김"""
+    norm = _normalize_types(data)
+    return {k: v for k, v in norm.items() if k in _DEFAULTS and v != _DEFAULTS[k]}
+
+class ExtractionSession:
+    __slots__ = ("call_id", "state", "tail", "turns", "last_used", "lock")
+
+    def __init__(self, call_id: str):
+        self.call_id = call_id
+        self.state: Dict[str, Any] = dict(_DEFAULTS)
+        self.tail = ""          # 최근 발화 일부 (문맥용, 길이 제한)
+        self.turns = 0
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+class SessionManager:
+    """
+    call_id 별 증분 추출 세션.
+    - 새 발화 + 현재 상태 요약만 모델에 전송 (전체 전사문 재전송 없음)
+    - 결과는 merge_rule_and_model 과 같은 규칙(실값 덮어쓰기, 리스트 합집합)으로 병합
+    - 세션 수 상한(LRU) + 유휴 시간 초과 시 제거. 제거된(또는 처음 보는) 통화에 full_text 가 오면
+      증분 대신 전체 전사문을 한 번 추출해 상태를 복원
+    """
+
+    def __init__(self, max_sessions: int = 256, idle_ttl_s: float = 900.0, tail_chars: int = 400):
+        self.max_sessions = max_sessions
+        self.idle_ttl_s = idle_ttl_s
+        self.tail_chars = tail_chars
+        self._sessions: "OrderedDict[str, ExtractionSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, call_id: str) -> ExtractionSession:
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            sess = self._sessions.get(call_id)
+            if sess is None:
+                sess = self._sessions[call_id] = ExtractionSession(call_id)
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            self._sessions.move_to_end(call_id)
+            sess.last_used = now
+            return sess
+
+    def _sweep(self, now: float) -> None:
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_used < self.idle_ttl_s:
+                break
+            self._sessions.popitem(last=False)
+
+    def close(self, call_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(call_id, None) is not None
+
+    def update(self, call_id: str, new_text: str, full_text: Optional[str] = None) -> Dict[str, Any]:
+        """full_text: 지금까지의 전체 전사문 (선택). 세션이 없을 때만 쓰임"""
+        t0 = time.time()
+        sess = self._get(call_id)
+        with sess.lock:  # 같은 통화의 갱신은 순서대로
+            if sess.turns == 0 and full_text:
+                return self._resume(sess, full_text, t0)
+            summary = json.dumps({k: v for k, v in sess.state.items() if v != _DEFAULTS[k]},
+                                 ensure_ascii=False, separators=(",", ":"))
+            user = f"{DELTA_NOTE}\n\n현재 상태: {summary}\n\n직전 발화: {sess.tail}\n\n새 발화:\n{new_text}"
+            messages = [
+                {"role": "system", "content": SYSTEM_PROMPT},  # 고정 접두 → 프롬프트 캐시 적중
+                {"role": "user", "content": user}
+            ]
+            resp = SCHEDULER.create(
+                client.chat.completions,
+                est_tokens=estimate_tokens(messages),
+                model="gpt-4o-mini",
+                temperature=0,
+                messages=messages
+            )
+            raw = (resp.choices[0].message.content or "").strip()
+
+            # 상태 ← 모델 증분 ← 규칙 증분 (규칙이 최종 우선, _extract_once 와 같은 순서)
+            state = merge_rule_and_model(_updates_only(_safe_json_extract(raw)), sess.state)
+            state = merge_rule_and_model(_updates_only(prefill_from_rules(new_text)), state)
+            sess.state = state
+            sess.tail = (f"{sess.tail} {new_text}" if sess.tail else new_text)[-self.tail_chars:]
+            sess.turns += 1
+
+            ms = int((time.time() - t0) * 1000)
+            return {"keywords": _keywords_dict(state), "model": "gpt-4o-mini(session)",
+                    "latency_ms": ms, "turn": sess.turns, "delta_chars": len(new_text)}
+
+    def _resume(self, sess: ExtractionSession, full_text: str, t0: float) -> Dict[str, Any]:
+        """전체 추출로 상태를 처음부터 만듦 (세션 만료 후 이어서 온 발화)"""
+        out = extract_keywords(full_text)
+        sess.state = merge_rule_and_model(_updates_only(out["keywords"]), sess.state)
+        sess.tail = full_text[-self.tail_chars:]
+        sess.turns += 1
+        ms = int((time.time() - t0) * 1000)
+        return {"keywords": _keywords_dict(sess.state), "model": f"{out['model']}(full)",
+                "latency_ms": ms, "turn": sess.turns, "delta_chars": len(full_text)}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"sessions": len(self._sessions), "max_sessions": self.max_sessions,
+                    "idle_ttl_s": self.idle_ttl_s}
+
+SESSIONS = SessionManager()
@@ -0,0 +1,89 @@
+# fused_extract.py
+import json, time
+from typing import Any, Dict, List, Tuple
+
+from extract import client, SYSTEM_PROMPT, prefill_from_rules, _merge_raw, _keywords_dict, _safe_json_extract
+from role_classifier import get_classifier, split_turns
+from upstream import SCHEDULER, estimate_tokens
+
+ROLES = ("CALLER", "OPERATOR")
+
+# SYSTEM_PROMPT 를 그대로 접두로 둬서 extract 호출과 프롬프트 캐시를 공유
+FUSED_SYSTEM = SYSTEM_PROMPT + """
+[화자분리 + 추출 동시 수행]
+입력은 번호가 붙은 발화 목록입니다.
+1) 각 발화를 CALLER(신고자) 또는 OPERATOR(접수자)로 라벨링하세요.
+   질문/확인/안내는 OPERATOR, 상황 설명/도움 요청은 CALLER.
+2) 위 출력 양식의 필드는 CALLER 발화에서만 추출하세요.
+최종 출력(JSON): {"roles": ["CALLER"|"OPERATOR", ...발화 수만큼 순서대로], "keywords": {위 양식}}
+"""
+
+def _validate_roles(roles: Any, fallback: List[str]) -> Tuple[List[str], int]:
+    """모델 roles 검증. 길이가 다르거나 값이 틀린 칸은 로컬 분류기 라벨로 대체 (대체 칸 수 반환)"""
+    roles = roles if isinstance(roles, list) else []
+    out, fixed = [], 0
+    for i, fb in enumerate(fallback):
+        r = roles[i] if i < len(roles) else None
+        r = r.upper() if isinstance(r, str) else None
+        if r in ROLES:
+            out.append(r)
+        else:
+            out.append(fb)
+            fixed += 1
+    return out, fixed
+
+def diarize_and_extract(transcript: str) -> Dict[str, Any]:
+    """
+    한 번의 호출로 화자 라벨 + KeywordsV1.
+    발화는 로컬에서 문장 단위로 나누고 모델은 번호별 역할만 돌려주므로 전사문을 되풀이 출력하지 않는다.
+    반환: {"diar": split_by_speaker 와 같은 모양, "keywords", "model", "latency_ms", "usage"}
+    """
+    t0 = time.time()
+    turns = split_turns(transcript)
+    local = [r["role"] for r in get_classifier().classify(turns)]
+
+    listing = "\n".join(f"{i}. {t}" for i, t in enumerate(turns))
+    messages = [
+        {"role": "system", "content": FUSED_SYSTEM},
+        {"role": "user", "content": listing}
+    ]
+    resp = SCHEDULER.create(
+        client.chat.completions,
+        est_tokens=estimate_tokens(messages, max_output=12 * len(turns) + 512),
+        model="gpt-4o-mini",
+        temperature=0,
+        response_format={"type": "json_object"},
+        messages=messages
+    )
+    raw = (resp.choices[0].message.content or "").strip()
+    data = _safe_json_extract(raw)
+
+    roles, fixed = _validate_roles(data.get("roles"), local)
+    segments = [{"role": r, "text": t, "start": None, "end": None} for r, t in zip(roles, turns)]
+    caller = " ".join(t for r, t in zip(roles, turns) if r == "CALLER").strip()
+    operator = " ".join(t for r, t in zip(roles, turns) if r == "OPERATOR").strip()
+    diar = {"segments": segments, "merged": {"caller": caller, "operator": operator},
+            "diarization": {"mode": "fused", "turns": len(turns), "fallback_roles": fixed}}
+
+    # 규칙 선추출은 두 번 호출 경로와 같이 신고자 텍스트 기준, 규칙 우선 병합
+    model_kw = data.get("keywords")
+    if not isinstance(model_kw, dict):
+        model_kw = {}
+    merged = _merge_raw(prefill_from_rules(caller or transcript), model_kw)
+
+    usage = getattr(resp, "usage", None)
+    return {
+        "diar": diar,
+        "keywords": _keywords_dict(merged),
+        "model": "gpt-4o-mini(fused)",
+        "latency_ms": int((time.time() - t0) * 1000),
+        "usage": {"prompt_tokens": getattr(usage, "prompt_tokens", None),
+                  "completion_tokens": getattr(usage, "completion_tokens", None)},
+    }
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2:
+        print('사용법: py fused_extract.py "자막 텍스트"')
+        raise SystemExit(1)
+    print(json.dumps(diarize_and_extract(sys.argv[1]), ensure_ascii=False, indent=2))
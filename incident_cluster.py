@@ -0,0 +1,228 @@
+# incident_cluster.py
+import re, time, uuid, zlib, threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from role_classifier import get_classifier, split_turns
+
+_KEEP_RE = re.compile(r"[^0-9A-Za-z가-힣]+")
+MAX_CHARS = 4000                         # 주소/상황은 통화 앞부분에 나옴. 긴 통화의 서명 비용 상한
+MIN_LOCATION_KEY = 4                     # 이보다 짧은 위치('여기' 등)는 단독 근거로 쓰지 않음
+FLOOR_SLACK = 1                          # 번지는 화재/신고자 추정 차이: 발화층이 이만큼 다른 것은 같은 사건으로 봄
+MAX_MEMBER_SIGS = 8                      # 클러스터당 비교에 쓰는 구성원 서명 수 상한 (통화당 비용 상수 유지)
+
+def _norm(s: Optional[str]) -> str:
+    return _KEEP_RE.sub("", s or "").lower()
+
+def location_key(s: Optional[str]) -> str:
+    """위치 비교 키: 마지막 두 어절만 정규화 ('여기 위치가 OO대학교 XX관' → 'oo대학교xx관')"""
+    return _norm(" ".join((s or "").split()[-2:]))
+
+def location_match(a: Optional[str], b: Optional[str]) -> bool:
+    a, b = location_key(a), location_key(b)
+    return bool(a and b) and (a in b or b in a)
+
+def caller_text(text: str) -> str:
+    """신고자 발화만 (상황실 안내 문구는 통화마다 같아서 서로 다른 화재도 비슷해 보이게 함). 없으면 전체"""
+    turns = [t["text"] for t in get_classifier().classify(split_turns(text)) if t["role"] == "CALLER"]
+    return " ".join(turns) or text
+
+def _differs(a: Any, b: Any) -> bool:
+    return a is not None and b is not None and a != b
+
+def _floor_differs(a: Optional[int], b: Optional[int]) -> bool:
+    return a is not None and b is not None and abs(a - b) > FLOOR_SLACK
+
+def _address_differs(a: Optional[str], b: Optional[str]) -> bool:
+    a, b = _norm(a), _norm(b)
+    return bool(a and b) and a not in b and b not in a
+
+class Match(NamedTuple):
+    incident_id: str
+    primary: bool           # True = 새 사건을 연 첫 통화
+    similarity: float       # 추정 Jaccard (primary 면 1.0)
+    members: int
+    primary_text: str       # 첫 통화 전사문 (공유 추출 결과의 캐시 키)
+
+class _Cluster:
+    __slots__ = ("incident_id", "sigs", "keys", "location", "fire_type", "address", "floor", "members",
+                 "first_seen", "last_seen", "primary_text")
+
+    def __init__(self, incident_id: str, sig: Optional[np.ndarray], text: str,
+                 location: Optional[str], fire_type: Optional[str], address: Optional[str],
+                 floor: Optional[int], now: float):
+        self.incident_id = incident_id
+        self.sigs: List[np.ndarray] = [sig] if sig is not None else []
+        self.keys: Set[bytes] = set()
+        self.location = location
+        self.fire_type = fire_type
+        self.address = address
+        self.floor = floor
+        self.members: List[str] = []
+        self.first_seen = self.last_seen = now
+        self.primary_text = text
+
+class CallClusterer:
+    """
+    MinHash/LSH 기반 스트리밍 사건 묶기 (슬라이딩 시간 창).
+    - 서명: 신고자 발화(caller_text) 정규화 문자 3-gram → num_perm 개 최소 해시 (numpy 한 번의 연산)
+    - 후보: bands 개 LSH 버킷 조회 (통화당 상수 시간), 후보 클러스터만 서명 비교
+    - 위치 색인: 정규화 위치 문자열 → 클러스터 (같은 장소를 다르게 말한 통화는 3-gram 유사도가 낮음)
+    - 합류: 유사도 >= j_high, 위치 완전 일치, 또는 유사도 >= j_low 이면서 위치 포함 관계.
+      fire_type / 주소가 둘 다 있고 다르면 불가, 발화층은 FLOOR_SLACK 넘게 다를 때만 불가 (유사도와 무관)
+    - 클러스터는 구성원 서명을 최대 MAX_MEMBER_SIGS 개 보관하고 그 버킷 전부에 색인 (유사도 = 최댓값)
+    - window_s 동안 새 통화가 없으면 클러스터 만료
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 32, window_s: float = 1800.0,
+                 j_high: float = 0.6, j_low: float = 0.25, max_clusters: int = 4096, seed: int = 119):
+        if num_perm % bands:
+            raise ValueError("num_perm 은 bands 의 배수여야 합니다.")
+        rng = np.random.default_rng(seed)
+        self._a = (rng.integers(0, 1 << 64, num_perm, dtype=np.uint64) | np.uint64(1))[:, None]
+        self._b = rng.integers(0, 1 << 64, num_perm, dtype=np.uint64)[:, None]
+        self.bands, self.rows = bands, num_perm // bands
+        self.window_s = window_s
+        self.j_high, self.j_low = j_high, j_low
+        self.max_clusters = max_clusters
+        self._clusters: "OrderedDict[str, _Cluster]" = OrderedDict()   # last_seen 순
+        self._buckets: Dict[bytes, Set[str]] = {}
+        self._by_location: Dict[str, str] = {}
+        self._by_call: Dict[str, Tuple[str, float]] = {}    # call_id → (incident_id, 유사도): 재시도는 같은 배정
+        self._lock = threading.Lock()
+        self.calls = self.attached = 0
+
+    # ---------------------- 서명 ----------------------
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        s = _norm(text)[:MAX_CHARS]
+        if len(s) < 3:
+            return None
+        h = np.unique(np.fromiter((zlib.crc32(s[i:i + 3].encode("utf-8")) for i in range(len(s) - 2)),
+                                  dtype=np.uint64, count=len(s) - 2))
+        # multiply-add-shift: (a*h + b) mod 2^64 의 상위 32비트 (a 홀수).
+        # mod P 방식은 a 가 작으면 작은 h 가 모든 순열에서 최소가 되어 유사도가 0 근처로 붕괴
+        return ((self._a * h + self._b) >> np.uint64(32)).min(axis=1)
+
+    def _band_keys(self, sig: np.ndarray) -> List[bytes]:
+        r = self.rows
+        return [bytes([i]) + sig[i * r:(i + 1) * r].tobytes() for i in range(self.bands)]
+
+    # ---------------------- 색인 ----------------------
+    def _index(self, c: _Cluster) -> None:
+        for k in c.keys:
+            ids = self._buckets.get(k)
+            if ids is not None:
+                ids.discard(c.incident_id)
+                if not ids:
+                    del self._buckets[k]
+        c.keys = {k for sig in c.sigs for k in self._band_keys(sig)}
+        for k in c.keys:
+            self._buckets.setdefault(k, set()).add(c.incident_id)
+
+    def _drop(self, c: _Cluster) -> None:
+        for k in c.keys:
+            ids = self._buckets.get(k)
+            if ids is not None:
+                ids.discard(c.incident_id)
+                if not ids:
+                    del self._buckets[k]
+        loc = location_key(c.location)
+        if self._by_location.get(loc) == c.incident_id:
+            del self._by_location[loc]
+        for m in c.members:
+            self._by_call.pop(m, None)
+        self._clusters.pop(c.incident_id, None)
+
+    def _index_location(self, c: _Cluster) -> None:
+        loc = location_key(c.location)
+        if len(loc) >= MIN_LOCATION_KEY:
+            self._by_location[loc] = c.incident_id
+
+    def _sweep(self, now: float) -> None:
+        while self._clusters:
+            oldest = next(iter(self._clusters.values()))
+            if now - oldest.last_seen < self.window_s and len(self._clusters) <= self.max_clusters:
+                break
+            self._drop(oldest)
+
+    # ---------------------- 배정 ----------------------
+    def assign(self, call_id: str, text: str, location: Optional[str] = None,
+               fire_type: Optional[str] = None, address: Optional[str] = None,
+               floor: Optional[int] = None, now: Optional[float] = None) -> Match:
+        now = time.time() if now is None else now
+        sig = self.signature(caller_text(text))
+        with self._lock:
+            self._sweep(now)
+            prev = self._by_call.get(call_id)
+            if prev is not None:  # 같은 통화 재시도 (마감 초과 후 재요청 등): 자기 자신과 묶지 않음
+                c = self._clusters[prev[0]]
+                return Match(c.incident_id, c.members[0] == call_id, prev[1], len(c.members), c.primary_text)
+            self.calls += 1
+            best, best_j, best_score = None, 0.0, 0.0
+            cand: Set[str] = set()
+            if sig is not None:
+                for k in self._band_keys(sig):
+                    ids = self._buckets.get(k)
+                    if ids:
+                        cand |= ids
+            loc_key = location_key(location)
+            loc_hit = self._by_location.get(loc_key) if len(loc_key) >= MIN_LOCATION_KEY else None
+            if loc_hit:
+                cand.add(loc_hit)
+            for cid in cand:
+                c = self._clusters[cid]
+                if _differs(fire_type or None, c.fire_type or None) or _floor_differs(floor, c.floor) \
+                        or _address_differs(address, c.address):
+                    continue
+                j = max((float(np.count_nonzero(m == sig)) / len(sig) for m in c.sigs), default=0.0) \
+                    if sig is not None else 0.0
+                exact = cid == loc_hit
+                if not (j >= self.j_high or exact or (j >= self.j_low and location_match(location, c.location))):
+                    continue
+                score = j + (1.0 if exact else 0.0)
+                if score > best_score:
+                    best, best_j, best_score = c, j, score
+
+            if best is None:
+                c = _Cluster(uuid.uuid4().hex[:12], sig, text, location, fire_type, address, floor, now)
+                c.members.append(call_id)
+                self._by_call[call_id] = (c.incident_id, 1.0)
+                self._clusters[c.incident_id] = c
+                if sig is not None:
+                    self._index(c)
+                self._index_location(c)
+                return Match(c.incident_id, True, 1.0, 1, text)
+
+            best.members.append(call_id)
+            self._by_call[call_id] = (best.incident_id, round(best_j, 3))
+            best.last_seen = now
+            if not best.location and location:
+                best.location = location
+                self._index_location(best)
+            best.fire_type = best.fire_type or fire_type
+            best.address = best.address or address
+            best.floor = floor if best.floor is None else best.floor
+            if sig is not None and len(best.sigs) < MAX_MEMBER_SIGS:
+                best.sigs.append(sig)
+                self._index(best)
+            self._clusters.move_to_end(best.incident_id)
+            self.attached += 1
+            return Match(best.incident_id, False, self._by_call[call_id][1], len(best.members), best.primary_text)
+
+    def get(self, incident_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            c = self._clusters.get(incident_id)
+            if c is None:
+                return None
+            return {"incident_id": c.incident_id, "members": list(c.members), "location": c.location,
+                    "fire_type": c.fire_type, "address": c.address, "floor": c.floor,
+                    "first_seen": c.first_seen, "last_seen": c.last_seen}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"clusters": len(self._clusters), "buckets": len(self._buckets), "calls": self.calls,
+                    "attached": self.attached, "window_s": self.window_s}
+
+CLUSTERS = CallClusterer()
@@ -0,0 +1,276 @@
+# numeric_tokenizer.py
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# ---------------------- 엔티티 ----------------------
+class NumericEntity(NamedTuple):
+    field: str                 # floor / total_floor_count / basement_floor / total_floor_area / soot_area /
+                               # unit_temperature / unit_humidity / unit_wind_speed / building_agreement_count
+    value: float
+    unit: Optional[str]
+    span: Tuple[int, int]
+    trigger: Optional[str]     # 연면적/온도/습도 … 또는 지상/지하/총/건물/짜리
+
+# ---------------------- 한글 수사 ----------------------
+SINO_DIGITS = {"일": 1, "이": 2, "삼": 3, "사": 4, "오": 5, "육": 6, "륙": 6, "칠": 7, "팔": 8, "구": 9}
+SINO_UNITS = {"십": 10, "백": 100, "천": 1000}
+
+NATIVE_TENS = {"열": 10, "스물": 20, "스무": 20, "서른": 30, "마흔": 40, "쉰": 50,
+               "예순": 60, "일흔": 70, "여든": 80, "아흔": 90}
+NATIVE_ONES = {"하나": 1, "한": 1, "둘": 2, "두": 2, "셋": 3, "세": 3, "넷": 4, "네": 4,
+               "다섯": 5, "여섯": 6, "일곱": 7, "여덟": 8, "아홉": 9}
+
+def _alt(words) -> str:
+    return "|".join(sorted(map(re.escape, words), key=len, reverse=True))
+
+_D = r"[0-9][0-9,]*(?:\.[0-9]+)?"
+_S = r"[일이삼사오육륙칠팔구십백천만]+"
+_N = rf"(?:{_alt(NATIVE_TENS)})(?:{_alt(NATIVE_ONES)})?|(?:{_alt(NATIVE_ONES)})"
+
+def sino_to_int(s: str) -> Optional[int]:
+    """삼 → 3, 이십오 → 25, 천이백 → 1200, 삼만 → 30000"""
+    if not any(ch in SINO_UNITS or ch == "만" for ch in s):
+        # 단위 없는 나열(일이삼)은 자릿수 표기로 본다
+        return int("".join(str(SINO_DIGITS[ch]) for ch in s)) if s else None
+    total = section = cur = 0
+    for ch in s:
+        if ch in SINO_DIGITS:
+            cur = SINO_DIGITS[ch]
+        elif ch in SINO_UNITS:
+            section += (cur or 1) * SINO_UNITS[ch]
+            cur = 0
+        else:  # 만
+            total += ((section + cur) or 1) * 10000
+            section = cur = 0
+    return total + section + cur
+
+_NATIVE_TENS_LONGEST_FIRST = tuple(sorted(NATIVE_TENS, key=len, reverse=True))
+
+def native_to_int(s: str) -> Optional[int]:
+    """세 → 3, 스물두 → 22, 열 → 10"""
+    for w in _NATIVE_TENS_LONGEST_FIRST:
+        if s.startswith(w):
+            rest = s[len(w):]
+            return NATIVE_TENS[w] + (NATIVE_ONES.get(rest, 0) if rest else 0)
+    return NATIVE_ONES.get(s)
+
+@lru_cache(maxsize=4096)
+def parse_number(s: str) -> Optional[float]:
+    """아라비아 숫자 / 한자어 수사 / 고유어 수사 → 수치"""
+    if not s:
+        return None
+    if s[0].isdigit():
+        try:
+            return float(s.replace(",", ""))
+        except ValueError:
+            return None
+    v = native_to_int(s)
+    if v is None:
+        v = sino_to_int(s)
+    return float(v) if v is not None else None
+
+# ---------------------- 단일 패스 정규식 ----------------------
+TRIGGERS = {
+    "연면적": "total_floor_area",
+    "그을음": "soot_area", "그을림": "soot_area",
+    "온도": "unit_temperature", "기온": "unit_temperature", "영하": "unit_temperature",
+    "습도": "unit_humidity",
+    "풍속": "unit_wind_speed", "바람": "unit_wind_speed", "초속": "unit_wind_speed",
+    "세대": "building_agreement_count", "동의": "building_agreement_count",
+}
+
+PYEONG_M2 = 400 / 121  # 1평 = 3.3058㎡ (면적 값은 항상 ㎡ 로 저장)
+
+# 필드별 허용 단위 (None = 단위 생략 허용)
+FIELD_UNITS = {
+    "total_floor_area": {None, "㎡", "m2", "m²", "제곱미터", "평"},
+    "soot_area": {"㎡", "m2", "m²", "제곱미터", "평"},
+    "unit_temperature": {"도", "℃"},
+    "unit_humidity": {"%", "퍼센트", "프로"},
+    "unit_wind_speed": {"m/s", "ms", "미터"},
+    "building_agreement_count": {None, "세대", "동"},
+}
+
+_UNITS = _alt(["㎡", "m2", "m²", "제곱미터", "평", "℃", "도", "%", "퍼센트", "프로",
+               "m/s", "ms", "미터", "세대", "동", "층"])
+
+_FLOOR_FIELDS = frozenset({"floor", "total_floor_count", "basement_floor"})
+_DONG = "동(?=$|[^가-힣]|[이을은에의도](?:$|[^가-힣]))"   # "두 동이" 는 허용, "동네" 는 제외
+
+@lru_cache(maxsize=256)
+def _numeric_re(done: frozenset = frozenset()) -> Optional["re.Pattern[str]"]:
+    """
+    단일 패스 정규식. done 에 든 필드의 트리거/단위는 빼고 만든다
+    (필드별 첫 값만 필요할 때 이미 찾은 필드는 더 맞춰 보지 않음). 남는 분기가 없으면 None
+    """
+    triggers = [w for w, f in TRIGGERS.items() if f not in done]
+    count = "building_agreement_count" not in done
+    units = (["층"] if not _FLOOR_FIELDS <= done else []) + (["세대"] if count else []) \
+        + (["℃"] if "unit_temperature" not in done else [])
+    dunits = units + (["동"] if count else [])
+    numerals = list(NATIVE_TENS) + list(NATIVE_ONES)
+    sino = list(SINO_DIGITS) + list(SINO_UNITS) + ["만"]
+
+    def branch(on: bool, pattern: str, groups: Tuple[str, ...]) -> str:
+        # 뺀 분기도 같은 자리에 그룹을 남겨 m.groups() 순서를 고정 ((?!) 로 바로 실패)
+        return pattern if on else "(?!)" + "".join(f"(?P<{g}>)" for g in groups)
+
+    first = {w[0] for w in triggers}
+    if dunits:
+        first.add("0-9")
+    if units:
+        first |= {w[0] for w in sino}
+    if count:
+        first |= {w[0] for w in numerals}
+    if not first:
+        return None
+    return re.compile(
+        # 첫 글자 집합으로 먼저 걸러 대부분의 위치에서 분기 시도를 생략
+        rf"(?=[{''.join(sorted(first))}])(?:"
+        # 1) 트리거 선행: "연면적 1,200㎡", "온도는 영하 5도", "습도 육십 퍼센트"
+        + branch(bool(triggers),
+                 rf"(?P<trig>{_alt(triggers)})(?:[이가은는](?=\s|[0-9]))?\s*"
+                 rf"(?P<neg>영하\s*|마이너스\s*|-)?(?P<tnum>{_D}|{_N}|{_S})\s*(?P<tunit>{_UNITS})?",
+                 ("trig", "neg", "tnum", "tunit"))
+        # 2) 숫자 + 단위: "6층", "120세대", "35℃"
+        #    숫자열 중간(앞이 숫자, 또는 숫자+쉼표/점)에서는 시작하지 않음: 긴 숫자열에서 O(n²) 방지.
+        #    "있어요.3층", "아파트,3층" 처럼 문장부호 뒤 숫자는 허용
+        + "|" + branch(bool(dunits), rf"(?<![0-9])(?<![0-9][,.])(?P<dnum>{_D})\s*(?P<dunit>{_alt(dunits)})",
+                       ("dnum", "dunit"))
+        # 3) 한자어 수사 + 붙은 단위: "삼층", "이십세대" (띄어 쓰면 '이 층' 같은 지시어와 구분 불가)
+        + "|" + branch(bool(units), rf"(?<![가-힣])(?P<snum>{_S})(?P<sunit>{_alt(units)})", ("snum", "sunit"))
+        # 4) 고유어 수사 + 세대/동: "두 동", "열 세대"
+        + "|" + branch(count, rf"(?<![가-힣])(?P<nnum>{_N})\s*(?P<nunit>세대|{_DONG})", ("nnum", "nunit"))
+        + ")"
+    )
+
+NUMERIC_RE = _numeric_re()
+
+_FLOOR_PREFIX = ("지상", "지하", "총")
+_FLOOR_SUFFIX = ("건물", "짜리", "규모")
+
+def _floor_field(text: str, s: int, e: int) -> Tuple[str, Optional[str]]:
+    before = text[max(0, s - 3):s].rstrip()
+    after = text[e:e + 3].lstrip()
+    trig = None
+    if before.endswith(_FLOOR_PREFIX):  # 대부분 해당 없음: 튜플로 한 번에 거른 뒤에만 어느 쪽인지 찾음
+        trig = next(w for w in _FLOOR_PREFIX if before.endswith(w))
+    elif after.startswith(_FLOOR_SUFFIX):
+        trig = next(w for w in _FLOOR_SUFFIX if after.startswith(w))
+    if trig == "지하":
+        return "basement_floor", trig
+    return ("total_floor_count" if trig is not None else "floor"), trig
+
+# 단독 '네' 는 대답("네, 세대가…")과 구분 불가 → 단위에 붙여 쓴 경우('네세대')만 수사로 인정
+_AMBIGUOUS_NUMERALS = {"네"}
+
+def _match_fields(text: str, m: "re.Match[str]"):
+    """매치 하나 → (field, raw, unit, span, trigger, negative). 엔티티가 아니면 None"""
+    trig, neg, tnum, tunit, dnum, dunit, snum, sunit, nnum, nunit = m.groups()
+    if trig is not None:
+        field = TRIGGERS[trig]
+        if tunit not in FIELD_UNITS[field]:
+            return None
+        if tunit is None and not tnum[0].isdigit():
+            return None  # 단위 없는 한글 수사는 조사/지시어('세대가 이 건물')와 구분 불가
+        if tnum in _AMBIGUOUS_NUMERALS and m.end("tnum") != m.start("tunit"):
+            return None
+        return field, tnum, tunit, m.span(), trig, trig == "영하" or bool(neg)
+
+    if dnum is not None:
+        raw, unit = dnum, dunit
+    elif snum is not None:
+        raw, unit = snum, sunit
+    else:
+        raw, unit = nnum, nunit
+        if raw in _AMBIGUOUS_NUMERALS and m.end("nnum") != m.start("nunit"):
+            return None
+    if unit == "층":
+        field, ftrig = _floor_field(text, *m.span())
+    elif unit == "℃":
+        field, ftrig = "unit_temperature", None
+    elif unit == "세대":
+        field, ftrig = "building_agreement_count", None
+    else:
+        # "101동" 같은 주소 표기와 구분: 고유어 수사 또는 "총 N동" 만 동 개수로 본다
+        s = m.start()
+        if nnum is None and not text[max(0, s - 3):s].rstrip().endswith("총"):
+            return None
+        field, ftrig = "building_agreement_count", None
+    return field, raw, unit, m.span(), ftrig, False
+
+def _resume(m: "re.Match[str]", fields) -> int:
+    """다음 탐색 위치. 트리거 매치가 거부되면 숫자부터 다시 훑음 ('세대 3층', '바람 3층' → 3층)"""
+    return m.start("tnum") if fields is None and m.group("trig") is not None else m.end()
+
+def _entity(field: str, raw: str, unit: Optional[str], span: Tuple[int, int],
+            trig: Optional[str], negative: bool) -> Optional[NumericEntity]:
+    value = parse_number(raw)
+    if value is None:
+        return None
+    if negative:
+        value = -value
+    if unit == "평":
+        value = round(value * PYEONG_M2, 2)
+    return NumericEntity(field, value, unit, span, trig)
+
+def tokenize_numeric(text: str) -> List[NumericEntity]:
+    """전사문을 한 번 훑어 수치 엔티티를 등장 순서대로 반환 (면적은 ㎡ 로 환산)"""
+    out: List[NumericEntity] = []
+    if not text:
+        return out
+    pos = 0
+    while True:
+        m = NUMERIC_RE.search(text, pos)
+        if m is None:
+            return out
+        t = _match_fields(text, m)
+        pos = _resume(m, t)
+        ent = _entity(*t) if t else None
+        if ent is not None:
+            out.append(ent)
+
+def first_numeric(text: str) -> Dict[str, NumericEntity]:
+    """
+    필드별 첫 엔티티 (first_by_field(tokenize_numeric(text)) 대신 쓰는 빠른 경로).
+    필드를 찾을 때마다 그 트리거/단위를 뺀 패턴으로 이어서 훑으므로, 개별 정규식의 re.search 처럼
+    이미 찾은 필드의 뒤쪽 언급은 맞춰 보지 않는다
+    """
+    out: Dict[str, NumericEntity] = {}
+    if not text:
+        return out
+    pat, pos = NUMERIC_RE, 0
+    while pat is not None:
+        m = pat.search(text, pos)
+        if m is None:
+            break
+        t = _match_fields(text, m)
+        pos = _resume(m, t)
+        if t is None or t[0] in out:
+            continue
+        ent = _entity(*t)
+        if ent is not None:
+            out[ent.field] = ent
+            pat = _numeric_re(frozenset(out))
+    return out
+
+def first_by_field(entities: List[NumericEntity]) -> Dict[str, NumericEntity]:
+    """필드별 첫 등장 엔티티"""
+    out: Dict[str, NumericEntity] = {}
+    for ent in entities:
+        out.setdefault(ent.field, ent)
+    return out
+
+def floor_values(first: Dict[str, NumericEntity]) -> Tuple[Optional[int], Optional[int]]:
+    """(발화층, 전체층수) 추정. 한쪽만 언급되면 다른 쪽으로 보충. 지하층만 있으면 발화층은 음수 (지하 2층 → -2)"""
+    fl = first.get("floor")
+    total = first.get("total_floor_count")
+    basement = first.get("basement_floor")
+    ignition = fl or total
+    count = total or fl
+    if ignition is not None:
+        ignition_floor = int(ignition.value)
+    else:
+        ignition_floor = -int(basement.value) if basement else None
+    return ignition_floor, (int(count.value) if count else None)
@@ -0,0 +1,158 @@
+# results_store.py
+import os, sys, json, gzip, hashlib, mimetypes, threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+from starlette.types import Scope
+
+try:  # 선택 의존성: 없으면 해당 사이드카는 만들지 않음
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Accept-Encoding 토큰 → 사이드카 확장자 (우선순위 순)
+ENCODINGS: List[Tuple[str, str]] = [("br", ".br"), ("zstd", ".zst"), ("gzip", ".gz")]
+SIDECAR_MIN_BYTES = 512  # 이보다 작은 파일은 압축 이득이 없음
+
+# ---------------------- 쓰기 ----------------------
+def _atomic_write(path: str, data: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _compress(encoding: str, data: bytes) -> Optional[bytes]:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)  # mtime=0 → 같은 내용 같은 바이트
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=19).compress(data)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=11)
+    return None
+
+def write_bytes(path: str, data: bytes) -> None:
+    """원본 + 압축 사이드카(.gz/.zst/.br)를 함께 기록. 오래된 사이드카는 제거"""
+    _atomic_write(path, data)
+    for enc, ext in ENCODINGS:
+        side = path + ext
+        packed = _compress(enc, data) if len(data) >= SIDECAR_MIN_BYTES else None
+        if packed is not None and len(packed) < len(data):
+            _atomic_write(side, packed)
+        elif os.path.exists(side):
+            os.remove(side)  # 원본과 불일치하는 사이드카를 남기지 않음
+
+def write_json(path: str, obj: Any) -> None:
+    """결과 JSON 을 공백 없이 기록 (+ 압축 사이드카)"""
+    data = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    write_bytes(path, data)
+
+# ---------------------- 서빙 ----------------------
+_ETAG_CACHE: Dict[str, Tuple[int, int, str]] = {}
+_ETAG_LOCK = threading.Lock()
+
+def _content_etag(path: str, st: os.stat_result) -> str:
+    """내용 sha256 기반 강한 ETag. (mtime, size) 가 같으면 재계산하지 않음"""
+    with _ETAG_LOCK:
+        hit = _ETAG_CACHE.get(path)
+    if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        return hit[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    tag = h.hexdigest()[:32]
+    with _ETAG_LOCK:
+        _ETAG_CACHE[path] = (st.st_mtime_ns, st.st_size, tag)
+    return tag
+
+def _accepted(accept_encoding: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        out[token] = q
+    return out
+
+def _pick_sidecar(full_path: str, st: os.stat_result, accept_encoding: str):
+    accepted = _accepted(accept_encoding)
+    star = accepted.get("*", 0.0)
+    for enc, ext in ENCODINGS:
+        if accepted.get(enc, star) <= 0:
+            continue
+        side = full_path + ext
+        try:
+            side_st = os.stat(side)
+        except OSError:
+            continue
+        if side_st.st_mtime_ns >= st.st_mtime_ns:  # 원본보다 오래된 사이드카는 무시
+            return enc, side, side_st
+    return None, full_path, st
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles + 사전압축 사이드카 협상.
+    - Accept-Encoding 에 따라 .br/.zst/.gz 를 그대로 전송 (요청마다 압축하지 않음)
+    - 내용 해시 기반 강한 ETag (표현별로 접미사 구분), If-None-Match → 304
+    - 파일 전송은 FileResponse 에 맡김: 서버가 http.response.pathsend 를 지원하면 zero-copy
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope,
+                      status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        enc, send_path, send_st = _pick_sidecar(full_path, stat_result,
+                                                request_headers.get("accept-encoding", ""))
+        tag = _content_etag(full_path, stat_result)
+        headers = {
+            "etag": f'"{tag}-{enc}"' if enc else f'"{tag}"',
+            "vary": "Accept-Encoding",
+            "cache-control": "no-cache",  # 매번 재검증 → 바뀌지 않았으면 304
+        }
+        if enc:
+            headers["content-encoding"] = enc
+
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+        response = FileResponse(send_path, status_code=status_code, stat_result=send_st,
+                                headers=headers, media_type=media_type)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+# ---------------------- CLI: 기존 결과 압축/사이드카 일괄 생성 ----------------------
+def recompact_tree(root: str) -> int:
+    n = 0
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            if not name.endswith(".json"):
+                continue
+            p = os.path.join(dirpath, name)
+            try:
+                with open(p, "r", encoding="utf-8") as f:
+                    obj = json.load(f)
+            except (OSError, ValueError):
+                continue
+            write_json(p, obj)
+            n += 1
+    return n
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("사용법: py results_store.py <결과폴더>")
+        raise SystemExit(1)
+    print("재기록:", recompact_tree(sys.argv[1]))
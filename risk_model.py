@@ -0,0 +1,210 @@
+# risk_model.py
+import os, re, sys, json, argparse, threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from analytics import iter_normalized
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ARTIFACT_DIR = os.path.join(BASE_DIR, "artifacts", "risk")
+
+# 특징 순서 = 가중치 순서. FireIncidentNested / KeywordsV1 양쪽에서 같은 이름으로 뽑는다
+FEATURES: List[str] = [
+    "log_total_floor_area", "log_soot_area", "total_floor_count", "ignition_floor",
+    "building_agreement_count", "unit_temperature", "unit_humidity", "wind_speed",
+    "multi_use", "forest_fire", "vehicle_fire", "fire_management_target",
+]
+
+# 학습 산출물이 없을 때 쓰는 사전(prior) 가중치: 표준화 전 원척도 기준의 보수적 추정
+PRIOR = {
+    "mean": [5.0, 2.0, 4.0, 2.0, 1.0, 15.0, 50.0, 2.0, 0.0, 0.0, 0.0, 0.0],
+    "std": [2.0, 2.0, 5.0, 3.0, 3.0, 10.0, 20.0, 3.0, 1.0, 1.0, 1.0, 1.0],
+    "weights": [0.35, 0.45, 0.40, 0.20, 0.15, 0.10, -0.15, 0.25, 0.70, 0.60, 0.20, 0.30],
+    "bias": -0.9,
+}
+
+SEVERE_DAMAGE_AMOUNT = 10_000_000  # 재산피해(원) 이상이면 '심각' 라벨
+_WIND_RE = re.compile(r"([0-9]+(?:\.[0-9]+)?)")
+
+# ---------------------- 특징 추출 ----------------------
+def _f(v: Any) -> float:
+    if v is None or v == "":
+        return np.nan
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _log(v: Any) -> float:
+    x = _f(v)
+    return np.log1p(x) if x == x and x >= 0 else np.nan
+
+def _wind(v: Any) -> float:
+    m = _WIND_RE.search(str(v)) if v else None
+    return float(m.group(1)) if m else np.nan
+
+def _yn(v: Any) -> float:
+    if v is None:
+        return np.nan
+    if isinstance(v, bool):
+        return 1.0 if v else 0.0
+    return 1.0 if str(v).upper() in ("Y", "TRUE", "1") else 0.0
+
+def features_from_nested(std: Dict[str, Any]) -> List[float]:
+    """FireIncidentNested dict → 특징 벡터 (결측 NaN)"""
+    n = std.get("numeric") or {}
+    i = std.get("info") or {}
+    return [
+        _log(n.get("total_floor_area")), _log(n.get("soot_area")),
+        _f(n.get("total_floor_count")), _f(n.get("ignition_floor")),
+        _f(n.get("building_agreement_count")), _f(n.get("unit_temperature")),
+        _f(n.get("unit_humidity")), _wind(i.get("unit_wind_speed")),
+        _yn(i.get("multi_use_flag")), _yn(i.get("forest_fire_flag")),
+        _yn(i.get("vehicle_fire_flag")), _yn(i.get("fire_management_target_flag")),
+    ]
+
+def features_from_keywords(kw: Dict[str, Any]) -> List[float]:
+    """KeywordsV1 dict → 특징 벡터. 0/0.0 기본값은 '언급 없음' 이므로 결측으로 취급"""
+    z = lambda v: np.nan if not v else _f(v)
+    return [
+        _log(kw.get("total_floor_area") or None), _log(kw.get("soot_area") or None),
+        z(kw.get("total_floor_count")), np.nan,
+        z(kw.get("building_agreement_count")), z(kw.get("unit_temperature")),
+        z(kw.get("unit_humidity")), _wind(kw.get("unit_wind_speed")),
+        _yn(kw.get("multi_use_flag")), _yn(kw.get("forest_fire_flag")),
+        _yn(kw.get("vehicle_fire_flag")),
+        _yn(kw.get("fire_management_target_flag")) if kw.get("fire_management_target_flag") else np.nan,
+    ]
+
+def label_from_nested(std: Dict[str, Any]) -> Optional[float]:
+    n = std.get("numeric") or {}
+    casualty, damage = _f(n.get("casualty_count")), _f(n.get("property_damage_amount"))
+    if casualty != casualty and damage != damage:
+        return None  # 결과 정보가 없는 레코드는 학습 제외
+    return 1.0 if (casualty == casualty and casualty > 0) or (damage == damage and damage >= SEVERE_DAMAGE_AMOUNT) else 0.0
+
+# ---------------------- 모델 ----------------------
+class RiskModel:
+    """표준화 + 로지스틱. 결측은 평균으로 대치(= 표준화 후 0)"""
+
+    def __init__(self, mean, std, weights, bias: float, source: str):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.source = source
+
+    def score_matrix(self, X: np.ndarray) -> np.ndarray:
+        """(n, d) 특징 행렬 → (n,) 위험 확률. 전부 벡터 연산"""
+        Z = (X - self.mean) / self.std
+        Z = np.where(np.isnan(Z), 0.0, Z)
+        return 1.0 / (1.0 + np.exp(-(Z @ self.weights + self.bias)))
+
+    def score_nested(self, records: Iterable[Dict[str, Any]]) -> np.ndarray:
+        X = np.array([features_from_nested(r) for r in records], dtype=np.float64).reshape(-1, len(FEATURES))
+        return self.score_matrix(X)
+
+    def score_keywords(self, kws: Iterable[Dict[str, Any]]) -> np.ndarray:
+        X = np.array([features_from_keywords(k) for k in kws], dtype=np.float64).reshape(-1, len(FEATURES))
+        return self.score_matrix(X)
+
+    def save(self, out_dir: str, meta: Dict[str, Any]) -> None:
+        os.makedirs(out_dir, exist_ok=True)
+        np.save(os.path.join(out_dir, "mean.npy"), self.mean)
+        np.save(os.path.join(out_dir, "std.npy"), self.std)
+        np.save(os.path.join(out_dir, "weights.npy"), self.weights)
+        with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"features": FEATURES, "bias": self.bias, **meta}, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, art_dir: str) -> "RiskModel":
+        with open(os.path.join(art_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("features") != FEATURES:
+            raise ValueError("특징 목록이 현재 코드와 다릅니다. 다시 학습하세요.")
+        arr = lambda name: np.load(os.path.join(art_dir, name), mmap_mode="r")  # 프로세스 간 페이지 공유
+        return cls(arr("mean.npy"), arr("std.npy"), arr("weights.npy"), meta["bias"], source=art_dir)
+
+    @classmethod
+    def prior(cls) -> "RiskModel":
+        return cls(PRIOR["mean"], PRIOR["std"], PRIOR["weights"], PRIOR["bias"], source="prior")
+
+_MODEL: Optional[RiskModel] = None
+_MODEL_LOCK = threading.Lock()
+
+def get_model() -> RiskModel:
+    """RISK_MODEL_DIR(기본 artifacts/risk) 산출물을 한 번만 로드. 없으면 prior"""
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                art = os.getenv("RISK_MODEL_DIR", DEFAULT_ARTIFACT_DIR)
+                try:
+                    _MODEL = RiskModel.load(art)
+                except (OSError, ValueError, KeyError):
+                    _MODEL = RiskModel.prior()
+    return _MODEL
+
+# ---------------------- 학습 (오프라인) ----------------------
+def train(records: Iterable[Dict[str, Any]], l2: float = 1e-2, lr: float = 0.1, epochs: int = 500) -> RiskModel:
+    X, y = [], []
+    for std in records:
+        label = label_from_nested(std)
+        if label is not None:
+            X.append(features_from_nested(std))
+            y.append(label)
+    if len(set(y)) < 2:
+        raise ValueError(f"학습 가능한 레코드가 부족합니다 (라벨 {len(y)}건, 양/음성 모두 필요).")
+    X = np.array(X, dtype=np.float64)
+    y = np.array(y, dtype=np.float64)
+
+    # 열 전체가 결측일 수 있으므로 nanmean 대신 마스크로 직접 계산
+    seen = ~np.isnan(X)
+    cnt = np.maximum(seen.sum(axis=0), 1)
+    X0 = np.where(seen, X, 0.0)
+    mean = X0.sum(axis=0) / cnt
+    std = np.sqrt((np.where(seen, X0 - mean, 0.0) ** 2).sum(axis=0) / cnt)
+    std = np.where(std == 0, 1.0, std)
+    Z = np.where(seen, (X0 - mean) / std, 0.0)
+
+    w = np.zeros(Z.shape[1])
+    b = float(np.log(y.mean() / (1 - y.mean())))
+    n = len(y)
+    for _ in range(epochs):  # 전체 배치 경사하강 (특징 수가 작아 충분)
+        p = 1.0 / (1.0 + np.exp(-(Z @ w + b)))
+        g = p - y
+        w -= lr * (Z.T @ g / n + l2 * w)
+        b -= lr * g.mean()
+    return RiskModel(mean, std, w, b, source="trained")
+
+# ---------------------- 화면용 예측 ----------------------
+def risk_level(score: float) -> Dict[str, Any]:
+    level = 4 if score >= 0.6 else 3 if score >= 0.35 else 2
+    return {"label": "높음" if level >= 4 else "보통", "level": level, "score": round(float(score), 2)}
+
+def crew_recommendation(level: int, floors: Optional[int]) -> Dict[str, Any]:
+    people = {2: 8, 3: 10, 4: 12}[level]
+    ladder = 1 if level >= 4 or (floors or 0) >= 4 else 0
+    pumps = 2 if level <= 3 else 3
+    return {
+        "people": {"total": people, "breakdown": {"대원": people}},
+        "vehicles": {"total": pumps + ladder + 1, "breakdown": {"펌프": pumps, "사다리": ladder, "구급": 1}},
+        "equip": ["고압호스 100m × 2", "사다리(15m)", "열화상 카메라", "연기제거팬"],
+    }
+
+# ---------------------- CLI ----------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="화재 위험도 모델 학습")
+    parser.add_argument("--src", default=os.path.join(BASE_DIR, "results", "normalize"))
+    parser.add_argument("--out", default=DEFAULT_ARTIFACT_DIR)
+    parser.add_argument("--epochs", type=int, default=500)
+    args = parser.parse_args()
+    try:
+        model = train(iter_normalized(args.src), epochs=args.epochs)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    model.save(args.out, {"src": args.src, "severe_damage_amount": SEVERE_DAMAGE_AMOUNT})
+    print("저장:", args.out)
+    print(dict(zip(FEATURES, np.round(model.weights, 3).tolist())), "bias", round(model.bias, 3))
@@ -0,0 +1,171 @@
+# role_classifier.py
+import os, re, sys, json, glob, math, random, argparse, threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_WEIGHTS = os.path.join(BASE_DIR, "artifacts", "role", "weights.json")
+
+# 확률이 이 구간 안이면 '불확실' → LLM 으로 넘김
+LOW, HIGH = 0.25, 0.75
+
+# ---------------------- 특징 ----------------------
+# 양의 가중치 = OPERATOR 쪽. 한 번의 finditer 로 모든 단서를 훑는다
+_CUES = {
+    "q_word": r"어디|어느|무슨|뭐가|뭐예|무엇|몇|언제|어떻게|누가|누구",
+    "op_phrase": r"119|소방|출동|침착|대피하|피하세요|나오세요|기다리|말씀해|알겠습니다|확인하겠|보내드|잠시만|괜찮으세요",
+    "ca_event": r"불이|불났|났어|났습니다|연기|냄새|타고|터졌|갇혀|다쳤|쓰러",
+    "ca_plea": r"빨리|와\s?주세요|도와|살려",
+    "ca_self": r"여기|저희|우리|제가",
+    "hello": r"여보세요",  # 연결 직후 신고자가 먼저 말하는 경우가 많음
+}
+CUE_RE = re.compile("|".join(f"(?P<{k}>{v})" for k, v in _CUES.items()))
+
+_END_Q = ("나요", "까요", "니까", "가요", "시죠", "죠", "세요")
+_END_CA = ("이에요", "예요", "고요", "거든요", "같아요", "어요", "아요", "주세요", "합니다", "납니다")
+_SPLIT_RE = re.compile(r"(?<=[.?!])\s+|\n+")
+
+FEATURES: List[str] = [
+    "bias", "end_qmark", "end_interrog", "end_caller", "short", "first", "after_q", "prev_op",
+    *_CUES,
+]
+
+PRIOR: Dict[str, float] = {
+    "bias": -0.4, "end_qmark": 1.6, "end_interrog": 1.2, "end_caller": -1.4, "short": -0.6,
+    "first": 0.3, "after_q": -1.2, "prev_op": -0.5,
+    "q_word": 1.3, "op_phrase": 2.2, "ca_event": -1.5, "ca_plea": -2.0, "ca_self": -0.9,
+    "hello": -2.0,
+}
+
+def split_turns(transcript: str) -> List[str]:
+    """문장 단위 발화 분할 (. ? ! 와 줄바꿈)"""
+    return [t.strip() for t in _SPLIT_RE.split(transcript or "") if t.strip()]
+
+def turn_features(text: str, idx: int, prev_text: Optional[str], prev_op: bool) -> Dict[str, float]:
+    f = {"bias": 1.0}
+    for m in CUE_RE.finditer(text):
+        f[m.lastgroup] = 1.0
+    tail = text.rstrip(" .!~")
+    if tail.endswith("?"):
+        f["end_qmark"] = 1.0
+    tail = tail.rstrip("?")
+    if tail.endswith(_END_CA):
+        f["end_caller"] = 1.0
+    elif tail.endswith(_END_Q):
+        f["end_interrog"] = 1.0
+    if len(tail) <= 4:
+        f["short"] = 1.0
+    if idx == 0:
+        f["first"] = 1.0
+    if prev_text is not None and prev_text.rstrip().endswith("?"):
+        f["after_q"] = 1.0
+    if prev_op:
+        f["prev_op"] = 1.0
+    return f
+
+# ---------------------- 모델 ----------------------
+class RoleClassifier:
+    """희소 특징 로지스틱. 앞 발화의 예측 라벨을 다음 발화 특징으로 쓰는 순차(greedy) 복호"""
+
+    def __init__(self, weights: Dict[str, float], source: str = "prior"):
+        self.weights = dict(weights)
+        self.source = source
+
+    def prob_operator(self, feats: Dict[str, float]) -> float:
+        w = self.weights
+        z = sum(w.get(k, 0.0) * v for k, v in feats.items())
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def classify(self, turns: List[str]) -> List[Dict[str, Any]]:
+        """각 발화 → {"role", "text", "p_operator", "confident"}"""
+        out = []
+        prev_text, prev_op = None, False
+        for i, text in enumerate(turns):
+            p = self.prob_operator(turn_features(text, i, prev_text, prev_op))
+            op = p >= 0.5
+            out.append({"role": "OPERATOR" if op else "CALLER", "text": text,
+                        "p_operator": round(p, 3), "confident": not (LOW < p < HIGH)})
+            prev_text, prev_op = text, op
+        return out
+
+    def save(self, path: str, meta: Dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"features": FEATURES, "weights": self.weights, **meta}, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "RoleClassifier":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("features") != FEATURES:
+            raise ValueError("특징 목록이 현재 코드와 다릅니다. 다시 학습하세요.")
+        return cls(data["weights"], source=path)
+
+_MODEL: Optional[RoleClassifier] = None
+_MODEL_LOCK = threading.Lock()
+
+def get_classifier() -> RoleClassifier:
+    """ROLE_MODEL_PATH(기본 artifacts/role/weights.json) 를 한 번만 로드. 없으면 prior"""
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                try:
+                    _MODEL = RoleClassifier.load(os.getenv("ROLE_MODEL_PATH", DEFAULT_WEIGHTS))
+                except (OSError, ValueError, KeyError):
+                    _MODEL = RoleClassifier(PRIOR)
+    return _MODEL
+
+# ---------------------- 학습 (오프라인) ----------------------
+def iter_labeled(pattern: str) -> Iterable[List[Tuple[str, bool]]]:
+    """segments.json (LLM 화자분리 결과) → 통화별 [(발화, is_operator)] — 사실상 LLM 증류"""
+    for path in glob.glob(pattern, recursive=True):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                segs = json.load(f).get("segments") or []
+        except (OSError, ValueError, AttributeError):
+            continue
+        call = [(s.get("text", "").strip(), s.get("role") == "OPERATOR") for s in segs if isinstance(s, dict)]
+        call = [(t, y) for t, y in call if t]
+        if call:
+            yield call
+
+def train(calls: Iterable[List[Tuple[str, bool]]], epochs: int = 30, lr: float = 0.1,
+          l2: float = 1e-3, seed: int = 0) -> RoleClassifier:
+    """SGD. 이전 발화 특징은 정답 라벨 기준 (teacher forcing). prior 에서 출발"""
+    rows = []
+    for call in calls:
+        prev_text, prev_op = None, False
+        for i, (text, y) in enumerate(call):
+            rows.append((turn_features(text, i, prev_text, prev_op), 1.0 if y else 0.0))
+            prev_text, prev_op = text, y
+    if not rows:
+        raise ValueError("학습할 segments 가 없습니다.")
+    model = RoleClassifier(PRIOR, source="trained")
+    w = model.weights
+    rnd = random.Random(seed)
+    for _ in range(epochs):
+        rnd.shuffle(rows)
+        for feats, y in rows:
+            g = model.prob_operator(feats) - y
+            for k, v in feats.items():
+                w[k] = w.get(k, 0.0) - lr * (g * v + l2 * w.get(k, 0.0))
+    return model
+
+# ---------------------- CLI ----------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="신고자/접수자 발화 분류기 학습")
+    parser.add_argument("--segments", default=os.path.join(BASE_DIR, "results*", "**", "segments.json"))
+    parser.add_argument("--out", default=DEFAULT_WEIGHTS)
+    parser.add_argument("--epochs", type=int, default=30)
+    args = parser.parse_args()
+    calls = list(iter_labeled(args.segments))
+    try:
+        model = train(calls, epochs=args.epochs)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    total = sum(len(c) for c in calls)
+    correct = sum(r["role"] == ("OPERATOR" if y else "CALLER")
+                  for c in calls for r, (_, y) in zip(model.classify([t for t, _ in c]), c))
+    model.save(args.out, {"calls": len(calls), "turns": total})
+    print(f"저장: {args.out}  통화 {len(calls)}건, 발화 {total}개, 학습 정확도 {correct / total:.3f}")
@@ -1,33 +1,27 @@
 # run_mono_demo.py
-import os, json, time, uuid
+import os, time
 from stt import transcribe
 from diarize_llm import split_by_speaker
 from extract import extract_keywords
+from fused_extract import diarize_and_extract
+from role_classifier import split_turns
+from results_store import write_json
+from risk_model import get_model, risk_level, crew_recommendation
 
 def simple_predict(kw: dict) -> dict:
-    level = 2
-    score = 0.55
-    if kw.get("urgency") == "HIGH":
-        level, score = 4, 0.8
-    if "연기" in (kw.get("hazards") or []):
-        score += 0.05
-    if (kw.get("floor") or 0) >= 3:
-        score += 0.05
-    score = round(min(score, 0.99), 2)
-    likely = (
-        (f'{kw["floor"]}층 ' if kw.get("floor") else "")
-        + (kw.get("location_hint") or "")
-    ).strip() or None
+    """KeywordsV1 → 위험도/출동 권고. 점수는 risk_model (학습 산출물 없으면 prior 가중치)"""
+    score = float(get_model().score_keywords([kw])[0])
+    risk = risk_level(score)
+    likely = " ".join(x for x in (
+        f'{kw["total_floor_count"]}층 건물' if kw.get("total_floor_count") else None,
+        kw.get("facility_location"),
+    ) if x) or None
     return {
         "likely_location": likely,
-        "cause": None,  # 필요시 규칙/모델로 채우기
-        "risk_level": {"label": "높음" if level >= 4 else "보통", "level": level, "score": score},
-        "confidence": score,
-        "crew_recommendation": {
-            "people": {"total": 12 if level >= 4 else 8, "breakdown": {"대원": 12 if level >= 4 else 8}},
-            "vehicles": {"total": 4 if level >= 4 else 2, "breakdown": {"펌프": 2, "사다리": 1 if level >= 4 else 0, "구급": 1}},
-            "equip": ["고압호스 100m × 2", "사다리(15m)", "열화상 카메라", "연기제거팬"],
-        },
+        "cause": kw.get("ignition_material") or None,
+        "risk_level": risk,
+        "confidence": risk["score"],
+        "crew_recommendation": crew_recommendation(risk["level"], kw.get("total_floor_count")),
     }
 
 def simple_search_similar(kw: dict) -> list[dict]:
@@ -54,44 +48,74 @@ def simple_search_similar(kw: dict) -> list[dict]:
     ranked = sorted(cases, key=score, reverse=True)
     return [{"id": c["id"], "summary": c["summary"], "match": score(c)} for c in ranked[:3]]
 
-def build_screen_payload(transcript: str, diar: dict, kw: dict) -> dict:
-    incident_id = str(int(time.time()))
-    now_iso = time.strftime("%Y-%m-%dT%H:%M:%S+09:00", time.localtime())
-    cur_date = time.strftime("%Y-%m-%d")
-    cur_time = time.strftime("%H시 %M분 %S초")
-    pred = simple_predict(kw)
+def build_screen_payload(transcript: str, diar: dict, kw: dict = None, incident_id: str = None,
+                         status: str = "done", started: float = None) -> dict:
+    """
+    kw 가 없으면 예측/유사사례 없이 대화만 채운 중간 화면 (status: transcribed → diarized → done).
+    started: 접수 시각 (단계별 갱신에서 시각 필드가 바뀌지 않게 고정)
+    """
+    incident_id = incident_id or str(int(time.time()))
+    t = time.localtime(started)
+    now_iso = time.strftime("%Y-%m-%dT%H:%M:%S+09:00", t)
+    cur_date = time.strftime("%Y-%m-%d", t)
+    cur_time = time.strftime("%H시 %M분 %S초", t)
+    pred = simple_predict(kw) if kw is not None else None
+    kw_or_empty = kw or {}
     # 대화 turn 정리(시연: 시간은 비움)
     turns = [{"time": "", "role": s.get("role", ""), "text": s.get("text", "")} for s in diar.get("segments", [])]
     return {
         "incident_id": incident_id,
+        "status": status,
         "now": now_iso,
         "elapsed_since_fire": 0,
         "current_incident": {
             "date": cur_date,
             "time": cur_time,
-            "address": kw.get("address") or "",   # 있으면 채우기
-            "detail": kw.get("location_hint") or "",
-            "type": "건물 화재" if kw.get("incident_type") == "화재" else (kw.get("incident_type") or None),
+            "address": kw_or_empty.get("address") or "",   # 있으면 채우기
+            "detail": kw_or_empty.get("location_hint") or "",
+            "type": "건물 화재" if kw_or_empty.get("incident_type") == "화재" else (kw_or_empty.get("incident_type") or None),
         },
         "ai_prediction": pred,
         "keywords": kw,
-        "similar_cases": simple_search_similar(kw),
+        "similar_cases": simple_search_similar(kw) if kw is not None else [],
         "transcript_turns": turns,
     }
 
-def run(audio_path: str, out_dir: str):
+def run(audio_path: str, out_dir: str, publish=None, fused: bool = None, incident_id: str = None):
+    """
+    publish(incident_id, payload): 화면 JSON 을 대시보드 허브로 밀어줄 콜백 (선택).
+        같은 id 로 단계마다 갱신: 전사 → 화자분리 → 키워드/예측 (허브는 직전 화면과의 patch 만 보냄)
+    incident_id: 미리 정한 id (API 가 먼저 응답해 구독을 받은 경우). 생략 시 현재 시각
+    fused: 화자분리+키워드를 한 번의 호출로 (기본 MONO_FUSED=1 환경변수)
+    """
     os.makedirs(out_dir, exist_ok=True)
+    if fused is None:
+        fused = os.getenv("MONO_FUSED", "0") == "1"
+    started = time.time()
+    incident_id = incident_id or str(int(started))
+
+    def push(diar: dict, kw: dict = None, status: str = "done") -> dict:
+        payload = build_screen_payload(transcript, diar, kw, incident_id, status, started)
+        if publish is not None:
+            publish(incident_id, payload)
+        return payload
 
     # 1) 음성 → 텍스트
     stt_res = transcribe(audio_path)
     transcript = stt_res["transcript"]
     with open(os.path.join(out_dir, "transcript.txt"), "w", encoding="utf-8") as f:
         f.write(transcript)
+    push({"segments": [{"role": "", "text": t} for t in split_turns(transcript)]}, status="transcribed")
 
-    # 2) 화자 분리
-    diar = split_by_speaker(transcript)
-    with open(os.path.join(out_dir, "segments.json"), "w", encoding="utf-8") as f:
-        json.dump(diar, f, ensure_ascii=False, indent=2)
+    # 2) 화자 분리 (+ fused 면 키워드까지)
+    if fused:
+        both = diarize_and_extract(transcript)
+        diar = both["diar"]
+    else:
+        diar = split_by_speaker(transcript)
+    write_json(os.path.join(out_dir, "segments.json"), diar)
+    if not fused:
+        push(diar, status="diarized")
 
     # 3) 신고자 텍스트(없으면 전체) 추출
     caller_text = diar["merged"]["caller"] or transcript
@@ -101,20 +125,20 @@ def run(audio_path: str, out_dir: str):
         f.write(diar["merged"]["operator"])
 
     # 4) 키워드
-    kw = extract_keywords(caller_text)["keywords"]
+    kw = both["keywords"] if fused else extract_keywords(caller_text)["keywords"]
 
     # 5) 화면 JSON 구성 및 저장
-    payload = build_screen_payload(transcript, diar, kw)
-    incident_json = os.path.join(out_dir, f"incident_{payload['incident_id']}.json")
-    with open(incident_json, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    payload = push(diar, kw)
+    incident_json = os.path.join(out_dir, f"incident_{incident_id}.json")
+    write_json(incident_json, payload)
 
     print("완료 ✅", os.path.abspath(out_dir))
     print("화면 JSON:", os.path.abspath(incident_json))
+    return payload
 
 if __name__ == "__main__":
     import sys
     if len(sys.argv) < 3:
-        print("사용법: py run_mono_demo.py <오디오경로> <출력폴더>")
+        print("사용법: py run_mono_demo.py <오디오경로> <출력폴더> [--fused]")
         raise SystemExit(1)
-    run(sys.argv[1], sys.argv[2])
+    run(sys.argv[1], sys.argv[2], fused=True if "--fused" in sys.argv[3:] else None)
@@ -1,34 +1,155 @@
 # stt.py
-import os, sys, subprocess, shlex, time, uuid
-from openai import OpenAI
+import os, sys, subprocess, shlex, time, uuid, tempfile, threading
+from typing import Any, Dict, Optional, Tuple
+from openai import OpenAI, APIConnectionError
 from dotenv import load_dotenv
+from upstream import SCHEDULER
+from deadline import DeadlineExceeded, check as check_deadline
+
+try:
+    import faster_whisper
+    from faster_whisper import WhisperModel
+except ImportError:
+    faster_whisper = WhisperModel = None
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+# openai: 원격 API, local: CPU 추론(네트워크 불필요), auto: 원격 우선 + 연결 실패 시 local
+STT_BACKENDS = ("openai", "local", "auto")
+WAV16K_BYTES_PER_SEC = 32000  # 16kHz mono PCM 16bit
 
-def convert_to_wav16k(src_path: str) -> str:
-    """모든 오디오를 Whisper 친화적 wav(16kHz, mono, PCM)로 변환"""
-    dst_path = f"{os.path.splitext(src_path)[0]}_fixed.wav"
+def convert_to_wav16k(src_path: str, dst_dir: str) -> str:
+    """모든 오디오를 Whisper 친화적 wav(16kHz, mono, PCM)로 변환. 결과는 dst_dir 에 (원본 폴더에 산출물을 남기지 않음)"""
+    dst_path = os.path.join(dst_dir, f"{os.path.splitext(os.path.basename(src_path))[0]}_fixed.wav")
     cmd = f'ffmpeg -y -i "{src_path}" -ar 16000 -ac 1 -acodec pcm_s16le "{dst_path}"'
-    subprocess.run(shlex.split(cmd), check=True)
+    try:
+        subprocess.run(shlex.split(cmd), check=True, timeout=check_deadline("transcode"))
+    except subprocess.TimeoutExpired:
+        raise DeadlineExceeded("transcode")
     return dst_path
 
-def transcribe(audio_path: str):
-    fixed = convert_to_wav16k(audio_path)
-    with open(fixed, "rb") as f:
-        tr = client.audio.transcriptions.create(
-            model="gpt-4o-mini-transcribe", 
-            file=f
-        )
+# ---------------------- 백엔드 ----------------------
+class OpenAIBackend:
+    """원격 전사. 요청/토큰 예산은 공용 SCHEDULER 가 배정"""
+    name = "openai"
+
+    def __init__(self):
+        self.model = os.getenv("STT_REMOTE_MODEL", "gpt-4o-mini-transcribe")
+
+    def available(self) -> bool:
+        return True
+
+    def transcribe(self, audio_path: str) -> Tuple[str, float]:
+        """(전사문, 오디오 길이 초)"""
+        with tempfile.TemporaryDirectory(prefix="stt_") as tmp:
+            fixed = convert_to_wav16k(audio_path, tmp)
+            audio_s = os.path.getsize(fixed) / WAV16K_BYTES_PER_SEC
+            with open(fixed, "rb") as f:
+                # 오디오 1초 ≈ 10토큰으로 어림
+                tr = SCHEDULER.create(
+                    client.audio.transcriptions,
+                    est_tokens=int(audio_s * 10) + 256,
+                    model=self.model,
+                    file=f
+                )
+        return tr.text, audio_s
+
+class LocalWhisperBackend:
+    """
+    faster-whisper(CTranslate2) CPU 추론, 기본 int8 양자화.
+    - 모델은 프로세스당 한 번 로드해 모든 요청이 공유 (STT_LOCAL_MODEL: 크기 이름 또는 변환된 모델 폴더)
+    - BatchedInferencePipeline 이 있으면 VAD 로 자른 구간을 batch_size 개씩 묶어 디코딩
+    - 동시 전사는 STT_LOCAL_WORKERS 개까지 (CTranslate2 num_workers 와 같은 값), 나머지는 대기
+    ffmpeg 변환 없이 원본을 바로 읽는다 (faster-whisper 가 내부에서 16kHz mono 로 디코딩)
+    """
+    name = "local"
+
+    def __init__(self):
+        self.model_name = os.getenv("STT_LOCAL_MODEL", "small")
+        self.compute_type = os.getenv("STT_LOCAL_COMPUTE", "int8")
+        self.batch_size = int(os.getenv("STT_LOCAL_BATCH", "8"))
+        self.workers = max(1, int(os.getenv("STT_LOCAL_WORKERS", "2")))
+        self.cpu_threads = int(os.getenv("STT_LOCAL_THREADS", "0"))  # 0 = CTranslate2 기본
+        self._pipe = None
+        self._batched = False
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers)
+
+    def available(self) -> bool:
+        return WhisperModel is not None
+
+    def load(self):
+        if WhisperModel is None:
+            raise RuntimeError("local STT 는 faster-whisper 가 필요합니다. (pip install faster-whisper)")
+        if self._pipe is None:
+            with self._lock:
+                if self._pipe is None:
+                    model = WhisperModel(self.model_name, device="cpu", compute_type=self.compute_type,
+                                         cpu_threads=self.cpu_threads, num_workers=self.workers)
+                    batched = getattr(faster_whisper, "BatchedInferencePipeline", None)  # 1.1+
+                    self._batched = batched is not None
+                    self._pipe = batched(model=model) if batched else model
+        return self._pipe
+
+    def transcribe(self, audio_path: str) -> Tuple[str, float]:
+        check_deadline("stt")
+        pipe = self.load()
+        opts: Dict[str, Any] = {"language": "ko", "beam_size": 1}
+        if self._batched:
+            opts["batch_size"] = self.batch_size
+        with self._slots:
+            segments, info = pipe.transcribe(audio_path, **opts)
+            parts = []
+            for seg in segments:  # 제너레이터: 여기서 실제 디코딩. 구간마다 마감 확인
+                check_deadline("stt")
+                parts.append(seg.text.strip())
+        return " ".join(p for p in parts if p), float(info.duration)
+
+BACKENDS = {b.name: b for b in (OpenAIBackend(), LocalWhisperBackend())}
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """요청값 → STT_BACKEND 환경변수 → openai"""
+    name = (name or os.getenv("STT_BACKEND") or "openai").lower()
+    if name not in STT_BACKENDS:
+        raise ValueError(f"알 수 없는 STT 백엔드: {name} (가능: {', '.join(STT_BACKENDS)})")
+    return name
+
+def backends_info() -> Dict[str, Any]:
+    local = BACKENDS["local"]
+    return {"default": resolve_backend(), "available": [n for n, b in BACKENDS.items() if b.available()],
+            "local": {"model": local.model_name, "compute_type": local.compute_type, "batch_size": local.batch_size,
+                      "workers": local.workers, "loaded": local._pipe is not None},
+            "remote": {"model": BACKENDS["openai"].model}}
+
+def transcribe(audio_path: str, call_id: Optional[str] = None, backend: Optional[str] = None):
+    """call_id 미지정 시 랜덤 uuid (업로드 경로에서는 내용 해시 기반 id 를 넘긴다)"""
+    name = resolve_backend(backend)
+    t0 = time.time()
+    if name == "auto":
+        try:
+            used = "openai"
+            text, audio_s = BACKENDS["openai"].transcribe(audio_path)
+        except APIConnectionError:  # 네트워크 장애/연결 타임아웃 → 로컬로
+            if not BACKENDS["local"].available():
+                raise
+            used = "local"
+            text, audio_s = BACKENDS["local"].transcribe(audio_path)
+    else:
+        used = name
+        text, audio_s = BACKENDS[name].transcribe(audio_path)
+    elapsed = time.time() - t0
     return {
-        "call_id": str(uuid.uuid4()),
-        "transcript": tr.text,
-        "lang": "ko"
+        "call_id": call_id or str(uuid.uuid4()),
+        "transcript": text,
+        "lang": "ko",
+        "stt": {"backend": used, "audio_s": round(audio_s, 2), "latency_ms": int(elapsed * 1000),
+                "rtf": round(elapsed / audio_s, 3) if audio_s else None},
     }
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("사용법: py stt.py <오디오경로>")
+        print("사용법: py stt.py <오디오경로> [openai|local|auto]")
         sys.exit(1)
-    res = transcribe(sys.argv[1])
+    res = transcribe(sys.argv[1], backend=sys.argv[2] if len(sys.argv) > 2 else None)
     print(res)
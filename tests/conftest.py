@@ -0,0 +1,8 @@
+# tests/conftest.py
+import os, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 모듈 import 시점에 읽는 설정: 실제 API 호출/저장소 파일을 건드리지 않게
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -0,0 +1,67 @@
+# tests/test_analytics.py
+import json
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as A
+from analytics import INFO_FIELDS, IncidentStore
+
+def _records(n, seed=7):
+    rnd = random.Random(seed)
+    for i in range(n):
+        yield {
+            "numeric": {"property_damage_amount": rnd.choice([None, rnd.randint(0, 10 ** 6)]),
+                        "casualty_count": rnd.randint(0, 3)},
+            "info": {"fire_type": rnd.choice(["건물 화재", "차량 화재", "임야 화재", None]),
+                     "fire_station_name": rnd.choice(["강남", "서초", "송파"]),
+                     "building_usage_status": rnd.choice(["사용중", "공가", None]),
+                     "report_datetime": f"2024-{rnd.randint(1, 12):02d}-01 00:00:00"},
+        }
+
+def _rows(out):
+    return sorted((tuple(sorted(r.items())) for r in out["rows"]), key=repr)
+
+@pytest.mark.parametrize("group_by,where,months", [
+    (["fire_type", "fire_station_name", "month"], {}, (None, None)),
+    (["fire_type"], {"fire_station_name": "강남"}, (None, None)),
+    (["building_usage_status"], {}, ("2024-03", "2024-08")),
+    (["month"], {"fire_type": "건물 화재"}, ("2024-02", None)),
+    (["fire_type"], {"building_usage_status": "공가"}, (None, None)),
+])
+def test_rollup_answers_match_full_scan(group_by, where, months):
+    rolled, scanned = IncidentStore(), IncidentStore(rollups=[])
+    for std in _records(2000):
+        rolled.append(std)
+        scanned.append(std)
+    metrics = ["count", "sum:casualty_count", "avg:property_damage_amount"]
+    a = rolled.query(group_by, metrics, where, *months)
+    b = scanned.query(group_by, metrics, where, *months)
+    assert a["source"].startswith("rollup:") and b["source"] == "scan"
+    assert _rows(a) == _rows(b)
+
+def test_refresh_adds_each_file_once(tmp_path):
+    store = IncidentStore()
+    recs = list(_records(3))
+    for i, std in enumerate(recs[:2]):
+        (tmp_path / f"{i}.json").write_text(json.dumps(std, ensure_ascii=False), encoding="utf-8")
+    assert store.append(recs[0], name="0.json")          # 이 워커가 저장하며 바로 반영한 파일
+    assert store.refresh(str(tmp_path)) == 1
+    (tmp_path / "2.json").write_text(json.dumps(recs[2], ensure_ascii=False), encoding="utf-8")  # 다른 워커
+    assert store.refresh(str(tmp_path), max_age=60) == 0  # 방금 훑었으면 생략
+    assert store.refresh(str(tmp_path)) == 1
+    assert not store.append(recs[2], name="2.json")
+    assert store.rows == 3
+
+@pytest.mark.parametrize("params", [{"group_by": "nope"}, {"metric": "avg:nope"}, {"metric": "median:casualty_count"},
+                                    {"where": "nope:x"}])
+def test_stats_rejects_unknown_dimension_or_metric(params, tmp_path, monkeypatch):
+    monkeypatch.setattr(A, "R", lambda p: str(tmp_path / p))
+    r = TestClient(A.app).get("/stats", params=params)
+    assert r.status_code == 400 and "집계 실패" in r.json()["detail"]
+
+def test_stats_known_dimension_ok(tmp_path, monkeypatch):
+    monkeypatch.setattr(A, "R", lambda p: str(tmp_path / p))
+    r = TestClient(A.app).get("/stats", params={"group_by": INFO_FIELDS[0]})
+    assert r.status_code == 200 and r.json()["ok"]
@@ -0,0 +1,57 @@
+# tests/test_backfill.py
+import os
+
+import pytest
+
+import backfill as B
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    """오디오 3개 (그중 1개는 내용 중복) + process_one/hash_file 대체"""
+    src = tmp_path / "src"
+    src.mkdir()
+    for name, body in (("a.wav", b"aaa"), ("b.wav", b"bbb"), ("c.wav", b"aaa")):
+        (src / name).write_bytes(body)
+    hashed, processed = [], []
+    real_hash = B.hash_file
+
+    def hash_file(path):
+        hashed.append(os.path.basename(path))
+        return real_hash(path)
+
+    def process_one(path, digest, out_root, fused):
+        processed.append(os.path.basename(path))
+        return {"status": "done", "path": path, "hash": digest, "out_dir": out_root, "incident_id": None, "ms": 1}
+    monkeypatch.setattr(B, "hash_file", hash_file)
+    monkeypatch.setattr(B, "process_one", process_one)
+    out = tmp_path / "out"
+    run = lambda **kw: B.backfill(str(src), str(out), workers=1, **kw)
+    return src, hashed, processed, run
+
+def test_limit_hashes_only_what_it_submits(archive):
+    src, hashed, processed, run = archive
+    res = run(limit=1)
+    assert res["ok"] == 1 and processed == ["a.wav"]
+    assert hashed == ["a.wav"]                 # 나머지는 해시하지 않음
+
+def test_rerun_uses_size_mtime_index(archive):
+    src, hashed, processed, run = archive
+    res = run()
+    assert processed == ["a.wav", "b.wav"]
+    assert res["skipped"]["done"] + res["skipped"]["duplicate"] == 1   # c.wav 는 a.wav 와 같은 내용
+    hashed.clear()
+
+    res = run()                                # 매니페스트 재로드 → 처리한 파일은 다시 해시하지 않음
+    assert res["processed"] == 0 and res["skipped"]["done"] == 3
+    assert hashed == ["c.wav"]                 # 중복으로 건너뛴 파일은 기록이 없어 해시
+
+def test_changed_file_is_rehashed(archive):
+    src, hashed, processed, run = archive
+    run()
+    (src / "b.wav").write_bytes(b"bbb2")
+    st = os.stat(src / "b.wav")
+    os.utime(src / "b.wav", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    hashed.clear(); processed.clear()
+
+    res = run()
+    assert "b.wav" in hashed and processed == ["b.wav"] and res["ok"] == 1
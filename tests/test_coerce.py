@@ -0,0 +1,31 @@
+# tests/test_coerce.py
+import json
+import os
+
+from extract import KeywordsV1, _build_coercer, _safe_json_extract
+from bench.bench_coerce import corpus, legacy_post, new_post
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench", "corpus")
+
+def _model_outputs():
+    with open(os.path.join(CORPUS_DIR, "model_outputs.jsonl"), "r", encoding="utf-8") as f:
+        return [_safe_json_extract(json.loads(line)["text"]) for line in f if line.strip()]
+
+def test_coercer_output_matches_model_validate():
+    coerce = _build_coercer(KeywordsV1)
+    samples = [m for _, m in corpus(3000)] + _model_outputs() + [{}, None]
+    for data in samples:
+        out = coerce(data)
+        fields = {k: out[k] for k in KeywordsV1.model_fields}
+        assert KeywordsV1.model_validate(out).model_dump() == fields, data
+
+def test_single_pass_matches_legacy_post():
+    checked = 0
+    for rule, model in corpus(3000):
+        try:
+            old = legacy_post(rule, model)
+        except Exception:
+            continue  # 기존 경로는 검증 실패로 예외 (새 경로는 보정)
+        assert new_post(rule, model) == old, model
+        checked += 1
+    assert checked > 1000
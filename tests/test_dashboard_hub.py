@@ -0,0 +1,106 @@
+# tests/test_dashboard_hub.py
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+import app as A
+import run_mono_demo as M
+from dashboard_hub import DashboardHub
+
+def _payload(n_turns):
+    return {"incident_id": "1", "keywords": {"floor": 3},
+            "transcript_turns": [{"role": "caller", "text": f"발화 {i} " * 20} for i in range(n_turns)]}
+
+def test_small_patch_does_not_serialize_snapshot():
+    async def go():
+        hub = DashboardHub()
+        sub = hub.subscribe("1")
+        hub.publish("1", _payload(50))
+        built = []
+        orig = hub._snapshot_msg
+        hub._snapshot_msg = lambda iid: built.append(iid) or orig(iid)
+        hub.publish("1", _payload(51))
+        return built, [sub.queue.get_nowait() for _ in range(sub.queue.qsize())]
+    built, msgs = asyncio.run(go())
+    assert built == []
+    assert msgs[-1].startswith('{"type":"patch"')
+
+def test_pipeline_mono_returns_incident_id_before_running(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(A, "R", lambda p: str(tmp_path / p))
+    (tmp_path / "uploads").mkdir()
+
+    def fake_run(audio_path, out_dir, publish, fused, incident_id):
+        calls.append(incident_id)
+        publish(incident_id, {"incident_id": incident_id, "keywords": {}})
+
+    def failing_run(*args):
+        raise RuntimeError("stt down")
+
+    with TestClient(A.app) as client:
+        monkeypatch.setattr(A, "pipeline_run", fake_run)
+        r = client.post("/pipeline-mono", files={"file": ("a.wav", b"mono" * 10)})
+        body = r.json()
+        assert r.status_code == 200 and body["incident_id"] == calls[0]
+        assert body["ws_url"] == f"/ws/incidents/{calls[0]}"
+
+        monkeypatch.setattr(A, "pipeline_run", failing_run)
+        iid = client.post("/pipeline-mono", files={"file": ("a.wav", b"mono" * 10)}).json()["incident_id"]
+    assert A.HUB._snapshots[iid]["status"] == "error"
+
+def test_publish_incident_runs_on_event_loop():
+    assert asyncio.iscoroutinefunction(A.publish_incident)
+
+class _FakeWs:
+    """스냅샷을 받은 뒤 클라이언트가 끊는 소켓"""
+
+    def __init__(self):
+        self.sent = []
+        self.closed = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, msg):
+        self.sent.append(msg)
+        self.closed.set()
+
+    async def receive(self):
+        await self.closed.wait()
+        return {"type": "websocket.disconnect", "code": 1000}
+
+def test_ws_disconnect_without_updates_unsubscribes(monkeypatch):
+    async def go():
+        hub = DashboardHub()
+        monkeypatch.setattr(A, "HUB", hub)
+        hub.publish("1", _payload(1))
+        ws = _FakeWs()
+        await asyncio.wait_for(A.ws_incident(ws, "1"), timeout=2)   # 갱신이 없어도 끊기면 끝나야 함
+        return ws.sent, hub.stats()["subscribers"]
+    sent, subscribers = asyncio.run(go())
+    assert sent[0].startswith('{"type":"snapshot"') and subscribers == 0
+
+def test_mono_run_publishes_stages_as_patches(tmp_path, monkeypatch):
+    text = "119입니다. 어디세요? 3층에서 불이 났어요."
+    segs = [{"role": "OPERATOR", "text": "119입니다."}, {"role": "OPERATOR", "text": "어디세요?"},
+            {"role": "CALLER", "text": "3층에서 불이 났어요."}]
+    monkeypatch.setattr(M, "transcribe", lambda path: {"transcript": text})
+    monkeypatch.setattr(M, "split_by_speaker", lambda t: {
+        "segments": segs, "merged": {"caller": segs[2]["text"], "operator": "119입니다. 어디세요?"}})
+    monkeypatch.setattr(M, "extract_keywords", lambda t: {"keywords": A.merge_rule_and_model({"total_floor_count": 3}, {})})
+
+    async def go():
+        hub = DashboardHub()
+        sub = hub.subscribe("mono-1")
+        M.run("a.wav", str(tmp_path), hub.publish, fused=False, incident_id="mono-1")
+        return [json.loads(sub.queue.get_nowait()) for _ in range(sub.queue.qsize())]
+    msgs = asyncio.run(go())
+    assert [m["type"] for m in msgs] == ["snapshot", "patch", "patch"]
+    assert msgs[0]["payload"]["status"] == "transcribed"
+    assert [t["role"] for t in msgs[0]["payload"]["transcript_turns"]] == ["", "", ""]
+    ops = {op["path"]: op.get("value") for op in msgs[1]["ops"]}
+    assert ops["/status"] == "diarized" and ops["/transcript_turns/2/role"] == "CALLER"
+    ops = {op["path"]: op.get("value") for op in msgs[2]["ops"]}
+    assert ops["/status"] == "done" and ops["/keywords"]["total_floor_count"] == 3
+    assert all(m["incident_id"] == "mono-1" for m in msgs)
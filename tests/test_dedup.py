@@ -0,0 +1,41 @@
+# tests/test_dedup.py
+import asyncio
+
+import pytest
+
+from dedup import InflightCoalescer
+
+def test_follower_survives_leader_cancellation():
+    async def go():
+        co, calls = InflightCoalescer(), []
+        release = asyncio.Event()
+
+        async def work():
+            calls.append(1)
+            await release.wait()
+            return "done"
+
+        leader = asyncio.ensure_future(co.run("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(co.run("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()                    # 첫 요청의 클라이언트가 끊김
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower, calls, co.peek("k"), co.coalesced
+    result, calls, inflight, coalesced = asyncio.run(go())
+    assert result == "done" and calls == [1] and inflight is None and coalesced == 1
+
+def test_work_error_reaches_every_waiter():
+    async def go():
+        co = InflightCoalescer()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        return await asyncio.gather(co.run("k", work), co.run("k", work), return_exceptions=True)
+    out = asyncio.run(go())
+    assert [type(e) for e in out] == [ValueError, ValueError]
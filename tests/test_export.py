@@ -0,0 +1,52 @@
+# tests/test_export.py
+import gc
+import io
+import json
+import warnings
+
+import pytest
+
+from analytics import iter_normalized
+from export import export_stream, flatten
+
+def _write(folder, name, std):
+    (folder / name).write_text(json.dumps(std, ensure_ascii=False), encoding="utf-8")
+
+@pytest.fixture
+def folder(tmp_path):
+    for i in range(3):
+        _write(tmp_path, f"{i}.json", {
+            "fire_data_pk": float(i + 1),
+            "numeric": {"ignition_floor": 3.0, "total_floor_count": "5", "total_floor_area": 120,
+                        "building_agreement_count": "많음"},
+            "info": {"fire_type": "건축", "report_datetime": "2024-01-01 00:00:00", "fire_station_name": 7},
+        })
+    return tmp_path
+
+def test_flatten_coerces_to_schema_types():
+    row = flatten({"fire_data_pk": 1.0, "numeric": {"ignition_floor": 3.0, "total_floor_count": "5",
+                                                    "casualty_count": 2.5, "total_floor_area": 120},
+                   "info": {"fire_station_name": 7}})
+    assert row["fire_data_pk"] == 1 and type(row["fire_data_pk"]) is int
+    assert row["numeric.ignition_floor"] == 3 and type(row["numeric.ignition_floor"]) is int
+    assert row["numeric.total_floor_count"] == 5
+    assert row["numeric.casualty_count"] is None
+    assert row["numeric.total_floor_area"] == 120.0 and type(row["numeric.total_floor_area"]) is float
+    assert row["info.fire_station_name"] == "7"
+
+def test_arrow_export_accepts_float_valued_int_columns(folder):
+    pa = pytest.importorskip("pyarrow")
+    data = b"".join(export_stream(str(folder), "arrow"))
+    table = pa.ipc.open_stream(io.BytesIO(data)).read_all()
+    assert table.num_rows == 3
+    assert table.column("numeric.ignition_floor").to_pylist() == [3, 3, 3]
+
+def test_iter_normalized_closes_directory_when_abandoned(folder):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ResourceWarning)
+        gen = iter_normalized(str(folder))
+        next(gen)
+        gen.close()
+        del gen
+        gc.collect()
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
@@ -0,0 +1,24 @@
+# tests/test_extract.py
+from extract import _safe_json_extract
+
+def test_safe_json_extract_picks_first_parseable_object():
+    text = '설명 {bad} 그리고 {"fuel_type": "가스", "total_floor_count": 3} 끝'
+    assert _safe_json_extract(text) == {"fuel_type": "가스", "total_floor_count": 3}
+
+def test_safe_json_extract_falls_back_to_default_map():
+    out = _safe_json_extract("{" * 20000)
+    assert out["building_agreement_count"] == 0
+
+def test_provenance_follows_the_merge():
+    from extract import _merge_raw, _keywords_dict, field_provenance
+    prov = {}
+    rule = {"forest_fire_flag": False, "total_floor_count": 3, "building_structure": ["공장"], "fuel_type": None}
+    model = {"forest_fire_flag": True, "fuel_type": "가스", "building_structure": ["창고"], "wind_direction": ""}
+    kw = _keywords_dict(_merge_raw(rule, model, prov))
+    got = field_provenance(kw, prov)
+    assert kw["forest_fire_flag"] is False and got["forest_fire_flag"] == "rule"   # 규칙의 False 가 덮어씀
+    assert got["total_floor_count"] == "rule"
+    assert got["fuel_type"] == "model"
+    assert got["building_structure"] == "rule+model"
+    assert got["wind_direction"] == "none"
+    assert got["soot_area"] == "default"
@@ -0,0 +1,53 @@
+# tests/test_extract_router.py
+import pytest
+
+import extract_router
+from deadline import deadline_scope
+from extract import _KEYWORD_FIELDS
+from extract_router import ExtractRouter, rule_coverage
+
+def _prefill(coverage):
+    n = round(coverage * len(_KEYWORD_FIELDS))
+    return {k: ("값" if i < n else None) for i, k in enumerate(_KEYWORD_FIELDS)}
+
+@pytest.fixture
+def router(monkeypatch):
+    # 사전 지연: small ≈ 1200 + 0.4×글자, large ≈ 2500 + 1.0×글자 (ms)
+    monkeypatch.setattr(ExtractRouter, "_queue_ms", lambda self: 0.0)
+    return ExtractRouter(slo_ms=4000, small_model="s", large_model="l")
+
+@pytest.mark.parametrize("chars,coverage,slo_ms,tier,reason", [
+    (200, 0.5, 4000, "rules", "rules-cover"),
+    (200, 0.5, 500, "rules", "rules-cover"),      # 규칙으로 충분하면 SLO 와 무관
+    (500, 0.2, 1000, "rules", "slo"),             # small 예상 1400ms > 1000ms
+    (2000, 0.2, 10000, "large", "long"),
+    (2000, 0.2, 4000, "small", "default"),        # large 예상 4500ms 가 SLO 밖이면 small
+    (500, 0.0, 4000, "large", "low-coverage"),
+    (500, 0.2, 4000, "small", "default"),
+])
+def test_decide_thresholds(router, chars, coverage, slo_ms, tier, reason):
+    router.slo_ms = slo_ms
+    prefill = _prefill(coverage)
+    assert rule_coverage(prefill) == pytest.approx(coverage, abs=0.05)
+    d = router.decide("가" * chars, prefill)
+    assert (d["tier"], d["reason"]) == (tier, reason)
+    assert d["model"] == {"rules": None, "small": "s", "large": "l"}[tier]
+
+def test_calls_multiply_predicted_latency(router):
+    assert router.decide("가" * 500, _prefill(0.2), calls=1)["tier"] == "small"   # 1400ms
+    assert router.decide("가" * 500, _prefill(0.2), calls=3)["reason"] == "slo"   # 4200ms
+
+def test_queue_wait_and_deadline_shrink_budget(router, monkeypatch):
+    with deadline_scope(1.0):
+        d = router.decide("가" * 500, _prefill(0.2))
+    assert d["reason"] == "slo" and d["slo_ms"] <= 1000
+    monkeypatch.setattr(ExtractRouter, "_queue_ms", lambda self: 3000.0)
+    assert router.decide("가" * 500, _prefill(0.2))["reason"] == "slo"
+
+def test_decision_log_is_opt_in(router, tmp_path):
+    assert extract_router.ROUTER.log_path is None
+    d = router.decide("가" * 200, _prefill(0.5))
+    router.record(d, 10, True, 0)     # log_path 없음: 파일을 만들지 않음
+    router.log_path = str(tmp_path / "router.jsonl")
+    router.record(d, 10, True, 0)
+    assert len((tmp_path / "router.jsonl").read_text(encoding="utf-8").splitlines()) == 1
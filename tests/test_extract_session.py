@@ -0,0 +1,88 @@
+# tests/test_extract_session.py
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import extract_session as ES
+from extract_session import SessionManager
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def model(monkeypatch):
+    """SCHEDULER.create 대신: 보낸 user 메시지를 기록하고 미리 정한 JSON 을 돌려줌"""
+    sent, replies = [], []
+
+    def create(resource, est_tokens, messages, **kw):
+        sent.append(messages[-1]["content"])
+        reply = replies.pop(0) if replies else {}
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(reply)))])
+    monkeypatch.setattr(ES.SCHEDULER, "create", create)
+    return SimpleNamespace(sent=sent, replies=replies)
+
+def test_update_sends_only_the_delta_and_merges_state(model):
+    sm = SessionManager()
+    model.replies += [{"fuel_type": "가스"}, {"ignition_material": "식용유"}]
+    first = sm.update("c1", "공장 6층 건물이에요")
+    second = sm.update("c1", "주방 쪽에서 시작됐어요")
+
+    assert second["turn"] == 2 and second["delta_chars"] == len("주방 쪽에서 시작됐어요")
+    new_part = model.sent[1].split("새 발화:\n", 1)[1]
+    assert new_part == "주방 쪽에서 시작됐어요"          # 전체 전사문 재전송 없음
+    assert '"fuel_type":"가스"' in model.sent[1]                   # 현재 상태 요약
+    kw = second["keywords"]
+    assert kw["fuel_type"] == "가스" and kw["ignition_material"] == "식용유"
+    assert kw["total_floor_count"] == first["keywords"]["total_floor_count"] == 6
+    assert "공장" in kw["building_structure"]
+
+def test_unknown_values_do_not_overwrite_state(model):
+    sm = SessionManager()
+    model.replies += [{"fuel_type": "가스"}, {"fuel_type": None, "multi_use_flag": False}]
+    sm.update("c1", "가스 냄새가 나요")
+    assert sm.update("c1", "네 맞아요")["keywords"]["fuel_type"] == "가스"
+
+def test_lru_cap_evicts_least_recently_used(model):
+    sm = SessionManager(max_sessions=2)
+    for cid in ("a", "b"):
+        sm.update(cid, "불이 났어요")
+    sm.update("a", "2층이에요")            # a 를 최근으로
+    sm.update("c", "불이 났어요")
+    assert sm.stats()["sessions"] == 2
+    assert not sm.close("b") and sm.close("a") and sm.close("c")
+
+def test_idle_sessions_expire(model, monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(ES, "time", clock)
+    sm = SessionManager(idle_ttl_s=60)
+    sm.update("a", "불이 났어요")
+    clock.now += 30
+    sm.update("b", "불이 났어요")
+    clock.now += 45                         # a 는 75초 유휴, b 는 45초
+    sm.update("c", "불이 났어요")
+    assert sm.stats()["sessions"] == 2 and not sm.close("a") and sm.close("b")
+
+def test_evicted_session_falls_back_to_full_extract(model):
+    sm = SessionManager(max_sessions=1)
+    model.replies += [{"fuel_type": "가스"}]
+    sm.update("a", "공장 6층이에요 가스 냄새가 나요")
+    sm.update("b", "다른 통화")             # a 가 밀려남
+
+    full = "공장 6층이에요 가스 냄새가 나요. 3층 주방에서 불이 났어요"
+    model.replies += [{"fuel_type": "가스"}]
+    out = sm.update("a", "3층 주방에서 불이 났어요", full_text=full)
+    assert model.sent[-1] == full           # 증분 프롬프트가 아니라 전체 전사문 추출
+    assert out["turn"] == 1 and out["model"].endswith("(full)")
+    assert out["keywords"]["fuel_type"] == "가스" and out["keywords"]["total_floor_count"] == 6
+
+    model.replies += [{}]
+    nxt = sm.update("a", "빨리 와주세요", full_text=full + " 빨리 와주세요")
+    assert nxt["turn"] == 2 and "새 발화:\n빨리 와주세요" in model.sent[-1]   # 복원 후엔 다시 증분
@@ -0,0 +1,61 @@
+# tests/test_fused_extract.py
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import diarize_llm as D
+import fused_extract as F
+import upstream
+from extract import extract_keywords
+from role_classifier import PRIOR, RoleClassifier
+
+CALL = "여보세요. 공장 3층에 불이 났어요! 주소가 어디세요? 서울시 중구 명동 10번지요. 다친 사람 있나요? 없어요. 네 알겠습니다 출동하겠습니다."
+ROLES = ["CALLER", "CALLER", "OPERATOR", "CALLER", "OPERATOR", "CALLER", "OPERATOR"]
+MODEL_KW = {"fuel_type": "가스", "structure_type": "공장", "total_floor_count": 5}
+
+@pytest.fixture
+def fake(monkeypatch):
+    """공용 SCHEDULER.create 대신: system 프롬프트로 호출 종류를 구분해 정해진 JSON 을 돌려줌"""
+    clf = RoleClassifier(PRIOR)
+    monkeypatch.setattr(D, "get_classifier", lambda: clf)
+    monkeypatch.setattr(F, "get_classifier", lambda: clf)
+    calls, state = [], SimpleNamespace(roles=ROLES)
+
+    def create(resource, est_tokens, messages, **kw):
+        system = messages[0]["content"]
+        if system == F.FUSED_SYSTEM:
+            calls.append("fused")
+            reply = {"roles": state.roles, "keywords": MODEL_KW}
+        elif system == D.ESCALATE_SYSTEM:
+            calls.append("escalate")
+            reply = {"labels": {}}
+        else:
+            calls.append("extract")
+            reply = MODEL_KW
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(reply, ensure_ascii=False)))],
+                               usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20))
+    monkeypatch.setattr(upstream.SCHEDULER, "create", create)
+    return SimpleNamespace(calls=calls, state=state)
+
+def test_fused_matches_two_call_path(fake):
+    diar = D.split_by_speaker(CALL, mode="auto")
+    kw = extract_keywords(diar["merged"]["caller"])["keywords"]
+    assert fake.calls == ["extract"]
+
+    both = F.diarize_and_extract(CALL)
+    assert fake.calls == ["extract", "fused"]
+
+    fused = both["diar"]
+    assert [(s["role"], s["text"]) for s in fused["segments"]] == [(s["role"], s["text"]) for s in diar["segments"]]
+    assert set(fused["segments"][0]) == set(diar["segments"][0])
+    assert fused["merged"] == diar["merged"]
+    assert both["keywords"] == kw                     # 같은 규칙 우선 병합, 같은 필드
+    assert both["usage"] == {"prompt_tokens": 100, "completion_tokens": 20}
+
+def test_bad_roles_fall_back_to_local_labels(fake):
+    fake.state.roles = ["OPERATOR", "???", None]
+    both = F.diarize_and_extract(CALL)
+    roles = [s["role"] for s in both["diar"]["segments"]]
+    assert roles == ["OPERATOR"] + ROLES[1:]
+    assert both["diar"]["diarization"]["fallback_roles"] == len(ROLES) - 1
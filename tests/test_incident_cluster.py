@@ -0,0 +1,50 @@
+# tests/test_incident_cluster.py
+from incident_cluster import CallClusterer
+
+def test_retry_of_same_call_is_not_a_duplicate():
+    cl = CallClusterer()
+    text = "여기 한국기술교육대학교 담헌실학관인데요 3층에서 불이 났어요 빨리 와주세요"
+    first = cl.assign("call-1", text, now=0)
+    again = cl.assign("call-1", text, now=10)
+    assert again.incident_id == first.incident_id and again.primary and again.members == 1
+    assert cl.stats()["calls"] == 1 and cl.stats()["attached"] == 0
+
+OPS = ("119 상황실입니다. 어디십니까? {caller} 네 알겠습니다 지금 바로 출동하겠습니다. "
+       "침착하시고 밖으로 대피하세요. 건물 안에 남은 사람 있나요? 모르겠어요 빨리 와주세요. "
+       "소방차 출동했습니다 잠시만 기다리세요. 젖은 수건으로 코와 입을 막고 계단으로 내려가세요. "
+       "엘리베이터는 절대 타지 마세요. 출동 차량이 곧 도착합니다 전화 끊지 말고 기다리세요.")
+
+def test_shared_boilerplate_with_different_address_is_not_merged():
+    cl = CallClusterer()
+    a = OPS.format(caller="여기 서울 강남구 역삼동 123번지 아파트인데요 3층에서 불이 났어요.")
+    b = OPS.format(caller="여기 부산 해운대구 우동 45번지 아파트인데요 5층에서 불이 났어요.")
+    first = cl.assign("a", a, address="서울 강남구 역삼동 123번지", floor=3, now=0)
+    second = cl.assign("b", b, address="부산 해운대구 우동 45번지", floor=5, now=1)
+    assert second.primary and second.incident_id != first.incident_id
+    # 주소/층을 못 뽑아도 상황실 문구만으로는 묶이지 않음 (신고자 발화만 서명)
+    third = cl.assign("c", b, now=2)
+    assert third.incident_id != first.incident_id
+
+def test_same_fire_reported_twice_is_merged():
+    cl = CallClusterer()
+    a = OPS.format(caller="여기 서울 강남구 역삼동 123번지 아파트인데요 3층에서 불이 났어요.")
+    b = OPS.format(caller="저기요 강남구 역삼동 123번지 아파트 3층에서 불이 났어요.")
+    first = cl.assign("a", a, address="서울 강남구 역삼동 123번지", floor=3, now=0)
+    second = cl.assign("b", b, address="강남구 역삼동 123번지", floor=3, now=1)
+    assert not second.primary and second.incident_id == first.incident_id
+    assert cl.assign("c", a, address="서울 강남구 역삼동 123번지", floor=7, now=2).primary
+
+def test_spreading_fire_one_floor_apart_is_merged():
+    cl = CallClusterer()
+    a = OPS.format(caller="여기 서울 강남구 역삼동 123번지 아파트인데요 3층에서 불이 났어요.")
+    b = OPS.format(caller="여기 서울 강남구 역삼동 123번지 아파트인데요 4층까지 불이 번졌어요.")
+    first = cl.assign("a", a, address="서울 강남구 역삼동 123번지", floor=3, now=0)
+    second = cl.assign("b", b, address="서울 강남구 역삼동 123번지", floor=4, now=1)
+    assert second.incident_id == first.incident_id
+
+def test_fire_kind_is_a_hard_veto():
+    cl = CallClusterer()
+    a = OPS.format(caller="여기 서울 강남구 역삼동 123번지 앞인데요 불이 났어요.")
+    first = cl.assign("a", a, address="서울 강남구 역삼동 123번지", fire_type="임야", now=0)
+    assert cl.assign("b", a, address="서울 강남구 역삼동 123번지", fire_type="차량", now=1).incident_id \
+        != first.incident_id
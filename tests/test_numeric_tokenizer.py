@@ -0,0 +1,46 @@
+# tests/test_numeric_tokenizer.py
+import time
+
+import pytest
+
+from numeric_tokenizer import tokenize_numeric, first_numeric, first_by_field, floor_values
+
+def _fields(text):
+    return {k: e.value for k, e in first_numeric(text).items()}
+
+def test_pyeong_is_converted_to_square_meters():
+    assert _fields("연면적 100평 정도") == {"total_floor_area": pytest.approx(330.58)}
+    assert _fields("그을음 10평") == {"soot_area": pytest.approx(33.06)}
+
+def test_ne_as_yes_is_not_a_count():
+    assert _fields("네 세대가 좀 많아요") == {}
+    assert _fields("네세대가 살아요") == {"building_agreement_count": 4}
+    assert _fields("스물네 세대") == {"building_agreement_count": 24}
+
+@pytest.mark.parametrize("text", ["불이 났어요.3층이에요", "아파트,3층", "3층"])
+def test_digit_after_punctuation_still_matches(text):
+    assert _fields(text) == {"floor": 3}
+
+def test_digit_inside_number_does_not_start_a_match():
+    assert _fields("1,200층") == {"floor": 1200}
+    assert _fields("1.5층") == {"floor": 1.5}
+
+def test_long_digit_run_is_linear():
+    t0 = time.perf_counter()
+    tokenize_numeric("1" * 20000 + "개")
+    assert time.perf_counter() - t0 < 0.5
+
+def test_first_numeric_matches_full_tokenize():
+    text = ("여기 지하 1층 지상 6층 건물이고 삼층에서 불이 났어요. 연면적 1,200㎡, 그을음 50㎡, "
+            "온도는 영하 5도, 습도 40%, 바람 3m/s, 두 동에 120세대. 다시 말하면 4층이고 온도 30도요.")
+    assert first_numeric(text) == first_by_field(tokenize_numeric(text))
+    assert _fields(text)["unit_temperature"] == -5
+
+@pytest.mark.parametrize("text", ["우리 세대 3층이에요", "바람 3층", "온도 3층"])
+def test_rejected_trigger_number_is_retried_as_floor(text):
+    assert _fields(text) == {"floor": 3}
+    assert [(e.field, e.value) for e in tokenize_numeric(text)] == [("floor", 3)]
+
+def test_basement_only_gives_negative_ignition_floor():
+    assert floor_values(first_numeric("지하 2층에서 불이 났어요")) == (-2, None)
+    assert floor_values(first_numeric("지하 1층 지상 6층 건물 3층에서")) == (3, 6)
@@ -0,0 +1,97 @@
+# tests/test_pipeline.py
+import pytest
+from fastapi.testclient import TestClient
+
+import app as A
+from dedup import ContentCache
+
+TRANSCRIPT = "여기 한국기술교육대학교 담헌실학관입니다. 3층에서 연기가 나요. 빨리 와주세요."
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """STT/추출은 가짜, 캐시/업로드/정규화 저장은 tmp_path 로"""
+    (tmp_path / "uploads").mkdir()
+    saved = []
+    monkeypatch.setattr(A, "R", lambda p: str(tmp_path / p))
+    monkeypatch.setattr(A, "CACHE", ContentCache(str(tmp_path / "cache")))
+    monkeypatch.setattr(A, "transcribe",
+                        lambda path, call_id, backend=None: {"call_id": call_id, "transcript": TRANSCRIPT, "lang": "ko",
+                                                             "stt": {"backend": backend}})
+    monkeypatch.setattr(A, "api_extract", lambda body: {"ok": True, "result": {
+        "keywords": A.merge_rule_and_model({}, {}), "model": "fake", "latency_ms": 0}})
+    monkeypatch.setattr(A, "write_json", lambda path, data: saved.append(data))
+    monkeypatch.setattr(A.STORE, "append", lambda std, name=None: None)
+    c = TestClient(A.app)
+    c.saved = saved
+    return c
+
+def _post(client, audio: bytes, **params):
+    r = client.post("/pipeline", params=params, files={"file": ("a.wav", audio)})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+def test_save_after_unsaved_run_persists(client):
+    audio = b"pipeline-save-key" * 50
+    _post(client, audio, save="false", cluster="false")
+    assert client.saved == []
+    _post(client, audio, save="true", cluster="false")
+    assert len(client.saved) == 1
+    _post(client, audio, save="true", cluster="false")  # 같은 내용 재시도: 캐시 적중, 다시 저장하지 않음
+    assert len(client.saved) == 1
+
+def test_deadline_path_shares_extraction_with_plain_path(client, monkeypatch):
+    modes = []
+
+    def fake_extract(body):
+        modes.append(body.mode)
+        return {"ok": True, "result": {"keywords": A.merge_rule_and_model({}, {}), "model": "fake", "latency_ms": 0}}
+    monkeypatch.setattr(A, "api_extract", fake_extract)
+
+    audio = b"pipeline-share-extract" * 50
+    _post(client, audio, save="false", cluster="false")
+    assert sorted(modes) == ["facts", "insights"]
+    out = _post(client, audio, save="false", cluster="true", deadline_ms=5000)
+    assert sorted(modes) == ["facts", "insights"]   # 모드별 캐시 적중: 추가 추출 없음
+    assert out["deadline"]["stages"]["extract"]["status"] == "ok"
+
+def test_auto_fallback_is_cached_under_local_backend(client, monkeypatch):
+    used = []
+
+    def transcribe(path, call_id, backend=None):
+        used.append(backend)
+        real = "local" if len(used) == 1 else "openai"   # 첫 호출만 원격 장애로 local 대체
+        return {"call_id": call_id, "transcript": f"{real} 전사", "lang": "ko", "stt": {"backend": real}}
+
+    monkeypatch.setattr(A, "transcribe", transcribe)
+    audio = {"file": ("a.wav", b"auto-fallback" * 50)}
+    first = client.post("/stt", params={"backend": "auto"}, files=audio).json()
+    assert first["transcript"] == "local 전사" and first["cache_key"].endswith("-local")
+
+    local = client.post("/stt", params={"backend": "local"}, files=audio).json()
+    assert local["cached"] and local["transcript"] == "local 전사"
+
+    again = client.post("/stt", params={"backend": "auto"}, files=audio).json()  # 원격 복구 후 재시도
+    assert not again["cached"] and again["transcript"] == "openai 전사"
+    assert again["cache_key"] == again["content_hash"]
+    assert client.post("/stt", params={"backend": "openai"}, files=audio).json()["cached"]
+    assert used == ["auto", "auto"]
+
+def test_slo_degraded_extraction_is_not_cached(client, monkeypatch):
+    calls = []
+
+    def fake_extract(body):
+        calls.append(body.mode)
+        return {"ok": True, "result": A._rules_only(A.prefill_from_rules(body.text)),
+                "route": {"tier": "rules", "reason": "slo"}}
+    monkeypatch.setattr(A, "api_extract", fake_extract)
+
+    audio = b"pipeline-slo-degraded" * 50
+    out = _post(client, audio, save="false", cluster="false")
+    assert {r["model"] for r in out["extraction"].values()} == {A.RULES_ONLY}
+    _post(client, audio, save="false", cluster="false")
+    assert len(calls) == 4   # pipeline/extract 캐시 모두 건너뜀 → 다시 추출
+
+    out = _post(client, audio, save="false", cluster="false", deadline_ms=5000)
+    assert len(calls) == 6
+    assert out["deadline"]["stages"]["extract"]["status"] == "timeout"   # 두 모드 모두 예산 부족으로 규칙만
+    assert not out["deadline"]["complete"]
@@ -0,0 +1,100 @@
+# tests/test_risk_model.py
+import json
+import math
+import random
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import app as A
+import risk_model as RM
+from risk_model import FEATURES, RiskModel, features_from_keywords, features_from_nested, label_from_nested, train
+
+def _feat(vec):
+    return dict(zip(FEATURES, vec))
+
+def test_keyword_zero_defaults_are_missing():
+    f = _feat(features_from_keywords({"total_floor_area": 0.0, "soot_area": 0, "total_floor_count": 0,
+                                      "building_agreement_count": 0, "unit_temperature": 0.0,
+                                      "unit_humidity": 0.0, "unit_wind_speed": None,
+                                      "multi_use_flag": False, "fire_management_target_flag": None}))
+    for name in ("log_total_floor_area", "log_soot_area", "total_floor_count", "ignition_floor",
+                 "building_agreement_count", "unit_temperature", "unit_humidity", "wind_speed",
+                 "fire_management_target"):
+        assert math.isnan(f[name]), name
+    assert f["multi_use"] == 0.0     # bool False 는 실제 '아님'
+
+def test_keyword_values_are_extracted():
+    f = _feat(features_from_keywords({"total_floor_area": 120.0, "total_floor_count": 6, "unit_wind_speed": "3.5 m/s",
+                                      "forest_fire_flag": True, "fire_management_target_flag": "Y"}))
+    assert f["log_total_floor_area"] == pytest.approx(math.log1p(120))
+    assert (f["total_floor_count"], f["wind_speed"], f["forest_fire"], f["fire_management_target"]) == (6, 3.5, 1, 1)
+
+def test_nested_features_and_label():
+    std = {"numeric": {"ignition_floor": 3, "casualty_count": 0, "property_damage_amount": 2e7},
+           "info": {"multi_use_flag": "N", "vehicle_fire_flag": "Y", "unit_wind_speed": "2 m/s"}}
+    f = _feat(features_from_nested(std))
+    assert (f["ignition_floor"], f["multi_use"], f["vehicle_fire"], f["wind_speed"]) == (3, 0, 1, 2)
+    assert math.isnan(f["forest_fire"])
+    assert label_from_nested(std) == 1.0
+    assert label_from_nested({"numeric": {"casualty_count": 0}}) == 0.0
+    assert label_from_nested({"numeric": {}}) is None
+
+def _records(n=300, seed=3):
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        floors = rnd.randint(1, 20)
+        area = rnd.uniform(50, 5000)
+        severe = floors > 10 or area > 3000
+        out.append({"numeric": {"total_floor_count": floors, "total_floor_area": area,
+                                "casualty_count": int(severe and rnd.random() < 0.8)},
+                    "info": {"multi_use_flag": rnd.choice(["Y", "N"])}})
+    return out
+
+def test_train_save_load_round_trip(tmp_path):
+    recs = _records()
+    model = train(recs, epochs=200)
+    model.save(str(tmp_path), {"rows": len(recs)})
+    loaded = RiskModel.load(str(tmp_path))
+    assert np.allclose(loaded.score_nested(recs), model.score_nested(recs))
+    high = loaded.score_nested([{"numeric": {"total_floor_count": 18, "total_floor_area": 4500}}])[0]
+    low = loaded.score_nested([{"numeric": {"total_floor_count": 2, "total_floor_area": 100}}])[0]
+    assert high > low
+
+def test_train_needs_both_labels():
+    with pytest.raises(ValueError):
+        train([{"numeric": {"casualty_count": 0}}] * 5)
+
+def test_feature_list_mismatch_is_rejected(tmp_path):
+    train(_records(), epochs=10).save(str(tmp_path), {})
+    meta = json.loads((tmp_path / "meta.json").read_text(encoding="utf-8"))
+    meta["features"] = meta["features"][:-1]
+    (tmp_path / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    with pytest.raises(ValueError):
+        RiskModel.load(str(tmp_path))
+
+@pytest.mark.parametrize("broken", [False, True])
+def test_get_model_falls_back_to_prior(tmp_path, monkeypatch, broken):
+    if broken:
+        (tmp_path / "meta.json").write_text(json.dumps({"features": ["x"], "bias": 0}), encoding="utf-8")
+    monkeypatch.setenv("RISK_MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(RM, "_MODEL", None)
+    assert RM.get_model().source == "prior"
+
+def test_get_model_loads_artifacts(tmp_path, monkeypatch):
+    train(_records(), epochs=10).save(str(tmp_path), {})
+    monkeypatch.setenv("RISK_MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(RM, "_MODEL", None)
+    assert RM.get_model().source == str(tmp_path)
+
+def test_risk_score_endpoint(monkeypatch):
+    monkeypatch.setattr(A, "get_model", RiskModel.prior)
+    r = TestClient(A.app).post("/risk/score", json={
+        "records": [{"numeric": {"total_floor_count": 3}}],
+        "keywords": [{"total_floor_count": 0}, {"total_floor_count": 30, "multi_use_flag": True}]})
+    body = r.json()
+    assert r.status_code == 200 and body["model"] == "prior"
+    assert len(body["records"]) == 1 and len(body["keywords"]) == 2
+    assert body["keywords"][1]["score"] > body["keywords"][0]["score"]
@@ -0,0 +1,72 @@
+# tests/test_role_classifier.py
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import diarize_llm as D
+from role_classifier import PRIOR, RoleClassifier, split_turns, turn_features
+
+CALL = "여보세요. 불이 났어요! 주소가 어디세요? 서울시 중구 명동 10번지요. 다친 사람 있나요? 없어요. 네 알겠습니다 출동하겠습니다."
+
+@pytest.fixture
+def prior(monkeypatch):
+    """학습된 가중치 유무와 상관없이 prior 로 고정"""
+    clf = RoleClassifier(PRIOR)
+    monkeypatch.setattr(D, "get_classifier", lambda: clf)
+    return clf
+
+@pytest.fixture
+def llm(monkeypatch):
+    """SCHEDULER.create 대신: 보낸 메시지를 기록하고 미리 정한 JSON 을 돌려줌"""
+    sent, replies = [], []
+
+    def create(resource, est_tokens, messages, **kw):
+        sent.append(messages[-1]["content"])
+        reply = replies.pop(0) if replies else {}
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(reply, ensure_ascii=False)))])
+    monkeypatch.setattr(D.SCHEDULER, "create", create)
+    return SimpleNamespace(sent=sent, replies=replies)
+
+def test_split_turns_on_sentence_ends_and_newlines():
+    assert split_turns("불이야! 어디세요?\n강남역이요.  ") == ["불이야!", "어디세요?", "강남역이요."]
+    assert split_turns("") == []
+
+def test_cue_features():
+    f = turn_features("주소가 어디세요?", 2, "불이 났어요!", False)
+    assert f["q_word"] == f["end_qmark"] == 1.0 and "after_q" not in f
+    f = turn_features("빨리 와주세요", 0, None, False)
+    assert f["ca_plea"] == f["end_caller"] == f["first"] == 1.0
+    assert turn_features("없어요.", 3, "다친 사람 있나요?", True).keys() >= {"after_q", "prev_op", "end_caller"}
+
+def test_prior_labels_a_typical_call():
+    roles = [r["role"] for r in RoleClassifier(PRIOR).classify(split_turns(CALL))]
+    assert roles == ["CALLER", "CALLER", "OPERATOR", "CALLER", "OPERATOR", "CALLER", "OPERATOR"]
+
+def test_confident_call_stays_local(prior, llm):
+    out = D.split_by_speaker(CALL, mode="auto")
+    assert llm.sent == [] and out["diarization"]["escalated"] == []
+    assert out["merged"]["caller"].startswith("여보세요. 불이 났어요!")
+
+def test_auto_escalates_only_unsure_turns(prior, llm):
+    text = "불이 났어요! 네 그렇습니다."
+    labeled = prior.classify(split_turns(text))
+    assert [r["confident"] for r in labeled] == [True, False]
+
+    llm.replies.append({"labels": {"1": "OPERATOR", "0": "OPERATOR"}})
+    out = D.split_by_speaker(text, mode="auto")
+    assert len(llm.sent) == 1 and llm.sent[0].endswith("라벨이 필요한 번호: 1")
+    # 확신 있던 0번은 LLM 응답이 있어도 그대로
+    assert [s["role"] for s in out["segments"]] == ["CALLER", "OPERATOR"]
+    assert out["diarization"]["escalated"] == [1]
+
+def test_local_mode_never_calls_llm(prior, llm):
+    out = D.split_by_speaker("불이 났어요! 네 그렇습니다.", mode="local")
+    assert llm.sent == [] and out["diarization"]["escalated"] == []
+    assert [s["role"] for s in out["segments"]] == ["CALLER", "CALLER"]
+
+def test_bad_llm_reply_keeps_local_labels(prior, monkeypatch):
+    reply = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="모르겠어요"))])
+    monkeypatch.setattr(D.SCHEDULER, "create", lambda *a, **kw: reply)
+    out = D.split_by_speaker("불이 났어요! 네 그렇습니다.", mode="auto")
+    assert [s["role"] for s in out["segments"]] == ["CALLER", "CALLER"]
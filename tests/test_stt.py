@@ -0,0 +1,31 @@
+# tests/test_stt.py
+import os
+from types import SimpleNamespace
+
+import stt
+from backfill import iter_audio
+
+def _fake_ffmpeg(monkeypatch, made):
+    def run(cmd, check, timeout):
+        dst = cmd[-1]
+        made.append(dst)
+        with open(dst, "wb") as f:
+            f.write(b"\0" * stt.WAV16K_BYTES_PER_SEC * 2)
+    monkeypatch.setattr(stt.subprocess, "run", run)
+
+def test_openai_backend_leaves_no_transcode_next_to_source(tmp_path, monkeypatch):
+    src = tmp_path / "call.m4a"
+    src.write_bytes(b"audio")
+    made = []
+    _fake_ffmpeg(monkeypatch, made)
+    monkeypatch.setattr(stt.SCHEDULER, "create", lambda resource, est_tokens, **kw: SimpleNamespace(text="여보세요"))
+
+    text, audio_s = stt.OpenAIBackend().transcribe(str(src))
+    assert (text, audio_s) == ("여보세요", 2.0)
+    assert sorted(os.listdir(tmp_path)) == ["call.m4a"]
+    assert made and not os.path.exists(made[0])   # 임시 폴더째 정리
+
+def test_iter_audio_skips_leftover_transcodes(tmp_path):
+    for name in ("a.wav", "a_fixed.wav", "b.M4A", "notes.txt"):
+        (tmp_path / name).write_bytes(b"x")
+    assert [os.path.basename(p) for p in iter_audio(str(tmp_path))] == ["a.wav", "b.M4A"]
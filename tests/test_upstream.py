@@ -0,0 +1,76 @@
+# tests/test_upstream.py
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import extract, stt, diarize_llm, upstream
+from deadline import DeadlineExceeded, deadline_scope
+from upstream import UpstreamScheduler
+
+def test_batch_request_larger_than_headroom_keeps_live_reserve():
+    s = UpstreamScheduler(rpm=60, tpm=1000, live_reserve=0.2)
+    t0 = time.monotonic()
+    s.acquire(est_tokens=5000, lane="batch", timeout=1.0)   # 버킷이 가득 차 있으면 남는 몫까지만 차감
+    assert time.monotonic() - t0 < 0.5
+    assert s.tokens.level == pytest.approx(200, abs=1)
+    with pytest.raises(DeadlineExceeded):
+        s.acquire(est_tokens=100, lane="batch", timeout=0.2)  # 예비분을 깎아야 하는 batch 는 대기
+    s.acquire(est_tokens=100, lane="live", timeout=0.2)       # live 는 예비분을 씀
+
+def test_refund_does_not_exceed_capacity():
+    s = UpstreamScheduler(rpm=60, tpm=1000)
+    s.acquire(est_tokens=800)
+    s.record(None, est_tokens=800, used_tokens=10)
+    s.record(None, est_tokens=800, used_tokens=10)
+    assert s.tokens.level == s.tokens.capacity
+
+def test_sdk_retries_disabled():
+    for mod in (extract, stt, diarize_llm):
+        assert mod.client.max_retries == 0
+
+class _Err(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = None
+
+class _Resource:
+    """with_raw_response.create 를 흉내: 앞의 실패들을 차례로 던진 뒤 성공"""
+
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.calls = 0
+        self.with_raw_response = self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        parsed = SimpleNamespace(usage=SimpleNamespace(total_tokens=10), text="ok")
+        return SimpleNamespace(headers={}, parse=lambda: parsed)
+
+def _fast(**kw):
+    return UpstreamScheduler(rpm=600, tpm=100000, backoff_s=0.01, backoff_max_s=0.02, **kw)
+
+def test_transient_errors_are_retried():
+    s, res = _fast(), _Resource([_Err(503), _Err(429)])
+    assert s.create(res, est_tokens=10).text == "ok"
+    assert res.calls == 3 and s.retries == 2
+
+def test_retries_are_bounded_and_skip_client_errors():
+    s, res = _fast(max_retries=1), _Resource([_Err(500), _Err(500), _Err(500)])
+    with pytest.raises(_Err):
+        s.create(res, est_tokens=10)
+    assert res.calls == 2
+    res = _Resource([_Err(400)])
+    with pytest.raises(_Err):
+        s.create(res, est_tokens=10)
+    assert res.calls == 1
+
+def test_retry_backoff_respects_deadline(monkeypatch):
+    monkeypatch.setattr(upstream.random, "uniform", lambda lo, hi: hi)
+    s, res = UpstreamScheduler(rpm=600, tpm=100000, backoff_s=5.0), _Resource([_Err(503)] * 3)
+    with deadline_scope(0.2), pytest.raises(_Err):
+        s.create(res, est_tokens=10)       # 백오프(5초)가 남은 예산보다 길면 바로 원래 오류
+    assert res.calls == 1
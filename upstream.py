@@ -0,0 +1,256 @@
+# upstream.py
+import os, re, time, random, threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterable, Optional
+
+from deadline import DeadlineExceeded, check as check_deadline
+
+try:
+    from openai import APIConnectionError   # 연결 실패/타임아웃 (APITimeoutError 포함)
+except ImportError:
+    APIConnectionError = None
+
+# 우선순위 순서: 앞쪽이 먼저 배정됨
+LANES = ("live", "batch")
+_lane: ContextVar[str] = ContextVar("upstream_lane", default="live")
+
+@contextmanager
+def priority_lane(name: str):
+    """이 블록 안의 업스트림 호출을 지정 레인(live/batch)으로 보냄"""
+    if name not in LANES:
+        raise ValueError(f"알 수 없는 레인: {name}")
+    token = _lane.set(name)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+def current_lane() -> str:
+    return _lane.get()
+
+# ---------------------- 토큰 버킷 ----------------------
+class TokenBucket:
+    """분당 한도(limit)를 초 단위로 균등 보충하는 버킷"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def seconds_until(self, amount: float) -> float:
+        short = amount - self.level
+        return 0.0 if short <= 0 else short / self.rate
+
+    def sync(self, limit: Optional[float], remaining: Optional[float]) -> None:
+        """응답 헤더 값으로 보정. 서버 쪽 잔량이 더 적으면 그것을 신뢰"""
+        if limit:
+            self.capacity = float(limit)
+            self.rate = self.capacity / 60.0
+        if remaining is not None:
+            self.level = min(self.level, float(remaining))
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNIT_SEC = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """'6m0s', '1.5s', '20ms' → 초"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    return sum(float(n) * _UNIT_SEC[u] for n, u in parts) if parts else None
+
+def _num(headers, key: str) -> Optional[float]:
+    v = headers.get(key)
+    try:
+        return float(v) if v is not None else None
+    except ValueError:
+        return None
+
+def _retryable(e: Exception) -> bool:
+    """일시 오류: 429, 408/409, 5xx, 연결 끊김/타임아웃"""
+    status = getattr(e, "status_code", None)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    return APIConnectionError is not None and isinstance(e, APIConnectionError)
+
+def estimate_tokens(messages: Iterable[Dict[str, Any]], max_output: int = 512) -> int:
+    """한국어 위주 대화: 대략 글자 2개당 1토큰 + 출력 여유분"""
+    chars = sum(len(m.get("content") or "") for m in messages)
+    return chars // 2 + max_output
+
+# ---------------------- 스케줄러 ----------------------
+class UpstreamScheduler:
+    """
+    같은 공급자 계정을 쓰는 모든 호출(STT/추출/화자분리)의 요청 수·토큰 예산을 공유.
+    - live 레인이 대기 중이면 batch 는 배정받지 않음
+    - batch 는 버킷의 live_reserve 비율 아래로는 쓰지 못함 (live 급증 대비).
+      남는 몫보다 큰 batch 요청은 버킷이 찰 때까지 기다리고 남는 몫까지만 차감 (초과분은 record 가 보정)
+    - 응답 헤더(x-ratelimit-*)로 잔량을 보정, 429 시 reset 까지 정지
+    - 일시 오류는 max_retries 번까지 지터 백오프로 재시도 (SDK 재시도는 끔: 예산 밖 요청이 되므로)
+    """
+
+    def __init__(self, rpm: float, tpm: float, live_reserve: float = 0.2,
+                 max_retries: int = 2, backoff_s: float = 0.5, backoff_max_s: float = 8.0):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.live_reserve = live_reserve
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[object]] = {lane: deque() for lane in LANES}
+        self._paused_until = 0.0
+        self._waits: Dict[str, Deque[float]] = {lane: deque(maxlen=1024) for lane in LANES}
+        self._granted: Dict[str, int] = {lane: 0 for lane in LANES}
+        self.max_retries = max_retries
+        self.backoff_s, self.backoff_max_s = backoff_s, backoff_max_s
+        self.retries = 0
+
+    # --- 배정 ---
+    def _charge(self, lane: str, est_tokens: float) -> float:
+        """배정 시 차감할 토큰. 용량(batch 는 예비분을 뺀 몫)을 넘는 추정치는 그 몫으로 자름"""
+        reserve = self.live_reserve if lane != LANES[0] else 0.0
+        return min(est_tokens, self.tokens.capacity * (1.0 - reserve))
+
+    def _can_grant(self, lane: str, est_tokens: float, now: float) -> float:
+        """0 이면 지금 배정 가능, 아니면 다시 확인할 때까지 대기 초"""
+        if now < self._paused_until:
+            return self._paused_until - now
+        reserve = self.live_reserve if lane != LANES[0] else 0.0
+        # 차감 후에도 예비분이 남아야 함. 요구량이 용량을 넘지 않게 잘라 큰 요청도 언젠가 배정됨
+        need_req = min(1 + self.requests.capacity * reserve, self.requests.capacity)
+        need_tok = self._charge(lane, est_tokens) + self.tokens.capacity * reserve
+        return max(self.requests.seconds_until(need_req), self.tokens.seconds_until(need_tok))
+
+    def acquire(self, est_tokens: int, lane: Optional[str] = None, timeout: Optional[float] = None) -> float:
+        """배정될 때까지 대기 후 예산 차감. 대기 시간(초) 반환. timeout 초과 시 DeadlineExceeded (예산 차감 없음)"""
+        lane = lane or current_lane()
+        ticket = object()
+        t0 = time.monotonic()
+        with self._cond:
+            self._queues[lane].append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self.requests.refill(now)
+                    self.tokens.refill(now)
+                    head_lane = next(l for l in LANES if self._queues[l])
+                    if head_lane == lane and self._queues[lane][0] is ticket:
+                        delay = self._can_grant(lane, est_tokens, now)
+                        if delay <= 0:
+                            self.requests.level -= 1
+                            self.tokens.level -= self._charge(lane, est_tokens)
+                            break
+                    else:
+                        delay = 1.0  # 차례가 아님: 앞 요청 배정 시 notify 로 깨어남
+                    if timeout is not None:
+                        left = timeout - (now - t0)
+                        if left <= 0:
+                            raise DeadlineExceeded("upstream queue")
+                        delay = min(delay, left)
+                    self._cond.wait(timeout=min(delay, 1.0))
+            finally:
+                self._queues[lane].remove(ticket)
+                self._cond.notify_all()
+            waited = time.monotonic() - t0
+            self._waits[lane].append(waited)
+            self._granted[lane] += 1
+        return waited
+
+    def record(self, headers, est_tokens: int, used_tokens: Optional[int], status: int = 200) -> None:
+        """응답 후 실제 사용량/헤더로 버킷 보정"""
+        with self._cond:
+            if used_tokens is not None:
+                # 추정치와 실제 사용량 차이만큼 되돌리거나 더 차감
+                self.tokens.level = min(self.tokens.capacity,
+                                        self.tokens.level + min(est_tokens, self.tokens.capacity) - used_tokens)
+            if headers is not None:
+                self.requests.sync(_num(headers, "x-ratelimit-limit-requests"),
+                                   _num(headers, "x-ratelimit-remaining-requests"))
+                self.tokens.sync(_num(headers, "x-ratelimit-limit-tokens"),
+                                 _num(headers, "x-ratelimit-remaining-tokens"))
+                if status == 429:
+                    reset = (_num(headers, "retry-after")
+                             or _parse_reset(headers.get("x-ratelimit-reset-requests"))
+                             or _parse_reset(headers.get("x-ratelimit-reset-tokens"))
+                             or 1.0)
+                    self._paused_until = max(self._paused_until, time.monotonic() + reset)
+            self._cond.notify_all()
+
+    def create(self, resource, est_tokens: int, **kwargs):
+        """
+        resource.create(**kwargs) 를 예산 배정 후 호출.
+        예) SCHEDULER.create(client.chat.completions, est_tokens=..., model=..., messages=...)
+        요청 마감(deadline_scope) 안이면 대기와 HTTP 타임아웃 모두 남은 예산으로 제한.
+        일시 오류는 max_retries 번까지 재시도: 429 는 reset 까지 정지(acquire 가 대기), 그 밖에는
+        지터 백오프. 백오프가 남은 예산을 넘으면 재시도하지 않고 원래 오류를 올림
+        """
+        charged = self._charge(current_lane(), est_tokens)
+        user_timeout = kwargs.get("timeout")
+        for attempt in range(self.max_retries + 1):
+            rem = check_deadline("upstream")
+            self.acquire(est_tokens, timeout=rem)
+            if rem is not None and user_timeout is None:
+                kwargs["timeout"] = max(0.05, check_deadline("upstream"))
+            try:
+                raw = resource.with_raw_response.create(**kwargs)
+            except Exception as e:
+                resp = getattr(e, "response", None)
+                status = getattr(e, "status_code", 0) or 0
+                self.record(getattr(resp, "headers", None), charged, None, status)
+                if attempt >= self.max_retries or not _retryable(e):
+                    raise
+                delay = 0.0 if status == 429 else \
+                    random.uniform(0, min(self.backoff_max_s, self.backoff_s * 2 ** attempt))
+                rem = check_deadline("upstream")
+                if rem is not None and delay >= rem:
+                    raise
+                with self._cond:
+                    self.retries += 1
+                time.sleep(delay)
+                for v in kwargs.values():  # 업로드 파일은 처음부터 다시 보냄
+                    if hasattr(v, "seek"):
+                        v.seek(0)
+                continue
+            parsed = raw.parse()
+            usage = getattr(parsed, "usage", None)
+            used = getattr(usage, "total_tokens", None) if usage is not None else None
+            self.record(raw.headers, charged, used)
+            return parsed
+
+    # --- 관측 ---
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            out: Dict[str, Any] = {
+                "requests_available": round(self.requests.level, 1),
+                "tokens_available": round(self.tokens.level),
+                "paused_for_s": round(max(0.0, self._paused_until - time.monotonic()), 2),
+                "retries": self.retries,
+                "lanes": {},
+            }
+            for lane in LANES:
+                waits = sorted(self._waits[lane])
+                n = len(waits)
+                out["lanes"][lane] = {
+                    "queued": len(self._queues[lane]),
+                    "granted": self._granted[lane],
+                    "wait_ms_avg": round(sum(waits) / n * 1000, 1) if n else 0.0,
+                    "wait_ms_p95": round(waits[min(n - 1, int(n * 0.95))] * 1000, 1) if n else 0.0,
+                    "wait_ms_max": round(waits[-1] * 1000, 1) if n else 0.0,
+                }
+            return out
+
+SCHEDULER = UpstreamScheduler(
+    rpm=float(os.getenv("UPSTREAM_RPM", "500")),
+    tpm=float(os.getenv("UPSTREAM_TPM", "200000")),
+    live_reserve=float(os.getenv("UPSTREAM_LIVE_RESERVE", "0.2")),
+    max_retries=int(os.getenv("UPSTREAM_MAX_RETRIES", "2")),
+)